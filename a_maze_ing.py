@@ -1,5 +1,6 @@
-from mazegen.generate import MazeGenerator
+from mazegen.generate import MazeGenerator, LOOP_RATIO
 from mazegen.display import ShowMaze
+from mazegen.cache import config_cache
 from mazegen.solve import switch_path
 import curses
 import sys
@@ -23,7 +24,10 @@ def be_amazed(screen: curses.window, config: ParsingResult) -> None:
     display = ShowMaze(screen, config.get('seed'))
     maze = MazeGenerator(config['width'], config['height'],
                          config['entry'], config['exit'],
-                         config.get('seed'), display)
+                         config.get('seed'), display,
+                         loop_ratio=config.get('loop_ratio', LOOP_RATIO),
+                         loops=config.get('loops'),
+                         cache=config_cache(config))
 
     # generate and display the maze
     maze.apply_algo(config['perfect'], True, True)
@@ -45,6 +49,16 @@ def be_amazed(screen: curses.window, config: ParsingResult) -> None:
         elif user_input == curses.KEY_RIGHT:
             maze.move_entry(1, 0)
 
+        # pan the view (maze bigger than the terminal)
+        elif user_input == ord('h'):
+            maze.displayer.pan(maze, -1, 0)
+        elif user_input == ord('j'):
+            maze.displayer.pan(maze, 0, 1)
+        elif user_input == ord('k'):
+            maze.displayer.pan(maze, 0, -1)
+        elif user_input == ord('l'):
+            maze.displayer.pan(maze, 1, 0)
+
         # user algo choice
         elif user_input == ord('1'):
             maze.algo = 0
@@ -52,6 +66,10 @@ def be_amazed(screen: curses.window, config: ParsingResult) -> None:
             maze.algo = 1
         elif user_input == ord('3'):
             maze.algo = 2
+        elif user_input == ord('4'):
+            maze.algo = 3
+        elif user_input == ord('5'):
+            maze.algo = 4
 
         elif user_input == ord('g'):    # static generation
             # clear path
@@ -0,0 +1,63 @@
+"""
+Time full redraws (display_grid) and single cell redraws of ShowMaze.
+
+Needs a terminal, the maze is bigger than the screen so the
+whole screen is drawn (viewport). Run from the project root:
+    python3 -m benchmarks.display [side]
+"""
+import curses
+import sys
+import time
+from mazegen.display import ShowMaze
+from mazegen.generate import MazeGenerator
+from mazegen.solve import switch_path
+
+
+REPEAT = 20
+
+
+def run(screen: curses.window, side: int) -> list[str]:
+    """
+    Draw a side x side maze (path shown) REPEAT times.
+
+    Returns:
+        lines (list[str]): Results, printed once curses is closed
+    """
+    curses.curs_set(0)
+    display = ShowMaze(screen, 42)
+    maze = MazeGenerator(side, side, (0, 0), (side - 1, side - 1),
+                         4242 * 10 + 1, display)
+    maze.apply_algo(True)
+    switch_path(maze.path, maze, visible=True)
+    display.display_grid(maze)
+    visible = [maze.grid.cell(y * side + x)
+               for y in range(display.view_y,
+                              display.view_y + display.view_height)
+               for x in range(display.view_x,
+                              display.view_x + display.view_width)]
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        display.display_grid(maze)
+    full = (time.perf_counter() - start) / REPEAT
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for cell in visible:
+            display.update_cell(cell, maze)
+    cells = (time.perf_counter() - start) / (REPEAT * len(visible))
+
+    return [f"{side}x{side} maze, {len(visible)} visible cells",
+            f"display_grid: {full * 1000:.2f} ms",
+            f"update_cell: {cells * 1e6:.2f} us/cell"]
+
+
+def main() -> None:
+    """Run in curses, then print the results"""
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for line in curses.wrapper(run, side):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
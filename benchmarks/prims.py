@@ -0,0 +1,44 @@
+"""
+Scaling curve of Prim's algorithm.
+
+Run from the project root:
+    python3 -m benchmarks.prims
+"""
+import random
+import time
+from mazegen.generate import MazeGenerator
+
+
+SIDES = [50, 100, 200, 400, 800]
+
+
+def time_prims(side: int, seed: int = 42) -> float:
+    """
+    Time one Prim's generation (grid already built) on a side x side maze.
+
+    Args:
+        side (int): Width and height of the maze
+        seed (int): Seed of the generation
+
+    Return:
+        float: Seconds spent in prims()
+    """
+    maze = MazeGenerator(side, side, (0, 0), (side - 1, side - 1))
+    random.seed(seed)
+    start = time.perf_counter()
+    maze.prims(True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Print seconds and microseconds per cell for each size"""
+    print(f"{'side':>6} {'cells':>9} {'seconds':>9} {'us/cell':>8}")
+    for side in SIDES:
+        seconds = time_prims(side)
+        cells = side * side
+        print(f"{side:>6} {cells:>9} {seconds:>9.3f} "
+              f"{seconds / cells * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare save_maze() with the previous writer (one write per cell).
+
+Run from the project root:
+    python3 -m benchmarks.save_maze [side ...]
+"""
+import filecmp
+import os
+import random
+import sys
+import tempfile
+import time
+from mazegen.generate import MazeGenerator
+
+
+SIDES = [1000, 4000, 10000]
+
+
+def legacy_save_maze(maze: MazeGenerator, filename: str) -> None:
+    """The writer before the buffered one: one f.write() per cell/move"""
+    with open(filename, 'w') as f:
+        for y in range(maze.height):
+            row = y * maze.width
+            for index in range(row, row + maze.width):
+                i = maze.grid.walls[index]
+                f.write(f"{hex(i)[2:].capitalize()}")
+            f.write('\n')
+        f.write('\n')
+
+        f.write(f"{maze.start[0]},{maze.start[1]}\n")
+        f.write(f"{maze.end[0]},{maze.end[1]}\n")
+
+        for i in range(1, len(maze.path)):
+            prev = maze.path[i - 1]
+            curr = maze.path[i]
+            if curr.x == prev.x + 1:
+                f.write("E")
+            elif curr.x == prev.x - 1:
+                f.write("W")
+            elif curr.y == prev.y + 1:
+                f.write("S")
+            elif curr.y == prev.y - 1:
+                f.write("N")
+
+
+def fake_maze(side: int) -> MazeGenerator:
+    """
+    A side x side maze with random walls and a path along the first row.
+
+    Generating a real 10k x 10k maze would take longer than the writing,
+    the writers don't care if the walls make sense.
+    """
+    maze = MazeGenerator(side, side, (0, 0), (side - 1, 0))
+    random.seed(side)
+    nibbles = bytes.maketrans(bytes(range(256)),
+                              bytes(i & 15 for i in range(256)))
+    maze.grid.walls[:] = random.randbytes(maze.grid.size).translate(nibbles)
+    maze.path = [maze.grid.cell(i) for i in range(side)]
+    return maze
+
+
+def main() -> None:
+    """Time both writers for each size and check the files are equal"""
+    sides = [int(arg) for arg in sys.argv[1:]] or SIDES
+    print(f"{'side':>6} {'legacy (s)':>11} {'buffered (s)':>13} "
+          f"{'speedup':>8} {'same':>5}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, "legacy.txt")
+        buffered_file = os.path.join(tmp, "buffered.txt")
+        for side in sides:
+            maze = fake_maze(side)
+
+            start = time.perf_counter()
+            legacy_save_maze(maze, legacy_file)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            maze.save_maze(buffered_file)
+            buffered = time.perf_counter() - start
+
+            same = filecmp.cmp(legacy_file, buffered_file, shallow=False)
+            print(f"{side:>6} {legacy:>11.3f} {buffered:>13.3f} "
+                  f"{legacy / buffered:>7.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
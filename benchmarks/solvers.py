@@ -0,0 +1,48 @@
+"""
+Compare the search strategies on perfect and imperfect mazes.
+
+Run from the project root:
+    python3 -m benchmarks.solvers [side]
+"""
+import random
+import sys
+import time
+from mazegen.generate import MazeGenerator
+from mazegen.solve import SOLVERS, SearchBuffers, search
+
+
+QUERIES = 50
+
+
+def main() -> None:
+    """Print visited cells and time per query for each strategy"""
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(f"{side}x{side}, {QUERIES} random queries per maze")
+    print(f"{'maze':>22} {'strategy':>14} {'visited':>10} {'ms/query':>9}")
+    for algo, name in enumerate(("backtracking", "prims", "kruskal")):
+        for perfect in (True, False):
+            maze = MazeGenerator(side, side, (0, 0), (side - 1, side - 1),
+                                 4242 * 10 + algo)
+            maze.apply_algo(perfect)
+            grid = maze.grid
+            rng = random.Random(side)
+            free = [i for i in range(grid.size) if not grid.reserved[i]]
+            queries = [(rng.choice(free), rng.choice(free))
+                       for _ in range(QUERIES)]
+            buffers = SearchBuffers(grid.size)
+            label = f"{name} {'perfect' if perfect else 'loops'}"
+
+            for strategy in SOLVERS:
+                visited = 0
+                start = time.perf_counter()
+                for a, b in queries:
+                    visited += search(grid, a, b, strategy,
+                                      buffers)['visited']
+                seconds = time.perf_counter() - start
+                print(f"{label:>22} {strategy:>14} "
+                      f"{visited // QUERIES:>10} "
+                      f"{seconds / QUERIES * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""
+Benchmark suite: every algorithm, perfect and imperfect, over several sizes.
+
+Each maze is split in phases, timed alone:
+    init       init_maze() (grid + 42 pattern)
+    generate   backtracking() / prims() / kruskal() / division() /
+               eller(), perfect
+    unperfect  unperfect() (imperfect mazes only)
+    solve      breadth_first_search()
+    render     ShowMaze.display_grid() on a headless screen (TERMINAL
+               lines x columns, the viewport for big mazes)
+    save       save_maze() in a temporary directory
+
+Time is taken without tracemalloc (best of --repeat runs), then the
+phase is run once more with tracemalloc for its peak memory.
+Results are written in JSON and compared to a baseline file.
+
+Run from the project root:
+    python3 -m benchmarks.suite                    # compare to baseline
+    python3 -m benchmarks.suite --save-baseline    # store a new baseline
+    python3 -m benchmarks.suite --sizes 10 100 --algos prims
+
+Timings only mean something on the machine that made the baseline:
+the baseline records the Python version and the machine (see
+machine_info()), when they don't match this run the comparison is
+skipped with a warning (--force to compare anyway). Save a baseline
+on your own machine before using the suite as a regression check.
+
+Exit status is 1 if a phase is slower than the baseline by more
+than --threshold (default 50%), or if there is no baseline.
+"""
+from mazegen.display import ShowMaze
+from mazegen.generate import MazeGenerator
+from mazegen.solve import breadth_first_search
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, TypedDict, cast
+from unittest import mock
+import argparse
+import curses
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+SIDES = [10, 100, 500, 1000, 2000]
+
+ALGOS = ["backtracking", "prims", "kruskal", "division", "eller"]
+
+# unperfect() is linear, imperfect mazes are run at every size
+# (--max-imperfect to skip the big ones)
+MAX_IMPERFECT = max(SIDES)
+
+# Phases faster than that are only noise, never reported as regression
+MIN_SECONDS = 0.05
+
+# Allowed slowdown, even on the same machine two runs can differ by 30%
+THRESHOLD = 0.5
+
+# Timed runs per phase, the best is kept (one run is too noisy to compare)
+REPEAT = 5
+
+# Keys of machine_info() that need to match the baseline to compare
+MACHINE_KEYS = ("python", "implementation", "system", "machine", "cpu",
+                "cpus")
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+RESULTS = "bench_output.json"
+
+# Size of the screen of the render phase (lines, columns)
+TERMINAL = (60, 240)
+
+
+class PhaseResult(TypedDict):
+    """
+    Measures of one phase.
+
+    Keys:
+        seconds (float): Best wall time of the runs
+        cells_per_sec (float): Cells of the maze / seconds
+        peak_bytes (int): Peak of memory allocated during the phase
+    """
+    seconds: float
+    cells_per_sec: float
+    peak_bytes: int
+
+
+class HeadlessScreen:
+    """
+    Stand-in for the curses window of ShowMaze, nothing is kept: the
+    render phase measures ShowMaze (tiles, viewport, one addstr per
+    color), not the terminal.
+    """
+    def __init__(self, lines: int, cols: int) -> None:
+        self.size: tuple[int, int] = (lines, cols)
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return self.size
+
+    def addstr(self, *args: Any) -> None:
+        pass
+
+    def addnstr(self, *args: Any) -> None:
+        pass
+
+    def move(self, y: int, x: int) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def erase(self) -> None:
+        pass
+
+    def clrtoeol(self) -> None:
+        pass
+
+    def refresh(self) -> None:
+        pass
+
+    def noutrefresh(self) -> None:
+        pass
+
+
+@contextmanager
+def headless_curses() -> Iterator[None]:
+    """
+    Replace the curses color functions (they need a terminal) by
+    functions doing nothing, for ShowMaze and its ColorManager.
+    """
+    def nothing(*args: Any) -> None:
+        pass
+
+    with mock.patch.multiple(curses, start_color=nothing,
+                             use_default_colors=nothing,
+                             init_pair=nothing, doupdate=nothing,
+                             color_pair=lambda pair: pair << 8,
+                             COLORS=256, create=True):
+        yield
+
+
+def measure(phase: Callable[[], Any], reset: Callable[[], None],
+            cells: int, repeat: int) -> PhaseResult:
+    """
+    Time a phase and measure its memory peak.
+
+    Args:
+        phase (Callable): The code to measure
+        reset (Callable): Bring back the state expected by phase,
+                          called (not timed) before each run
+        cells (int): Number of cells of the maze
+        repeat (int): Number of timed runs, the best is kept
+
+    Returns:
+        result (PhaseResult): Time, throughput and peak memory
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        reset()
+        start = time.perf_counter()
+        phase()
+        best = min(best, time.perf_counter() - start)
+
+    reset()
+    tracemalloc.start()
+    phase()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds': best,
+        'cells_per_sec': cells / max(best, 1e-9),
+        'peak_bytes': peak
+    }
+
+
+def bench_maze(side: int, algo: int, perfect: bool, repeat: int,
+               directory: str) -> dict[str, PhaseResult]:
+    """
+    Measure all the phases of one side x side maze.
+
+    Each phase start from the same state, so repeated runs (and the
+    traced one) do the same work.
+
+    Args:
+        side (int): Width and height of the maze
+        algo (int): Index of the algorithm in ALGOS
+        perfect (bool): Measure unperfect() too if False
+        repeat (int): Number of timed runs per phase
+        directory (str): Where save_maze() write
+
+    Returns:
+        phases (dict[str, PhaseResult]): Measures by phase name
+    """
+    cells = side * side
+    maze = MazeGenerator(side, side, (0, 0), (side - 1, side - 1),
+                         4242 * 10 + algo)
+    generate = getattr(maze, ALGOS[algo])
+    phases: dict[str, PhaseResult] = {}
+
+    phases['init'] = measure(maze.init_maze, lambda: None, cells, repeat)
+
+    def reset_generate() -> None:
+        maze.init_maze()
+        random.seed(4242)
+
+    phases['generate'] = measure(lambda: generate(True), reset_generate,
+                                 cells, repeat)
+    # Keep a copy of the perfect maze to start each unperfect() run from
+    perfect_walls = bytes(maze.grid.walls)
+
+    if not perfect:
+        def reset_unperfect() -> None:
+            maze.grid.walls[:] = perfect_walls
+            maze.grid.version += 1
+            random.seed(4242)
+
+        phases['unperfect'] = measure(lambda: maze.unperfect(False),
+                                      reset_unperfect, cells, repeat)
+
+    def solve() -> None:
+        maze.path = breadth_first_search(maze)
+
+    phases['solve'] = measure(solve, lambda: None, cells, repeat)
+
+    with headless_curses():
+        display = ShowMaze(cast(curses.window, HeadlessScreen(*TERMINAL)),
+                           42)
+        display.fit(maze)
+        # Only the visible cells are drawn
+        drawn = display.view_width * display.view_height
+        phases['render'] = measure(lambda: display.display_grid(maze),
+                                   lambda: None, drawn, repeat)
+
+    filename = os.path.join(directory, f"bench_{side}.txt")
+    phases['save'] = measure(lambda: maze.save_maze(filename),
+                             lambda: None, cells, repeat)
+    return phases
+
+
+def cpu_name() -> str:
+    """Model of the processor, from /proc/cpuinfo on Linux"""
+    try:
+        with open("/proc/cpuinfo") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine_info() -> dict[str, Any]:
+    """
+    Describe where the suite runs, stored with the results.
+
+    Returns:
+        info (dict): Python version and implementation, system,
+                     architecture, processor model and number of CPUs
+    """
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'cpu': cpu_name(),
+        'cpus': os.cpu_count()
+    }
+
+
+def machine_mismatch(report: dict[str, Any],
+                     baseline: dict[str, Any]) -> list[str]:
+    """
+    Find what differs between the machine of this run and the one
+    of the baseline (MACHINE_KEYS), a baseline without them never
+    matches.
+
+    Returns:
+        differences (list[str]): One 'key: baseline != run' per key
+    """
+    return [f"{key}: {baseline.get(key)} != {report.get(key)}"
+            for key in MACHINE_KEYS if baseline.get(key) != report.get(key)]
+
+
+def run(sides: list[int], algos: list[str], repeat: int,
+        max_imperfect: int) -> dict[str, Any]:
+    """
+    Run the whole sweep, printing each phase as it is measured.
+
+    Returns:
+        report (dict): Machine info and results by case, the JSON content
+    """
+    results: dict[str, dict[str, PhaseResult]] = {}
+    print(f"{'case':>28} {'phase':>10} {'seconds':>9} "
+          f"{'cells/sec':>11} {'peak KiB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for side in sides:
+            for name in algos:
+                for perfect in (True, False):
+                    if not perfect and side > max_imperfect:
+                        continue
+                    case = (f"{name}/{'perfect' if perfect else 'imperfect'}"
+                            f"/{side}")
+                    phases = bench_maze(side, ALGOS.index(name), perfect,
+                                        repeat, directory)
+                    results[case] = phases
+                    for phase, result in phases.items():
+                        print(f"{case:>28} {phase:>10} "
+                              f"{result['seconds']:>9.4f} "
+                              f"{result['cells_per_sec']:>11.0f} "
+                              f"{result['peak_bytes'] / 1024:>10.1f}")
+    return {
+        **machine_info(),
+        'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any],
+            threshold: float) -> list[str]:
+    """
+    Find the phases slower than in the baseline.
+
+    Only cases and phases present in both are compared, phases
+    under MIN_SECONDS in the baseline are ignored (timer noise).
+
+    Args:
+        report (dict): Results of this run
+        baseline (dict): Results stored before
+        threshold (float): Allowed slowdown (0.5 = 50% slower)
+
+    Returns:
+        regressions (list[str]): One line per slower phase
+    """
+    regressions = []
+    for case, phases in report['results'].items():
+        old_phases = baseline['results'].get(case, {})
+        for phase, result in phases.items():
+            old = old_phases.get(phase)
+            if old is None or old['seconds'] < MIN_SECONDS:
+                continue
+            ratio = result['seconds'] / old['seconds']
+            if ratio > 1 + threshold:
+                regressions.append(f"{case} {phase}: {old['seconds']:.4f}s "
+                                   f"-> {result['seconds']:.4f}s "
+                                   f"(x{ratio:.2f})")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Parse the options, run the sweep and compare it to the baseline.
+
+    Returns:
+        int: 1 if a regression was found or there is no baseline, else 0
+             (also 0 when the baseline comes from another machine)
+    """
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIDES,
+                        help="maze sides to run (default %(default)s)")
+    parser.add_argument("--algos", nargs="+", choices=ALGOS, default=ALGOS)
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help="timed runs per phase, the best is kept "
+                        "(default %(default)s)")
+    parser.add_argument("--max-imperfect", type=int, default=MAX_IMPERFECT,
+                        help="biggest side run in imperfect mode "
+                        "(default %(default)s)")
+    parser.add_argument("--output", default=RESULTS,
+                        help="JSON results file (default %(default)s)")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="JSON baseline file (default %(default)s)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before failing "
+                        "(default %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results as the new baseline")
+    parser.add_argument("--force", action="store_true",
+                        help="compare even if the baseline comes from "
+                        "another machine or Python version")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.algos, max(1, args.repeat),
+                 args.max_imperfect)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        # Nothing to compare to is a failure: the check would pass silently
+        print(f"No baseline ({args.baseline}), "
+              "run with --save-baseline to create one")
+        return 1
+
+    mismatch = machine_mismatch(report, baseline)
+    if mismatch and not args.force:
+        print("Warning: the baseline was made on another machine or "
+              "Python, timings can't be compared:")
+        for line in mismatch:
+            print("   ", line)
+        print("Comparison skipped, run 'make bench-baseline' on this "
+              "machine (or use --force)")
+        return 0
+
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over "
+              f"{args.threshold:.0%}:")
+        for line in regressions:
+            print("   ", line)
+        return 1
+    print(f"No regression over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
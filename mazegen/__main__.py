@@ -0,0 +1,135 @@
+from mazegen.batch import generate_mazes, BatchReport, STREAM_CELLS
+from mazegen.packed import is_packed, packed_to_text, text_to_packed
+from mazegen.parsing import parsing, ParsingError
+import argparse
+import asyncio
+import os
+import sys
+
+
+def print_report(report: BatchReport) -> None:
+    """Print the number of mazes generated and the throughput"""
+    seconds = max(report['seconds'], 1e-9)
+    print(f"{report['mazes']} maze(s), {report['cells']} cells "
+          f"in {report['seconds']:.3f}s")
+    print(f"{report['mazes'] / seconds:.2f} mazes/sec, "
+          f"{report['cells'] / seconds:.0f} cells/sec")
+
+
+def run_generate(args: argparse.Namespace) -> None:
+    """Generate the mazes of the config and print the throughput"""
+    workers = args.workers or os.cpu_count() or 1
+    config = parsing(args.config)
+    print_report(generate_mazes(config, args.count, workers, args.stream))
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Run the maze generation service until Ctrl-C"""
+    # Imported here: the batch commands don't need asyncio
+    from mazegen.server import serve
+    workers = args.workers or os.cpu_count() or 1
+    try:
+        asyncio.run(serve(args.host, args.port, workers, args.queue,
+                          args.max_cells))
+    except KeyboardInterrupt:
+        print("Server stopped")
+
+
+def run_convert(args: argparse.Namespace) -> None:
+    """Convert a maze between the hexa text and the packed format"""
+    if is_packed(args.source):
+        packed_to_text(args.source, args.destination)
+        print(f"{args.source} -> {args.destination} (text)")
+    else:
+        text_to_packed(args.source, args.destination)
+        print(f"{args.source} -> {args.destination} (packed)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Headless entry point:
+        python -m mazegen generate config.txt [-n N] [-j WORKERS]
+                                                [--stream]
+        python -m mazegen convert source destination
+        python -m mazegen serve [--port PORT] [-j WORKERS] [--queue N]
+                                [--max-cells N]
+
+    Curses is never imported, so the maze size is not limited
+    by the terminal and it can run without one.
+
+    Returns:
+        int: Exit status of the command
+    """
+    parser = argparse.ArgumentParser(prog="python -m mazegen")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate",
+                                   help="generate mazes without display")
+    generate.add_argument("config", help="config file (config.txt format)")
+    generate.add_argument("-n", "--count", type=int, default=1,
+                          help="number of mazes to generate (default 1)")
+    generate.add_argument("-j", "--workers", type=int, default=1,
+                          help="number of processes, 0 for all cores "
+                          "(default 1)")
+    generate.add_argument("--stream", action="store_true",
+                          help="write eller mazes (seed ending by 4) row "
+                          "by row, with the memory of one row: no path "
+                          "line, LOOP_RATIO only (default above "
+                          f"{STREAM_CELLS} cells)")
+    generate.set_defaults(run=run_generate)
+
+    serve = commands.add_parser("serve",
+                                help="serve mazes over HTTP (localhost)")
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="address to listen on (default %(default)s)")
+    serve.add_argument("--port", type=int, default=4242,
+                       help="port to listen on (default %(default)s)")
+    serve.add_argument("-j", "--workers", type=int, default=1,
+                       help="number of processes, 0 for all cores "
+                       "(default 1)")
+    serve.add_argument("--queue", type=int, default=64,
+                       help="mazes waiting for a worker before answering "
+                       "503 (default %(default)s)")
+    # Same default as server.MAX_CELLS (not imported, see run_serve())
+    serve.add_argument("--max-cells", type=int, default=1000 * 1000,
+                       help="biggest maze accepted, width * height "
+                       "(default %(default)s)")
+    serve.set_defaults(run=run_serve)
+
+    convert = commands.add_parser("convert",
+                                  help="convert between text and packed "
+                                  "maze files (direction is detected)")
+    convert.add_argument("source", help="maze file to read")
+    convert.add_argument("destination", help="maze file to write")
+    convert.set_defaults(run=run_convert)
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        if args.count < 1:
+            parser.error("--count need to be a positive int")
+        if args.workers < 0:
+            parser.error("--workers need to be a positive int")
+    if args.command == "serve":
+        if args.workers < 0:
+            parser.error("--workers need to be a positive int")
+        if args.queue < 1:
+            parser.error("--queue need to be a positive int")
+        if args.max_cells < 1:
+            parser.error("--max-cells need to be a positive int")
+
+    try:
+        args.run(args)
+    except FileNotFoundError as e:
+        print(f"No such file: {e.filename}, No run!")
+        return 1
+    except PermissionError as e:
+        print(f"Can't access the file, permission denied: {e.filename}")
+        return 1
+    except (ParsingError, ValueError) as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+from mazegen.generate import MazeGenerator, LOOP_RATIO
+from mazegen.eller import ELLER, save_eller
+from mazegen.division import DIVISION
+from mazegen.cache import MazeCache, CACHE_SIZE
+from mazegen.parsing import ParsingResult
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TypedDict
+import os
+import random
+import time
+
+
+# Eller's mazes bigger than this (width * height) are streamed to the
+# file (save_eller()) even without --stream: the grid, the BFS and the
+# path of the maze would not fit in memory
+STREAM_CELLS = 100 * 1000 * 1000
+
+
+class BatchReport(TypedDict):
+    """
+    Summary of a batch generation.
+
+    Keys:
+        mazes (int): Number of mazes generated and saved.
+        cells (int): Total number of cells generated.
+        seconds (float): Wall time of the whole batch.
+        files (list[str]): Files written, in job order.
+        seeds (list[int]): Seed (seed * 10 + algo) of each job.
+    """
+    mazes: int
+    cells: int
+    seconds: float
+    files: list[str]
+    seeds: list[int]
+
+
+def output_name(filename: str, index: int, count: int) -> str:
+    """
+    Name of the output file of the maze number 'index'.
+
+    A single maze keep the config filename, otherwise the index
+    is added before the extension (output.txt -> output_3.txt).
+
+    Args:
+        filename (str): OUTPUT_FILE from the config
+        index (int): Number of the maze in the batch
+        count (int): Size of the batch
+    """
+    if count == 1:
+        return filename
+    root, ext = os.path.splitext(filename)
+    return f"{root}_{index}{ext}"
+
+
+def job_seeds(seed: int | None, count: int) -> list[int]:
+    """
+    Give each job its own seed, in the save_seed() format (seed * 10 + algo)
+
+    Job i get the seed that the i-th 'g' press would use, so the result
+    only depend on the config seed, never on the workers.
+
+    Args:
+        seed (Optional[int]): SEED from the config, random if None
+        count (int): Number of jobs
+
+    Returns:
+        seeds (list[int]): One seed per job
+    """
+    if seed is None:
+        # Same range and default algo as MazeGenerator
+        seed = random.randint(1000, 5000) * 10
+    base, algo = divmod(seed, 10)
+    return [(base + index) * 10 + algo for index in range(count)]
+
+
+@lru_cache(maxsize=1)
+def job_maze(width: int, height: int, entry: tuple[int, int],
+             exit: tuple[int, int], loop_ratio: float = LOOP_RATIO,
+             loops: int | None = None, cache_dir: str | None = None,
+             cache_size: int = CACHE_SIZE) -> MazeGenerator:
+    """
+    Generator shared by the jobs of a process with the same maze settings.
+
+    apply_algo() then reset its grid in place, the arrays are
+    allocated once per process instead of once per maze. With a
+    cache_dir (CACHE_DIR), the workers share the cache directory.
+    """
+    cache = None
+    if cache_dir is not None:
+        cache = MazeCache(cache_dir, cache_size * 1024 * 1024)
+    return MazeGenerator(width, height, entry, exit,
+                         loop_ratio=loop_ratio, loops=loops, cache=cache)
+
+
+def is_streamed(config: ParsingResult, algo: int,
+                stream: bool = False) -> bool:
+    """
+    Whether a maze is streamed row by row to its file (save_eller())
+    instead of generated with apply_algo() and saved with save_maze().
+
+    Only Eller's mazes (algo 4) can be streamed, when asked (stream)
+    or when they have more than STREAM_CELLS cells.
+
+    Raises:
+        ValueError: If the streamed maze is not perfect and has LOOPS,
+                    the number of loops is unknown before the last row.
+
+    Args:
+        config (ParsingResult): The parsed config file
+        algo (int): Algorithm of the maze (last digit of the seed)
+        stream (bool): True if the user asked for streamed mazes
+
+    Returns:
+        bool: True if the maze is streamed
+    """
+    if algo != ELLER or not (
+            stream or config['width'] * config['height'] > STREAM_CELLS):
+        return False
+    if not config['perfect'] and config.get('loops') is not None:
+        raise ValueError("LOOPS can't be used by a streamed eller maze, "
+                         "use LOOP_RATIO instead")
+    return True
+
+
+def generate_job(config: ParsingResult, seed: int, filename: str,
+                 workers: int = 1, stream: bool = False) -> str:
+    """
+    Generate one maze and write it directly to its file.
+
+    Run in the worker process, only the filename go back to the parent.
+    Mazes are generated by apply_algo() and saved by save_maze(), like
+    in the UI. Streamed Eller's mazes (see is_streamed()) are written
+    row by row to the file instead (save_eller()), so their height is
+    not limited by the memory, but their path line is empty, their
+    loops come from open_dead_ends() and they are never cached.
+    Recursive division mazes (algo 3) can use workers themselves.
+
+    Raises:
+        ValueError: If a streamed maze has LOOPS (see is_streamed())
+
+    Args:
+        config (ParsingResult): The parsed config file
+        seed (int): Seed of this job (seed * 10 + algo)
+        filename (str): Where to save the maze
+        workers (int): Processes carving the chambers of a recursive
+                       division maze (same maze whatever the number)
+        stream (bool): Stream Eller's mazes whatever their size
+
+    Returns:
+        filename (str): The file written
+    """
+    base, algo = divmod(seed, 10)
+    if is_streamed(config, algo, stream):
+        save_eller(filename, config['width'], config['height'],
+                   config['entry'], config['exit'], base, config['perfect'],
+                   config.get('loop_ratio', LOOP_RATIO))
+        return filename
+    maze = job_maze(config['width'], config['height'],
+                    config['entry'], config['exit'],
+                    config.get('loop_ratio', LOOP_RATIO), config.get('loops'),
+                    config.get('cache_dir'),
+                    config.get('cache_size', CACHE_SIZE))
+    # Same as MazeGenerator(..., seed): the last digit is the algo
+    maze.seed, maze.algo = base, algo
+    if algo == DIVISION:
+        maze.apply_algo(config['perfect'], workers=workers)
+    else:
+        maze.apply_algo(config['perfect'])
+    maze.save_maze(filename)
+    return filename
+
+
+def generate_mazes(config: ParsingResult, count: int = 1,
+                   workers: int = 1, stream: bool = False) -> BatchReport:
+    """
+    Generate 'count' mazes from a parsed config and save each of them.
+
+    Never touch the displayer (and curses), so it can run headless.
+    With more than one worker, jobs are spread over a process pool,
+    each worker write its mazes itself. A single recursive division
+    maze spread its chambers over the workers instead. The seed of
+    each job is fixed before (job_seeds()), so files are the same
+    whatever the workers.
+
+    Args:
+        config (ParsingResult): The parsed config file
+        count (int): How much mazes to generate
+        workers (int): Number of processes, 1 to stay in this process
+        stream (bool): Stream Eller's mazes row by row to their file,
+                       whatever their size (see is_streamed())
+
+    Raises:
+        ValueError: If a streamed maze has LOOPS (see is_streamed())
+
+    Returns:
+        report (BatchReport): Number of mazes/cells and time spent
+    """
+    start = time.perf_counter()
+    seeds = job_seeds(config.get('seed'), count)
+    # Checked before any job: a bad config fails before the pool starts
+    is_streamed(config, seeds[0] % 10, stream)
+    names = [output_name(config['output_file'], index, count)
+             for index in range(count)]
+
+    if workers == 1 or count == 1:
+        files = [generate_job(config, seed, name, workers, stream)
+                 for seed, name in zip(seeds, names)]
+    else:
+        # Send jobs by chunks so small mazes don't wait on the pipe
+        chunksize = max(1, count // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            files = list(executor.map(generate_job, [config] * count,
+                                      seeds, names, [1] * count,
+                                      [stream] * count, chunksize=chunksize))
+
+    return {
+        'mazes': count,
+        'cells': count * config['width'] * config['height'],
+        'seconds': time.perf_counter() - start,
+        'files': files,
+        'seeds': seeds
+    }
@@ -0,0 +1,247 @@
+from collections import OrderedDict
+from contextlib import suppress
+from mazegen.parsing import ParsingResult
+from typing import TypedDict
+import hashlib
+import os
+import tempfile
+
+
+# Default size limit of the cache directory (CACHE_SIZE key, in MiB)
+CACHE_SIZE = 256
+
+# Part of the key, changed when the stored format or the algorithms
+# change so old entries are never read back
+CACHE_VERSION = 1
+
+# Extension of the entries (packed.py format)
+ENTRY_EXT = ".amz"
+
+
+class CacheReport(TypedDict):
+    """
+    Counters of a MazeCache.
+
+    Keys:
+        hits (int): Mazes read from the cache
+        misses (int): Mazes not found (generated then stored)
+        invalid (int): Entries found but unreadable, removed
+        evictions (int): Entries removed to stay under max_bytes
+        entries (int): Entries known by this process
+        bytes (int): Their total size
+        max_bytes (int): Size limit of the directory
+    """
+    hits: int
+    misses: int
+    invalid: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+def maze_key(width: int, height: int, entry: tuple[int, int],
+             exit: tuple[int, int], perfect: bool, seed: int,
+             loop_ratio: float, loops: int | None) -> str:
+    """
+    Content address of a maze: hash of everything that decide it.
+
+    The loop settings only change imperfect mazes, a perfect maze has
+    the same key whatever they are.
+
+    Args:
+        width (int): Maze width
+        height (int): Maze height
+        entry (tuple[int, int]): Entry coordinate
+        exit (tuple[int, int]): Exit coordinate
+        perfect (bool): Whether the maze is perfect
+        seed (int): Seed of the maze (seed * 10 + algo)
+        loop_ratio (float): Part of the dead ends opened if not perfect
+        loops (Optional[int]): Walls opened if not perfect, or None
+
+    Returns:
+        key (str): 32 hexa digits
+    """
+    parts: tuple[object, ...] = (CACHE_VERSION, width, height,
+                                 tuple(entry), tuple(exit), perfect, seed)
+    if not perfect:
+        parts += (loop_ratio, loops)
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16)
+    return digest.hexdigest()
+
+
+class MazeCache:
+    """
+    Directory of generated mazes, one file per key (maze_key()).
+
+    Entries are written to a temporary file then renamed (os.replace),
+    a reader never sees half a maze, even with several processes
+    sharing the directory (batch workers). A hit touch the file, the
+    least recently used ones are removed once the directory is bigger
+    than max_bytes.
+
+    Each process only counts the entries it knows (scanned at start,
+    written or read since): the directory is scanned again before
+    evicting, so several processes can go over max_bytes by what they
+    wrote since their last scan, never more.
+
+    Attributes:
+        directory (str): Where the entries are
+        max_bytes (int): Size limit of the directory
+        entries (OrderedDict[str, int]): Size of each key, least
+                                         recently used first
+        size (int): Sum of the entries
+        hits (int): Mazes read from the cache
+        misses (int): Mazes not found
+        invalid (int): Unreadable entries removed
+        evictions (int): Entries removed to stay under max_bytes
+    """
+    def __init__(self, directory: str,
+                 max_bytes: int = CACHE_SIZE * 1024 * 1024) -> None:
+        """
+        Create the directory if needed and index its entries.
+
+        Args:
+            directory (str): Where the entries are stored
+            max_bytes (int): Size limit of the directory
+
+        Raises:
+            ValueError: If max_bytes is not positive
+        """
+        if max_bytes <= 0:
+            raise ValueError("The cache size need to be positive")
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.entries: OrderedDict[str, int] = OrderedDict()
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.invalid: int = 0
+        self.evictions: int = 0
+        os.makedirs(directory, exist_ok=True)
+        self.scan()
+
+    def path(self, key: str) -> str:
+        """File of the entry 'key'"""
+        return os.path.join(self.directory, key + ENTRY_EXT)
+
+    def scan(self) -> None:
+        """Index the entries of the directory, oldest use first"""
+        found = []
+        with os.scandir(self.directory) as files:
+            for file in files:
+                if not file.name.endswith(ENTRY_EXT):
+                    continue
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    # Evicted by another process meanwhile
+                    continue
+                found.append((stat.st_mtime, file.name[:-len(ENTRY_EXT)],
+                              stat.st_size))
+        found.sort()
+        self.entries = OrderedDict((key, size) for _, key, size in found)
+        self.size = sum(self.entries.values())
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Read an entry, and mark it as recently used.
+
+        Args:
+            key (str): maze_key() of the maze
+
+        Returns:
+            data (Optional[bytes]): The stored maze, None if missing
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            if key in self.entries:
+                self.size -= self.entries.pop(key)
+            return None
+        self.hits += 1
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        else:
+            # Written by another process
+            self.entries[key] = len(data)
+            self.size += len(data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store an entry atomically, then evict if the cache is too big.
+
+        Args:
+            key (str): maze_key() of the maze
+            data (bytes): The encoded maze
+        """
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(temporary)
+            raise
+        self.size += len(data) - self.entries.pop(key, 0)
+        self.entries[key] = len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def discard(self, key: str) -> None:
+        """
+        Remove an unreadable entry, it will be generated again.
+
+        The get() that returned it is counted as a miss.
+        """
+        self.invalid += 1
+        self.hits -= 1
+        self.misses += 1
+        with suppress(FileNotFoundError):
+            os.remove(self.path(key))
+        if key in self.entries:
+            self.size -= self.entries.pop(key)
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the directory
+        fit in max_bytes (the last entry written is always kept).
+        """
+        self.scan()
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            with suppress(FileNotFoundError):
+                os.remove(self.path(key))
+            self.evictions += 1
+
+    def report(self) -> CacheReport:
+        """Snapshot of the counters"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalid': self.invalid,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes
+        }
+
+
+def config_cache(config: ParsingResult) -> MazeCache | None:
+    """
+    Cache asked by the config file (CACHE_DIR, CACHE_SIZE in MiB).
+
+    Returns:
+        cache (Optional[MazeCache]): None if there is no CACHE_DIR
+    """
+    if 'cache_dir' not in config:
+        return None
+    return MazeCache(config['cache_dir'],
+                     config.get('cache_size', CACHE_SIZE) * 1024 * 1024)
@@ -0,0 +1,76 @@
+from array import array
+
+
+class DisjointSet:
+    """
+    Disjoint-set forest (union-find) over the cells index.
+
+    Each cell start in its own set, union() merge two sets.
+    Use path compression (halving) and union by rank, so find() and union()
+    are almost O(1) (inverse Ackermann).
+
+    Attributes:
+        parent (array[int]): Parent of each cell, a root is its own parent
+        rank (bytearray): Upper bound of the height of each tree
+        count (int): Number of disjoint sets left
+    """
+    def __init__(self, size: int) -> None:
+        """
+        Initialise 'size' singleton sets.
+
+        Args:
+            size (int): Number of elements (cells)
+        """
+        self.parent: array[int] = array('i', range(size))
+        self.rank: bytearray = bytearray(size)
+        self.count: int = size
+
+    def find(self, element: int) -> int:
+        """
+        Return the root of the set containing element.
+
+        Path compression by halving: every node on the way is re-attached
+        to its grandparent, so the next searches are shorter.
+
+        Args:
+            element (int): The element to look for
+
+        Return:
+            root (int): The representative of the set
+        """
+        parent = self.parent
+        while parent[element] != element:
+            parent[element] = element = parent[parent[element]]
+        return element
+
+    def union(self, element_1: int, element_2: int) -> bool:
+        """
+        Merge the sets containing element_1 and element_2.
+
+        The shorter tree is attached under the taller one (union by rank)
+
+        Args:
+            element_1 (int): Element of the first set
+            element_2 (int): Element of the second set
+
+        Return:
+            bool: True if two sets were merged,
+                  False if they were already the same set
+        """
+        parent = self.parent
+        # Same as find(), inlined because union() is the hot loop
+        # of the generation
+        while parent[element_1] != element_1:
+            parent[element_1] = element_1 = parent[parent[element_1]]
+        while parent[element_2] != element_2:
+            parent[element_2] = element_2 = parent[parent[element_2]]
+        if element_1 == element_2:
+            return False
+        rank = self.rank
+        if rank[element_1] < rank[element_2]:
+            element_1, element_2 = element_2, element_1
+        parent[element_2] = element_1
+        if rank[element_1] == rank[element_2]:
+            rank[element_1] += 1
+        self.count -= 1
+        return True
@@ -1,9 +1,152 @@
 import curses
 import random
-from mazegen.cell import Cell
+import time
+from mazegen.grid import CellView, NORTH, WEST
 from mazegen.generate import MazeGenerator
 
 
+# Default total time of an animation (seconds), whatever the maze size
+ANIMATION_TIME = 3.0
+
+# Maximum number of screen updates per second during animations
+FRAME_RATE = 60
+
+# Lines needed by user_option() under the full maze
+MENU_HEIGHT = 22
+
+# Menu entry of each algorithm (maze.algo), chosen with keys 1 to 5
+ALGO_NAMES = ("Backtracking algorithm", "Prim's algorithm",
+              "kruskal algrotithm", "Recursive division",
+              "Eller's algorithm")
+
+# Short legend, on the last line in viewport mode
+LEGEND = ("arrows: move  hjkl: pan  1-5: algo ({})  g/a: generate  "
+          "c/f: colors  p: path  s: seed  q: quit")
+
+# What change the look of a cell, bits of its tile key.
+# WEST and NORTH are the wall bits themselves
+TILE_CORNER = 16        # block on the top left corner
+TILE_LEFT_PATH = 32     # cell on the left is in the path
+TILE_UP_PATH = 64       # cell above is in the path
+TILE_RIGHT = 128        # last column, right border
+TILE_BOTTOM = 256       # last row, bottom border
+TILE_RESERVED = 512
+TILE_PATH = 1024
+TILE_ENTRY = 2048
+TILE_EXIT = 4096
+
+
+def build_tile(key: int) -> list[tuple[int, int, str, int]]:
+    """
+    Draw a kind of cell once, as text segments with their color pair.
+
+    Segments next to each other with the same color are merged,
+    so a cell is written with as few addstr() as possible.
+
+    Args:
+        key (int): Tile key, wall bits and TILE_* flags
+
+    Returns:
+        tile (list[tuple[int, int, str, int]]): (line, column, text,
+                                                color pair) from the
+                                                top left of the cell
+    """
+    if key & (TILE_ENTRY | TILE_EXIT):
+        segments = special_segments(key, 8 if key & TILE_ENTRY else 7)
+    else:
+        segments = cell_segments(key)
+
+    tile: list[tuple[int, int, str, int]] = []
+    for dy, dx, text, pair in sorted(segments):
+        if tile:
+            last_y, last_x, last_text, last_pair = tile[-1]
+            if (last_y == dy and last_pair == pair
+                    and last_x + len(last_text) == dx):
+                tile[-1] = (dy, last_x, last_text + text, pair)
+                continue
+        tile.append((dy, dx, text, pair))
+    return tile
+
+
+def cell_segments(key: int) -> list[tuple[int, int, str, int]]:
+    """Segments of a cell that is not the entry or the exit"""
+    reserved = bool(key & TILE_RESERVED)
+    path = bool(key & TILE_PATH)
+
+    col = 1
+    # Change the color pair to use based on the nature of the cell
+    if reserved:
+        col = 2
+    elif path:
+        col = 3
+
+    # The path start here, its left side has the maze background
+    path_edge = path and not key & TILE_LEFT_PATH
+    segments = []
+    for i in range(2):
+        if key & WEST:
+            segments.append((i, 0, "█", col))
+        elif i == 0 and not reserved and key & TILE_CORNER:
+            segments.append((i, 0, "▀", 1 if path_edge else col))
+        elif path_edge:
+            segments.append((i, 0, " ", 1))
+        elif path and i == 0:
+            segments.append((i, 0, "▀", 9))
+        else:
+            segments.append((i, 0, " ", col))
+
+        if i == 0 and key & NORTH:
+            segments.append((i, 1, "▀▀▀", col))
+        elif i == 0 and path and not key & TILE_UP_PATH:
+            segments.append((i, 1, "▀▀▀", 9))
+        else:
+            segments.append((i, 1, "   ", col))
+
+        if key & TILE_RIGHT:
+            segments.append((i, 4, "█", col))
+
+    # Border bottom
+    if key & TILE_BOTTOM:
+        segments.append((2, 0, "▀▀▀▀▀", 6))
+    return segments
+
+
+def special_segments(key: int, col: int) -> list[tuple[int, int, str, int]]:
+    """
+    Segments of the entry (col 8) or the exit (col 7),
+    edge cases with the path around them.
+    """
+    segments = []
+    if key & WEST:
+        segments.append((0, 0, "█", 1))
+        segments.append((1, 0, "█", 1))
+    else:
+        # Is there a path on left or background color
+        color = 3 if key & TILE_LEFT_PATH else 1
+        segments.append((0, 0, "▀" if key & TILE_CORNER else " ", color))
+        segments.append((1, 0, " ", color))
+
+    if key & NORTH:
+        segments.append((0, 1, "▀▀▀", col - 3))
+    else:
+        # Is there a path on top or background color
+        segments.append((0, 1, "▀▀▀",
+                         col + 3 if key & TILE_UP_PATH else col))
+
+    # Middle section
+    segments.append((1, 1, "   ", col))
+
+    if key & TILE_RIGHT:
+        # Border right
+        segments.append((0, 4, "█", 1))
+        segments.append((1, 4, "█", 1))
+
+    if key & TILE_BOTTOM:
+        # Border bottom
+        segments.append((2, 0, "▀▀▀▀▀", 6))
+    return segments
+
+
 class ShowMaze:
     """
     Render maze generation/solving progress to a curses screen.
@@ -11,6 +154,8 @@ class ShowMaze:
     Args:
         screen (curses.window): Screen to display on
         colorist (ColorManager): Manage colors
+        duration (float): Total time of an animation in seconds
+        fps (int): Maximum screen updates per second while animating
 
     Inner Class:
         ColorManager: Store and manage the colors of each maze's elements
@@ -20,6 +165,17 @@ class ShowMaze:
         user_options(): Display user options
         display_grid(): Display the entire grid
         update_cell(): Display/update the cell given in parameter
+
+        viewport (maze bigger than the terminal):
+            fit(): Choose full maze or viewport from the terminal size
+            follow(): Keep the view centred on the player
+            pan(): Move the view
+
+        animations:
+            start_animation(): Spread the next steps over 'duration'
+            step(): One step done, flush the frame when it's time
+            flush(): Draw the dirty cells and update the terminal
+            end_animation(): Flush and go back to direct drawing
     """
 
     class ColorManager:
@@ -122,17 +278,44 @@ class ShowMaze:
                 curses.init_pair(10, c4, c5)
                 return
 
-    def __init__(self, screen: curses.window,
-                 seed: int | None = None) -> None:
+    def __init__(self, screen: curses.window, seed: int | None = None,
+                 duration: float = ANIMATION_TIME,
+                 fps: int = FRAME_RATE) -> None:
         """
         Initialize the maze renderer with a curses screen and color seed.
 
         Args:
             screen (curses.window): Screen to display on
             colorist (ColorManager): Manage colors
+            duration (float): Total time of an animation in seconds
+            fps (int): Maximum screen updates per second while animating
         """
         self.screen = screen
         self.colorist = self.ColorManager(seed)
+        self.duration: float = duration
+        self.fps: int = fps
+
+        # Animation state: cells to draw at the next frame (by index,
+        # a cell updated twice in a frame is drawn once)
+        self.animating: bool = False
+        self.dirty: dict[int, CellView] = {}
+        self.maze: MazeGenerator | None = None
+        self.steps: int = 0
+        self.frame_steps: float = 1.0
+        self.frame_time: float = 0.0
+        self.next_flush: float = 0.0
+        self.next_frame: float = 0.0
+
+        # Visible part of the maze, in cells. Without viewport,
+        # it's the whole maze
+        self.viewport: bool = False
+        self.view_x: int = 0
+        self.view_y: int = 0
+        self.view_width: int = 0
+        self.view_height: int = 0
+
+        # Drawing of each kind of cell, see build_tile()
+        self.tiles: dict[int, tuple[tuple[int, int, str, int], ...]] = {}
 
     def switch_colors(self, element: str = "maze") -> None:
         """Delegate color cycling to the helper color manager."""
@@ -140,23 +323,21 @@ class ShowMaze:
 
     def user_option(self, maze: MazeGenerator) -> None:
         """Print the interactive help legend under the rendered maze."""
+        if self.viewport:
+            # No room under the maze, a single line at the bottom
+            lines, cols = self.screen.getmaxyx()
+            self.screen.move(lines - 1, 0)
+            self.screen.clrtoeol()
+            self.screen.addnstr(LEGEND.format(maze.algo + 1), cols - 1)
+            return
         self.screen.move(maze.height * 2 + 1, 0)
         self.screen.addstr("\nchoose the algo then use "
                            "'g' or 'a' to generate\n\n")
-        if maze.algo == 0:
-            self.screen.addstr("1: Backtracking algorithm   <---\n")
-            self.screen.addstr("2: Prim's algorithm\n")
-            self.screen.addstr("3: kruskal algrotithm\n")
-        elif maze.algo == 1:
-            self.screen.addstr("1: Backtracking algorithm\n")
-            self.screen.addstr("2: Prim's algorithm         <---\n")
-            self.screen.addstr("3: kruskal algrotithm\n")
-        elif maze.algo == 2:
-            self.screen.addstr("1: Backtracking algorithm\n")
-            self.screen.addstr("2: Prim's algorithm\n")
-            self.screen.addstr("3: kruskal algrotithm       <---\n")
-
-        self.screen.move(maze.height * 2 + 8, 0)
+        for algo, name in enumerate(ALGO_NAMES):
+            arrow = "<---" if algo == maze.algo else ""
+            self.screen.addstr(f"{algo + 1}: {name:<26}{arrow}\n")
+
+        self.screen.move(maze.height * 2 + 10, 0)
         self.screen.addstr("↑: move up\n")
         self.screen.addstr("↓: move down\n")
         self.screen.addstr("←: move left\n")
@@ -169,169 +350,248 @@ class ShowMaze:
         self.screen.addstr("s: Save maze seed to .txt file\n")
         self.screen.addstr("q: quit\n")
 
-    def add(self, text: str, c: int) -> None:
-        """Write 'text' with the given color pair index 'c'."""
-        self.screen.addstr(text, curses.color_pair(c))
+    def start_animation(self, maze: MazeGenerator, steps: int,
+                        duration: float | None = None) -> None:
+        """
+        Start an animation of about 'steps' steps lasting 'duration'.
+
+        Updated cells are collected, then drawn and shown at most
+        'fps' times per second, the pace is kept by step() so the
+        total time doesn't depend on the maze size. Steps done after
+        'steps' keep the same pace.
+
+        Args:
+            maze (MazeGenerator): The maze to draw the cells of
+            steps (int): Number of step() calls expected
+            duration (Optional[float]): Total time, self.duration if None
+        """
+        if duration is None:
+            duration = self.duration
+        steps = max(1, steps)
+        frames = max(1, min(steps, int(duration * self.fps)))
+        self.fit(maze)
+        self.animating = True
+        self.maze = maze
+        self.dirty.clear()
+        self.steps = 0
+        self.frame_steps = steps / frames
+        self.frame_time = duration / frames
+        self.next_flush = self.frame_steps
+        self.next_frame = time.perf_counter()
+
+    def step(self) -> None:
+        """
+        One step of the animation is done (a wall destroyed, a path cell).
+
+        When enough steps are done for a frame, draw it and wait for
+        the frame time: the only sleep of the animation.
+        """
+        if not self.animating:
+            return
+        self.steps += 1
+        if self.steps < self.next_flush:
+            return
+        self.flush()
+        self.next_flush += self.frame_steps
+        self.next_frame += self.frame_time
+        delay = self.next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Late (slow algorithm): don't rush the next frames
+            self.next_frame -= delay
+
+    def flush(self) -> None:
+        """Draw the dirty cells and update the terminal once"""
+        if self.dirty and self.maze is not None:
+            for cell in self.dirty.values():
+                self.draw_cell(cell, self.maze)
+            self.dirty.clear()
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def end_animation(self) -> None:
+        """Show the last frame, cells are drawn directly again"""
+        if self.animating:
+            self.flush()
+        self.animating = False
+        self.maze = None
+
+    def fit(self, maze: MazeGenerator) -> None:
+        """
+        Use the viewport if the maze and its menu don't fit in the
+        terminal, and compute how much cells are visible.
+
+        Args:
+            maze (MazeGenerator): The maze to display
+        """
+        lines, cols = self.screen.getmaxyx()
+        was_viewport = self.viewport
+        # A cell is 4x2 characters, +1 column and line for the borders
+        self.viewport = (maze.width * 4 + 1 > cols
+                         or maze.height * 2 + MENU_HEIGHT > lines)
+        if not self.viewport:
+            self.view_x = self.view_y = 0
+            self.view_width = maze.width
+            self.view_height = maze.height
+            return
+        # Keep the last line for the legend, and one for the bottom border
+        self.view_width = max(1, min(maze.width, (cols - 1) // 4))
+        self.view_height = max(1, min(maze.height, (lines - 2) // 2))
+        if not was_viewport:
+            self.view_x, self.view_y = self.centre(maze)
+        self.move_view(maze, self.view_x, self.view_y)
+
+    def centre(self, maze: MazeGenerator) -> tuple[int, int]:
+        """Return the view origin that puts the player in the middle"""
+        return (maze.start[0] - self.view_width // 2,
+                maze.start[1] - self.view_height // 2)
+
+    def move_view(self, maze: MazeGenerator, x: int, y: int) -> bool:
+        """
+        Move the view origin to (x, y), kept inside the maze.
+
+        Returns:
+            bool: True if the view moved
+        """
+        x = max(0, min(x, maze.width - self.view_width))
+        y = max(0, min(y, maze.height - self.view_height))
+        moved = (x, y) != (self.view_x, self.view_y)
+        self.view_x, self.view_y = x, y
+        return moved
+
+    def follow(self, maze: MazeGenerator) -> None:
+        """
+        Centre the view on the player (entry), after it moved.
+
+        Only the visible cells are redrawn, so it costs the size
+        of the terminal whatever the size of the maze.
+        """
+        if self.viewport and self.move_view(maze, *self.centre(maze)):
+            self.draw_view(maze)
+
+    def pan(self, maze: MazeGenerator, x: int, y: int) -> None:
+        """
+        Move the view by half a screen in the direction (x, y).
+
+        Args:
+            x (int): -1 left, 1 right
+            y (int): -1 up, 1 down
+        """
+        if self.viewport and self.move_view(
+                maze, self.view_x + x * max(1, self.view_width // 2),
+                self.view_y + y * max(1, self.view_height // 2)):
+            self.draw_view(maze)
+
+    def visible(self, cell: CellView) -> bool:
+        """Whether the cell is in the view"""
+        return (self.view_x <= cell.x < self.view_x + self.view_width
+                and self.view_y <= cell.y < self.view_y + self.view_height)
+
+    def draw_view(self, maze: MazeGenerator) -> None:
+        """Erase the screen and draw the visible cells (no refresh)"""
+        self.screen.erase()
+        self.draw_cells(maze)
+
+    def draw_cells(self, maze: MazeGenerator) -> None:
+        """Draw the visible cells, row by row"""
+        grid = maze.grid
+        for y in range(self.view_y, self.view_y + self.view_height):
+            row = y * grid.width
+            for x in range(self.view_x, self.view_x + self.view_width):
+                self.draw_index(row + x, maze)
 
     def display_grid(self, maze: MazeGenerator) -> None:
-        """Render an entire maze at once without animations."""
+        """
+        Render the maze at once without animations, only the
+        visible part if it doesn't fit in the terminal.
+        """
+        # Everything is redrawn, pending cells are useless
+        self.dirty.clear()
+        self.animating = False
+        self.maze = None
+        self.fit(maze)
         self.screen.clear()
         self.screen.move(0, 0)
-        for rows in maze.grid:
-            for cell in rows:
-                self.update_cell(cell, maze, animate=False)
+        self.draw_cells(maze)
         self.screen.refresh()
 
-    def update_cell(self, cell: Cell, maze: MazeGenerator,
+    def update_cell(self, cell: CellView, maze: MazeGenerator,
                     animate: bool = True) -> None:
         """
-        Redraw a single cell, optionally refreshing the screen immediately.
+        Redraw a single cell.
+
+        During an animation the cell is only marked dirty, it is drawn
+        at the next frame. Otherwise it is drawn in the window, the
+        terminal is updated by the next flush() or getch().
 
-        cell (Cell): Cell to display
+        cell (CellView): Cell to display
         maze (MazeGenerator): The maze (for entry, exit, size etc..)
-        animate (bool): Whether to refresh screen immediately
+        animate (bool): False to draw now even during an animation
         """
-        # Condition to display a little block on top
-        corner = False
-        if (cell.walls['north'] or
-                any((n.x == cell.x - 1 and n.walls['north']) or
-                    (n.y == cell.y - 1 and n.walls['west'])
-                    for n in cell.neighbours)):
-            corner = True
-
-        if cell == maze.grid[maze.start[1]][maze.start[0]]:
-            self.draw_special(cell, maze, 8, corner)
+        if not self.visible(cell):
             return
-        elif cell == maze.grid[maze.end[1]][maze.end[0]]:
-            self.draw_special(cell, maze, 7, corner)
+        if animate and self.animating:
+            self.dirty[cell.index] = cell
             return
+        self.draw_cell(cell, maze)
 
-        col = 1
-        # Change the color pair to use based on the nature of the cell
-        if cell.reserved:
-            col = 2
-
-        elif cell.path:
-            col = 3
-
-        # Size of cell = 4x2
-        draw_x = cell.x * 4
-        draw_y = cell.y * 2
-
-        # Build the two rows as strings
-        rows = []
-        for i in range(2):
-            # Store here, display later at once
-            line = []
-
-            if cell.walls['west']:
-                line.append(("█", col))
-            elif i == 0 and not cell.reserved and corner:
-                # path or not
-                if (cell.path and cell.x > 0
-                        and not maze.grid[cell.y][cell.x - 1].path):
-                    line.append(("▀", 1))
-                else:
-                    line.append(("▀", col))
-            else:
-                # path or not
-                if (cell.path and cell.x > 0
-                        and not maze.grid[cell.y][cell.x - 1].path):
-                    line.append((" ", 1))
-                elif cell.path and i == 0:
-                    line.append(("▀", 9))
-                else:
-                    line.append((" ", col))
-
-            if i == 0:
-                if cell.walls['north']:
-                    line.append(("▀▀▀", col))
-                else:
-                    # path or not
-                    if (cell.path and cell.y > 0
-                            and not maze.grid[cell.y - 1][cell.x].path):
-                        line.append(("▀▀▀", 9))
-                    else:
-                        line.append(("   ", col))
-            else:
-                line.append(("   ", col))
-
-            if cell.x == maze.width - 1:
-                line.append(("█", col))
-
-            rows.append(line)
-
-        # Draw rows at once (no multiple calls)
-        for i, row in enumerate(rows):
-            self.screen.move(draw_y + i, draw_x)
-            for ch, color in row:
-                self.add(ch, color)
-
-        # Border bottom
-        if cell.y == maze.height - 1:
-            self.screen.move(draw_y + 2, draw_x)
-            self.add("▀▀▀▀▀", 6)
+    def draw_cell(self, cell: CellView, maze: MazeGenerator) -> None:
+        """
+        Draw a cell in the window (no terminal update).
 
-        if animate:
-            self.screen.refresh()
+        cell (CellView): Cell to display
+        maze (MazeGenerator): The maze (for entry, exit, size etc..)
+        """
+        self.draw_index(cell.index, maze)
 
-    def draw_special(self, cell: Cell, maze: MazeGenerator, col: int,
-                     corner: bool) -> None:
+    def draw_index(self, index: int, maze: MazeGenerator) -> None:
         """
-        Handling edge cases with entry exit and path
+        Draw the cell at 'index': its tile is looked up from what
+        change its look, then written with one addstr per color.
 
-        cell (Cell): Cell to process
-        maze (MazeGenerator): The maze to access the grid
-        col (int): the color to base on the cell
+        index (int): Index of the cell in the grid
+        maze (MazeGenerator): The maze (for entry, exit, size etc..)
         """
-        color: int
-        draw_x = cell.x * 4
-        draw_y = cell.y * 2
-
-        if cell.walls['west']:
-            self.screen.addstr(draw_y, draw_x, "█",
-                               curses.color_pair(1))
-            self.screen.addstr(draw_y + 1, draw_x, "█",
-                               curses.color_pair(1))
-        else:
-            # Is there a path on left or background color
-            color = (3 if cell.x > 0 and maze.grid[cell.y][cell.x - 1].path
-                     else 1)
-            if corner:
-                self.screen.addstr(draw_y, draw_x, "▀",
-                                   curses.color_pair(color))
-            else:
-                self.screen.addstr(draw_y, draw_x, " ",
-                                   curses.color_pair(color))
-            self.screen.addstr(draw_y + 1, draw_x, " ",
-                               curses.color_pair(color))
-
-        if cell.walls['north']:
-            self.screen.addstr(draw_y, draw_x + 1, "▀▀▀",
-                               curses.color_pair(col - 3))
-        else:
-            # Is there a path on top or background color
-            color = (1 if cell.y > 0 and maze.grid[cell.y - 1][cell.x].path
-                     else 0)
-            if color:
-                self.screen.addstr(draw_y, draw_x + 1, "▀▀▀",
-                                   curses.color_pair(col + 3))
-            else:
-                self.screen.addstr(draw_y, draw_x + 1, "▀▀▀",
-                                   curses.color_pair(col))
-
-        # Middle section
-        self.screen.addstr(draw_y + 1, draw_x + 1, "   ",
-                           curses.color_pair(col))
-
-        if cell.x == maze.width - 1:
-            # Border right
-            self.screen.addstr(draw_y, draw_x + 4, "█",
-                               curses.color_pair(1))
-            self.screen.addstr(draw_y + 1, draw_x + 4, "█",
-                               curses.color_pair(1))
-
-        if cell.y == maze.height - 1:
-            # Border bottom
-            self.screen.addstr(draw_y + 2, draw_x, "▀▀▀▀▀",
-                               curses.color_pair(6))
+        grid = maze.grid
+        width = grid.width
+        walls = grid.walls
+        path = grid.path
+        y, x = divmod(index, width)
+        wall = walls[index]
+
+        key = wall & (WEST | NORTH)
+        # Condition to display a little block on top
+        if (wall & NORTH or (x > 0 and walls[index - 1] & NORTH)
+                or (y > 0 and walls[index - width] & WEST)):
+            key |= TILE_CORNER
+        if x > 0 and path[index - 1]:
+            key |= TILE_LEFT_PATH
+        if y > 0 and path[index - width]:
+            key |= TILE_UP_PATH
+        if x == width - 1:
+            key |= TILE_RIGHT
+        if y == grid.height - 1:
+            key |= TILE_BOTTOM
+        if grid.reserved[index]:
+            key |= TILE_RESERVED
+        if path[index]:
+            key |= TILE_PATH
+        if (x, y) == maze.start:
+            key |= TILE_ENTRY
+        elif (x, y) == maze.end:
+            key |= TILE_EXIT
+
+        tile = self.tiles.get(key)
+        if tile is None:
+            # Color pair numbers don't change (only their colors),
+            # so the attributes can be kept
+            tile = tuple((dy, dx, text, curses.color_pair(pair))
+                         for dy, dx, text, pair in build_tile(key))
+            self.tiles[key] = tile
+
+        # Size of cell = 4x2, from the corner of the view
+        draw_x = (x - self.view_x) * 4
+        draw_y = (y - self.view_y) * 2
+        for dy, dx, text, attr in tile:
+            self.screen.addstr(draw_y + dy, draw_x + dx, text, attr)
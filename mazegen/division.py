@@ -0,0 +1,347 @@
+from mazegen.grid import Grid, NORTH, EAST, SOUTH, WEST, ALL_WALLS
+from mazegen.disjoint_set import DisjointSet
+from mazegen.eller import reserved_rows
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Iterator
+import random
+
+
+# Algorithm digit of recursive division in the seed (seed * 10 + algo)
+DIVISION = 3
+
+# Chambers of at most this many cells are carved in one job (one worker
+# process), bigger ones are divided first. It's a constant: the maze
+# never depends on the number of workers
+CHAMBER_CELLS = 1 << 18
+
+# Translation tables destroying one wall of each cell of a slice
+OPEN: dict[int, bytes] = {
+    wall: bytes(value & ~wall for value in range(256))
+    for wall in (NORTH, EAST, SOUTH, WEST)
+}
+
+# (x, y, width, height) of a rectangle of cells
+Chamber = tuple[int, int, int, int]
+
+
+class Division:
+    """
+    Recursive division on an array of walls.
+
+    A chamber is cut in two by a wall line (across its shortest side)
+    with a single gap, then each half is divided the same way. A chamber
+    one cell wide is a corridor, all its cells are linked at once.
+    Cells start with their 4 walls closed, so only the gaps and the
+    corridors are links: the maze is perfect.
+
+    The 42 pattern can't be cut through: the box around it (one cell
+    margin, 'keep') is never crossed by a wall line, and is carved on
+    its own (random walls between its free cells, union-find) once a
+    chamber is exactly that box.
+
+    Attributes:
+        walls (bytearray): Walls of the cells, row by row
+        width (int): Cells per row of 'walls'
+        rng (random.Random): Random generator of this division
+        keep (Optional[Chamber]): Box around the 42 pattern, None if
+                                  it's not in the divided chambers
+        pattern (bytes): Reserved flags of the cells of 'keep'
+        links (Optional[list[tuple[int, int]]]): Every link in order,
+                                                 if recorded
+    """
+    def __init__(self, walls: bytearray, width: int, rng: random.Random,
+                 keep: Chamber | None = None, pattern: bytes = b"",
+                 record: bool = False) -> None:
+        """
+        Args:
+            walls (bytearray): Walls of the cells, modified in place
+            width (int): Cells per row of 'walls'
+            rng (random.Random): Random generator of this division
+            keep (Optional[Chamber]): Box around the 42 pattern
+            pattern (bytes): Reserved flags of the cells of 'keep'
+            record (bool): Keep the links in self.links (events)
+        """
+        self.walls: bytearray = walls
+        self.width: int = width
+        self.rng: random.Random = rng
+        self.keep: Chamber | None = keep
+        self.pattern: bytes = pattern
+        self.links: list[tuple[int, int]] | None = [] if record else None
+
+    def link(self, index_1: int, index_2: int) -> None:
+        """Destroy the wall between a cell and its east or south cell"""
+        if index_2 == index_1 + 1:
+            self.walls[index_1] &= ~EAST
+            self.walls[index_2] &= ~WEST
+        else:
+            self.walls[index_1] &= ~SOUTH
+            self.walls[index_2] &= ~NORTH
+        if self.links is not None:
+            self.links.append((index_1, index_2))
+
+    def corridor(self, x: int, y: int, width: int, height: int) -> None:
+        """Link all the cells of a chamber one cell wide (or high)"""
+        walls = self.walls
+        start = y * self.width + x
+        # Cells of the corridor are 1 (row) or 'width' (column) apart
+        step = 1 if height == 1 else self.width
+        length = width if height == 1 else height
+        first, second = (EAST, WEST) if height == 1 else (SOUTH, NORTH)
+        end = start + length * step
+        # Slices are translated at C speed, whatever the length
+        walls[start:end - step:step] = \
+            walls[start:end - step:step].translate(OPEN[first])
+        walls[start + step:end:step] = \
+            walls[start + step:end:step].translate(OPEN[second])
+        if self.links is not None:
+            self.links.extend((index, index + step)
+                              for index in range(start, end - step, step))
+
+    def carve_kept(self) -> None:
+        """Carve the box of the 42 pattern (a small Kruskal)"""
+        assert self.keep is not None
+        x, y, width, height = self.keep
+        pattern = self.pattern
+        pairs = []
+        for index in range(width * height):
+            if pattern[index]:
+                continue
+            if index % width < width - 1 and not pattern[index + 1]:
+                pairs.append((index, index + 1))
+            if index + width < width * height and not pattern[index + width]:
+                pairs.append((index, index + width))
+        self.rng.shuffle(pairs)
+        sets = DisjointSet(width * height)
+        offset = y * self.width + x
+        for index_1, index_2 in pairs:
+            if sets.union(index_1, index_2):
+                # Box index -> walls index
+                self.link(offset + index_1 // width * self.width
+                          + index_1 % width,
+                          offset + index_2 // width * self.width
+                          + index_2 % width)
+
+    def cuts(self, start: int, size: int, keep_start: int,
+             keep_size: int) -> list[int]:
+        """
+        Cut positions (1 to size - 1) of a chamber containing 'keep'
+        that don't go through it, on one axis.
+        """
+        return [cut for cut in range(1, size)
+                if start + cut <= keep_start
+                or start + cut >= keep_start + keep_size]
+
+    def run(self, chamber: Chamber, limit: int = 0) -> list[Chamber]:
+        """
+        Divide a chamber until every part is carved.
+
+        Args:
+            chamber (Chamber): The chamber to divide
+            limit (int): Chambers of at most 'limit' cells are not
+                         divided but returned, to be carved later
+
+        Returns:
+            chambers (list[Chamber]): The chambers left, in a fixed order
+        """
+        rng = self.rng
+        # random() is much faster than randrange(), it's the hot loop
+        rand = rng.random
+        keep = self.keep
+        stack = [chamber]
+        left: list[Chamber] = []
+        while stack:
+            chamber = stack.pop()
+            x, y, width, height = chamber
+            if width * height <= limit:
+                left.append(chamber)
+                continue
+            if chamber == keep:
+                self.carve_kept()
+                continue
+            if width < 2 or height < 2:
+                self.corridor(x, y, width, height)
+                continue
+
+            # Cut across the shortest side, random for a square
+            horizontal = (height > width if height != width
+                          else rand() < 0.5)
+            if keep and (x <= keep[0] and keep[0] + keep[2] <= x + width
+                         and y <= keep[1] and keep[1] + keep[3] <= y + height):
+                # Only between the lines of the 42 box
+                rows = self.cuts(y, height, keep[1], keep[3])
+                columns = self.cuts(x, width, keep[0], keep[2])
+                if not (rows if horizontal else columns):
+                    horizontal = not horizontal
+                cut = rng.choice(rows if horizontal else columns)
+            else:
+                cut = 1 + int(rand() * ((height if horizontal else width) - 1))
+
+            if horizontal:
+                gap = x + int(rand() * width)
+                index = (y + cut) * self.width + gap
+                self.link(index - self.width, index)
+                stack.append((x, y + cut, width, height - cut))
+                stack.append((x, y, width, cut))
+            else:
+                gap = y + int(rand() * height)
+                index = gap * self.width + x + cut
+                self.link(index - 1, index)
+                stack.append((x + cut, y, width - cut, height))
+                stack.append((x, y, cut, height))
+        return left
+
+
+def keep_box(grid: Grid) -> tuple[Chamber | None, bytes]:
+    """
+    Box around the 42 pattern with a one cell margin (always inside
+    the grid: the pattern is centered) and its reserved flags.
+
+    Returns:
+        keep (Optional[Chamber]): The box, None without the pattern
+        pattern (bytes): Reserved flags of the box cells, row by row
+    """
+    rows = reserved_rows(grid.width, grid.height)
+    if not rows:
+        return None, b""
+    left = min(min(columns) for columns in rows.values()) - 1
+    right = max(max(columns) for columns in rows.values()) + 1
+    top = min(rows) - 1
+    bottom = max(rows) + 1
+    pattern = b"".join(
+        grid.reserved[y * grid.width + left:y * grid.width + right + 1]
+        for y in range(top, bottom + 1))
+    return (left, top, right - left + 1, bottom - top + 1), pattern
+
+
+def inside(keep: Chamber | None, chamber: Chamber) -> Chamber | None:
+    """'keep' relative to a chamber containing it, None if it doesn't"""
+    if keep is None:
+        return None
+    x, y, width, height = chamber
+    if not (x <= keep[0] < x + width and y <= keep[1] < y + height):
+        return None
+    return (keep[0] - x, keep[1] - y, keep[2], keep[3])
+
+
+def carve_chamber(width: int, height: int, seed: int,
+                  keep: Chamber | None, pattern: bytes) -> bytearray:
+    """
+    Carve a chamber on its own (job of a worker process).
+
+    Args:
+        width (int): Chamber width
+        height (int): Chamber height
+        seed (int): Seed of the chamber (drawn by plan_division())
+        keep (Optional[Chamber]): Box of the 42 pattern in the chamber
+        pattern (bytes): Reserved flags of the cells of 'keep'
+
+    Returns:
+        walls (bytearray): Walls of the chamber cells, row by row
+    """
+    walls = bytearray([ALL_WALLS]) * (width * height)
+    Division(walls, width, random.Random(seed), keep, pattern).run(
+        (0, 0, width, height))
+    return walls
+
+
+def plan_division(grid: Grid, seed: int
+                  ) -> tuple[Division, list[Chamber], list[int]]:
+    """
+    Divide the grid until the chambers are small enough to be carved
+    on their own (CHAMBER_CELLS), and give each one its seed.
+
+    The first lines are carved in grid.walls and recorded: stitching the
+    chambers overwrite them, they are linked again after (stitch()).
+
+    Args:
+        grid (Grid): The grid, all walls closed
+        seed (int): Seed of the whole division
+
+    Returns:
+        plan (Division): The division of the first lines (plan.links)
+        chambers (list[Chamber]): Chambers left to carve
+        seeds (list[int]): Seed of each chamber
+    """
+    rng = random.Random(seed)
+    keep, pattern = keep_box(grid)
+    plan = Division(grid.walls, grid.width, rng, keep, pattern, record=True)
+    chambers = plan.run((0, 0, grid.width, grid.height), CHAMBER_CELLS)
+    seeds = [rng.getrandbits(63) for _ in chambers]
+    return plan, chambers, seeds
+
+
+def stitch(grid: Grid, chamber: Chamber, walls: bytearray) -> None:
+    """Copy the walls of a carved chamber in the grid, row by row"""
+    x, y, width, height = chamber
+    for row in range(height):
+        start = (y + row) * grid.width + x
+        grid.walls[start:start + width] = \
+            walls[row * width:(row + 1) * width]
+
+
+def divide_grid(grid: Grid, seed: int, workers: int = 1) -> None:
+    """
+    Recursive division of the whole grid.
+
+    The chambers of plan_division() are independent: with more than
+    one worker they are carved by a process pool, then stitched back.
+    Each chamber has its own seed, so the maze is the same whatever
+    the number of workers.
+
+    Args:
+        grid (Grid): The grid, all walls closed
+        seed (int): Seed of the whole division
+        workers (int): Number of processes, 1 to stay in this process
+    """
+    plan, chambers, seeds = plan_division(grid, seed)
+    keep = plan.keep
+    jobs = (
+        [chamber[2] for chamber in chambers],
+        [chamber[3] for chamber in chambers],
+        seeds,
+        [inside(keep, chamber) for chamber in chambers],
+        [plan.pattern] * len(chambers)
+    )
+    if workers == 1 or len(chambers) == 1:
+        carved = list(map(carve_chamber, *jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            carved = list(executor.map(carve_chamber, *jobs))
+    for chamber, walls in zip(chambers, carved):
+        stitch(grid, chamber, walls)
+    # The first lines, overwritten by the chambers
+    assert plan.links is not None
+    for index_1, index_2 in plan.links:
+        grid.link(index_1, index_2)
+    grid.version += 1
+
+
+def division_events(grid: Grid, seed: int) -> Iterator[tuple[int, int]]:
+    """
+    Same maze as divide_grid(), in this process, as a stream of links.
+
+    Each chamber is carved then stitched, and its links are yielded
+    (grid already updated), the first lines come last.
+
+    Yields:
+        tuple[int, int]: The two cells linked (grid indexes)
+    """
+    plan, chambers, seeds = plan_division(grid, seed)
+    for chamber, seed in zip(chambers, seeds):
+        x, y, width, height = chamber
+        walls = bytearray([ALL_WALLS]) * (width * height)
+        division = Division(walls, width, random.Random(seed),
+                            inside(plan.keep, chamber), plan.pattern,
+                            record=True)
+        division.run((0, 0, width, height))
+        stitch(grid, chamber, walls)
+        grid.version += 1
+        assert division.links is not None
+        for index_1, index_2 in division.links:
+            # Chamber index -> grid index
+            yield ((y + index_1 // width) * grid.width + x + index_1 % width,
+                   (y + index_2 // width) * grid.width + x + index_2 % width)
+    assert plan.links is not None
+    for index_1, index_2 in plan.links:
+        grid.link(index_1, index_2)
+        yield index_1, index_2
@@ -0,0 +1,275 @@
+from mazegen.grid import NORTH, EAST, SOUTH, WEST, ALL_WALLS, WALL_COUNT
+from mazegen.grid import HEX_DIGITS, WRITE_CHUNK, PATTERN_42, fill
+from array import array
+from collections.abc import Iterator
+import random
+
+
+# Algorithm digit of Eller's algorithm in the seed (seed * 10 + algo)
+ELLER = 4
+
+# Default chance to open a dead end of a streamed imperfect maze,
+# about the same amount of loops as unperfect() (LOOP_RATIO)
+LOOP_CHANCE = 0.2
+
+
+def reserved_rows(width: int, height: int) -> dict[int, list[int]]:
+    """
+    Cells of the 42 pattern by row, the same as
+    MazeGenerator.set_reserved() without a grid.
+
+    Args:
+        width (int): Maze width
+        height (int): Maze height
+
+    Returns:
+        rows (dict[int, list[int]]): x of the reserved cells, by y.
+                                     Empty if the maze is too small
+    """
+    rows: dict[int, list[int]] = {}
+    if width < 9 or height < 7:
+        return rows
+    start_x = int(width / 2)
+    start_y = int(height / 2)
+    for x, y in PATTERN_42:
+        rows.setdefault(start_y + y, []).append(start_x + x)
+    return rows
+
+
+def eller_rows(width: int, height: int,
+               loop_chance: float = 0.0) -> Iterator[bytearray]:
+    """
+    Eller's algorithm: build a perfect maze one row at a time.
+
+    Only the actual row is known: the set (connected part) of each
+    of its cells, in a disjoint-set forest of 'width' cells. For
+    each row:
+        1) cells linked from above keep their set, others get a new one
+        2) random walls between cells of different sets are destroyed
+        3) each set goes down at least once (random walls below)
+    The last row links every different sets, so the maze is connected.
+
+    The 42 pattern cells never join a set. A set that can't go down
+    (reserved cells below) is merged with a neighbour set first.
+
+    Use the global random, seed it before (like apply_algo()).
+
+    Args:
+        width (int): Maze width
+        height (int): Maze height
+        loop_chance (float): Chance to destroy one more wall of each
+                             dead end as the rows are built, for an
+                             imperfect maze (0 for a perfect one)
+
+    Yields:
+        row (bytearray): Walls of each finished row (same bits as the
+                         grid). The array is reused for the next rows,
+                         copy it to keep it
+    """
+    pattern = reserved_rows(width, height)
+    # parent of each cell of the row, root = set of the cell
+    parent = array('i', range(width))
+    # Set (root x) of the row above for cells linked to it, else -1
+    above = array('i', [-1]) * width
+    # First cell of the row in each set of the row above
+    first = array('i', [-1]) * width
+
+    row = bytearray([ALL_WALLS]) * width
+    below = bytearray([ALL_WALLS]) * width
+    reserved = bytearray(width)
+    reserved_below = bytearray(width)
+    for x in pattern.get(0, ()):
+        reserved[x] = 1
+
+    def find(x: int) -> int:
+        """Root of the set of x, with path halving"""
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def open_east(x: int) -> None:
+        """Destroy the wall between x and x + 1"""
+        row[x] &= ~EAST
+        row[x + 1] &= ~WEST
+
+    def open_south(x: int) -> None:
+        """Destroy the wall between x and the cell below"""
+        row[x] &= ~SOUTH
+        below[x] &= ~NORTH
+
+    for y in range(height):
+        last = y == height - 1
+        fill(reserved_below, 0)
+        for x in pattern.get(y + 1, ()):
+            reserved_below[x] = 1
+
+        # 1) Sets from above: cells under the same set share a root
+        for x in range(width):
+            parent[x] = x
+            root = above[x]
+            if root >= 0:
+                if first[root] < 0:
+                    first[root] = x
+                else:
+                    parent[x] = first[root]
+        for x in range(width):
+            if above[x] >= 0:
+                first[above[x]] = -1
+
+        # 2) Horizontal walls, all of them on the last row
+        for x in range(width - 1):
+            if reserved[x] or reserved[x + 1]:
+                continue
+            a = find(x)
+            b = find(x + 1)
+            if a != b and (last or random.random() < 0.5):
+                open_east(x)
+                parent[b] = a
+
+        if not last:
+            # Only the rows above the 42 pattern can have sets that
+            # can't go down, merge them with a neighbour set
+            merged = y + 1 in pattern
+            # Sets that can go down, indexed by root
+            down = bytearray(width)
+            if merged:
+                for x in range(width):
+                    if not reserved[x] and not reserved_below[x]:
+                        down[find(x)] = 1
+            while merged:
+                merged = False
+                for x in range(width - 1):
+                    if reserved[x] or reserved[x + 1]:
+                        continue
+                    a = find(x)
+                    b = find(x + 1)
+                    if a != b and not (down[a] and down[b]):
+                        open_east(x)
+                        parent[b] = a
+                        down[a] |= down[b]
+                        merged = True
+
+            # 3) At least one wall below per set
+            candidates: dict[int, list[int]] = {}
+            for x in range(width):
+                if not reserved[x] and not reserved_below[x]:
+                    candidates.setdefault(find(x), []).append(x)
+            for cells in candidates.values():
+                opened = False
+                for x in cells:
+                    if random.random() < 0.5:
+                        open_south(x)
+                        opened = True
+                if not opened:
+                    open_south(random.choice(cells))
+
+            if loop_chance and 0 < y:
+                open_dead_ends(row, below, reserved, reserved_below,
+                               loop_chance)
+
+        # Sets carried to the next row
+        for x in range(width):
+            above[x] = -1 if row[x] & SOUTH else find(x)
+
+        yield row
+
+        # The row below become the actual one, arrays are reused
+        row, below = below, row
+        fill(below, ALL_WALLS)
+        reserved, reserved_below = reserved_below, reserved
+
+
+def open_dead_ends(row: bytearray, below: bytearray, reserved: bytearray,
+                   reserved_below: bytearray,
+                   chance: float = LOOP_CHANCE) -> None:
+    """
+    Row version of MazeGenerator.unperfect(): some dead ends (3 walls)
+    of the row get one more wall destroyed, to the left, the right
+    or below (the row above is already written). Border cells are
+    kept like unperfect().
+
+    Args:
+        row (bytearray): Walls of the actual row, below already decided
+        below (bytearray): Walls of the next row
+        reserved (bytearray): 42 pattern cells of the row
+        reserved_below (bytearray): 42 pattern cells of the next row
+        chance (float): Chance to open each dead end
+    """
+    for x in range(1, len(row) - 1):
+        if (reserved[x] or WALL_COUNT[row[x]] != 3
+                or random.random() >= chance):
+            continue
+        walls = []
+        if row[x] & WEST and not reserved[x - 1]:
+            walls.append(WEST)
+        if row[x] & EAST and not reserved[x + 1]:
+            walls.append(EAST)
+        if row[x] & SOUTH and not reserved_below[x]:
+            walls.append(SOUTH)
+        if not walls:
+            continue
+        wall = random.choice(walls)
+        row[x] &= ~wall
+        if wall == WEST:
+            row[x - 1] &= ~EAST
+        elif wall == EAST:
+            row[x + 1] &= ~WEST
+        else:
+            below[x] &= ~NORTH
+
+
+def save_eller(filename: str, width: int, height: int,
+               entry: tuple[int, int], exit: tuple[int, int],
+               seed: int, perfect: bool = True,
+               loop_ratio: float = LOOP_CHANCE) -> None:
+    """
+    Generate a maze with Eller's algorithm straight into a file,
+    in the save_maze() format, with O(width) memory whatever the height.
+
+    The shortest path would need the whole maze, so the path line is
+    left empty (load_maze() then solves the maze to get it).
+    A perfect maze is the same as MazeGenerator with the algo ELLER.
+    Imperfect ones get their loops while the rows are built
+    (open_dead_ends()), not from unperfect(): a number of loops (LOOPS)
+    can't be known before the end, only a ratio.
+
+    Args:
+        filename (str): Path to the output file
+        width (int): Maze width
+        height (int): Maze height
+        entry (tuple[int, int]): Maze entrance
+        exit (tuple[int, int]): Maze exit
+        seed (int): Seed of the maze, without the algo digit
+        perfect (bool): False to add loops
+        loop_ratio (float): Chance to open each dead end if not perfect
+
+    Raises:
+        ValueError: If entry or exit cell is reserved by the 42 pattern.
+    """
+    pattern = reserved_rows(width, height)
+    for name, (x, y) in (("entry", entry), ("exit", exit)):
+        if x in pattern.get(y, ()):
+            raise ValueError(f"The {name} is reserved by the 42 pattern, "
+                             "change it's position pls")
+
+    random.seed(seed)
+    with open(filename, 'w') as f:
+        chunk: list[bytes | bytearray] = []
+        size = 0
+        loop_chance = 0.0 if perfect else loop_ratio
+        for row in eller_rows(width, height, loop_chance):
+            # Each row is written as soon as it's finished
+            chunk.append(row.translate(HEX_DIGITS))
+            size += width + 1
+            if size >= WRITE_CHUNK:
+                chunk.append(b"")
+                f.write(b"\n".join(chunk).decode('ascii'))
+                chunk = []
+                size = 0
+        chunk.append(b"")
+        f.write(b"\n".join(chunk).decode('ascii'))
+        f.write('\n')
+
+        f.write(f"{entry[0]},{entry[1]}\n")
+        f.write(f"{exit[0]},{exit[1]}\n")
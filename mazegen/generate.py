@@ -1,8 +1,25 @@
-from mazegen.cell import Cell
-from mazegen.solve import breadth_first_search
+from mazegen.grid import Grid, CellView, HEX_DIGITS, FROM_HEX, WALL_BITS
+from mazegen.grid import WRITE_CHUNK, PATTERN_42
+from mazegen.grid import NORTH, EAST, SOUTH, WEST, ALL_WALLS, WALL_COUNT
+from mazegen.disjoint_set import DisjointSet
+from mazegen.eller import ELLER, eller_rows
+from mazegen.division import DIVISION, divide_grid, division_events
+from mazegen.solve import breadth_first_search, DistanceField, SearchBuffers
+from mazegen.stats import MazeStats
+from mazegen.cache import MazeCache, maze_key
+from collections import deque
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, nullcontext
+import io
 import random
-from typing import Any
-import time
+from typing import Any, TextIO
+
+
+# Phase used when stats are disabled, does nothing (and can be reused)
+NO_STATS: AbstractContextManager[None] = nullcontext()
+
+# Part of the dead end walls destroyed by unperfect() (LOOP_RATIO key)
+LOOP_RATIO = 0.2
 
 
 class MazeGenerator:
@@ -17,42 +34,73 @@ class MazeGenerator:
         seed (Optional[int]): Maze seed, if None generate random one
         algo (int): Generation algorithm to use
         self.displayer (Optional[Any]): Class to display the maze
+        stats (Optional[MazeStats]): Timings and counters, None to disable
+        loop_ratio (float): Part of the dead end walls destroyed by
+                            unperfect()
+        loops (Optional[int]): Number of walls destroyed by unperfect(),
+                               replace loop_ratio if set
+        cache (Optional[MazeCache]): Mazes already generated, None to
+                                     always generate
 
     Methods:
         grid building:
             build_grid()
-            set_neighbours()
             set_reserved()
+            reset_maze()
 
         algorithms:
             backtracking()
             prims()
             kruskal()
+            division()
+            eller()
+
+        event streams (one (cell_1, cell_2) per wall destroyed):
+            events()
+            backtracking_walls()
+            prims_walls()
+            kruskal_walls()
+            division_walls()
+            eller_walls()
+            unperfect_walls()
 
         cell linking:
             link_two()
+            show_link()
     """
     def __init__(self, width: int, height: int, start: tuple[int, int],
                  end: tuple[int, int], seed: int | None = None,
-                 displayer: Any = None):
+                 displayer: Any = None, stats: MazeStats | None = None,
+                 loop_ratio: float = LOOP_RATIO, loops: int | None = None,
+                 cache: MazeCache | None = None):
         """
         initialise the maze generator.
 
         Args:
             seed (Optional[int]): Maze seed, if None generate random one.
             algo (int): Generation algorithm to use, based on last seed digit.
-                        0 = backtracking (defalt), 1 = prims, 2 = kruskal
+                        0 = backtracking (defalt), 1 = prims, 2 = kruskal,
+                        3 = recursive division, 4 = eller
             self.displayer (Optional[Any]): Class to display the maze.
-            self.path (list[Cell]): Sequence of cells from entry to exit
+            self.path (list[CellView]): Sequence of cells from entry to exit
+            stats (Optional[MazeStats]): Record the time of each phase
+                                         and counters, disabled if None
+            loop_ratio (float): Part of the dead end walls destroyed
+                                by unperfect() (0 to 1)
+            loops (Optional[int]): Number of walls destroyed by
+                                   unperfect() instead of a ratio
+            cache (Optional[MazeCache]): apply_algo() read the mazes
+                                         already generated from it, and
+                                         store the new ones
 
         If you use your own displayer class and not the ShowMaze one,
         you need to change the following functions:
             user_option()
-            link_two()
-            backtracking()
-            prims()
-            kruskal()
+            start_animation()
+            move_entry()
+            show_link()
         add the displaying function that you implemented.
+        Or don't give a displayer and consume events() instead.
         """
         self.width: int = width
         self.height: int = height
@@ -67,40 +115,101 @@ class MazeGenerator:
             self.algo = seed % 10
 
         self.displayer: Any = displayer
-        self.path: list[Cell] = []
+        # self.path is built when read after the player moved (see path)
+        self._path: list[CellView] | None = []
+        self._path_offset: int = 0
+        self._path_is_chain: bool = False
         self.path_visible: bool = False
+        self.field: DistanceField | None = None
+        self.search_buffers: SearchBuffers | None = None
+        self.stats: MazeStats | None = stats
+        self.loop_ratio: float = loop_ratio
+        self.loops: int | None = loops
+        self.cache: MazeCache | None = cache
         self.init_maze()
 
     def init_maze(self) -> None:
         """
-        Initialise the grid, set the neighbours for each cells,
+        Initialise the grid (neighbours are computed from the cell index),
         set reserved cells for 42 pattern (is size allow it).
 
         Raises:
             ValueError: If entry or exit cell is reserved by the 42 pattern.
         """
-        self.grid: list[list[Cell]] = self.build_grid()
-        self.set_neighbours()
-        self.set_reserved()
+        with self.phase("init"):
+            self.grid: Grid = self.build_grid()
+            self.set_reserved()
+        self.check_entries()
+
+    def reset_maze(self) -> None:
+        """
+        Prepare the grid for a new generation.
 
+        If the size didn't change, the grid is reset in place (walls
+        closed, visited/path cleared, reserved cells kept) so no memory
+        is allocated, otherwise a new one is built with init_maze().
+
+        Raises:
+            ValueError: If entry or exit cell is reserved by the 42 pattern.
+        """
+        if (self.grid.width, self.grid.height) != (self.width, self.height):
+            self.init_maze()
+            return
+        with self.phase("init"):
+            self.grid.reset()
+        self.check_entries()
+
+    def check_entries(self) -> None:
+        """
+        Raises:
+            ValueError: If entry or exit cell is reserved by the 42 pattern.
+        """
         # entry + exit verification
-        if self.grid[self.start[1]][self.start[0]].reserved:
+        if self.grid.reserved[self.grid.index(*self.start)]:
             raise ValueError("The entry is reserved by the 42 pattern, "
                              "change it's position pls")
-        if self.grid[self.end[1]][self.end[0]].reserved:
+        if self.grid.reserved[self.grid.index(*self.end)]:
             raise ValueError("The exit is reserved by the 42 pattern, "
                              "change it's position pls")
 
+    @property
+    def path(self) -> list[CellView]:
+        """
+        Sequence of cells from entry to exit.
+
+        move_entry() doesn't build it on each move: it is built here
+        when read, from the exit's distance field (or by skipping the
+        cells already walked on the path set before).
+        """
+        if self._path is None:
+            start = self.grid.index(*self.start)
+            self._path = [self.grid.cell(index) for index
+                          in self.exit_field().path_from(start)]
+        elif self._path_offset:
+            self._path = self._path[self._path_offset:]
+            self._path_offset = 0
+        return self._path
+
+    @path.setter
+    def path(self, path: list[CellView]) -> None:
+        self._path = path
+        self._path_offset = 0
+        self._path_is_chain = False
+
     def move_entry(self, x: int, y: int) -> None:
         """
         You can now move the entry like a player!
 
+        Only the cells joining or leaving the path are updated (see
+        DistanceField.path_change()), the path itself is built when
+        self.path is read: a move doesn't cost the length of the path.
+
         Args:
             x (int): How much the cell moved horizontally
             y (int): How much the cell moved vertically
         """
         # Store the player based on coordinates
-        player: Cell = self.grid[self.start[1]][self.start[0]]
+        player: CellView = self.grid[self.start[1]][self.start[0]]
 
         # Verify the x movement
         if ((x == 1 and not player.walls['east'])
@@ -114,94 +223,221 @@ class MazeGenerator:
 
         # Update the grid when position changed
         if player.x != self.start[0] or player.y != self.start[1]:
-            # if player moved in a path cell no need to redo BFS
-            if self.grid[self.start[1]][self.start[0]].path:
-                # Store the old path
-                last_path = self.path
-                self.path = self.path[1:]
-            else:
-                last_path = self.path
-                # Apply bfs another time to refresh the shortest path
-                self.path = breadth_first_search(self)
-
-            # Set all cells in old path that are not in new path to False
-            new_path = set(self.path)
-            for cell in last_path:
-                if cell not in new_path:
-                    cell.path = False
-                    self.displayer.update_cell(cell, self)
-
-            # Set all cells in new path as the actual path visibility
-            for cell in self.path:
-                cell.path = self.path_visible
-
-            # If path is visible refresh the display of it
-            if self.path_visible:
-                for cell in self.path:
-                    self.displayer.update_cell(cell, self)
+            grid = self.grid
+            start = grid.index(*self.start)
+            # Keep the player in the view (maze bigger than the terminal)
+            self.displayer.follow(self)
+            left, joined = self.path_change(player.index, start)
+
+            # Cells of the old path that are not in the new path
+            for index in left:
+                grid.path[index] = 0
+                self.displayer.update_cell(grid.cell(index), self)
+
+            # Cells of the new path get the actual path visibility
+            visible = 1 if self.path_visible else 0
+            for index in joined:
+                grid.path[index] = visible
+                if visible:
+                    self.displayer.update_cell(grid.cell(index), self)
 
             # Update the past player cell and player cell
             self.displayer.update_cell(player, self)
             self.displayer.update_cell(self.grid[player.y + y][player.x + x],
                                        self)
 
+    def path_change(self, old: int, new: int) -> tuple[list[int], list[int]]:
+        """
+        Move the first cell of the path from old to new and return the
+        cells that left and joined it (see move_entry()).
+
+        A path set from outside (BFS, file) is kept while the player
+        walks on it. Once the player leaves it, the path is the one of
+        the exit's distance field (parents), found again from the
+        common part of both paths on each move, no new BFS.
+
+        Args:
+            old (int): Index of the cell the player left
+            new (int): Index of the player's cell
+
+        Return:
+            left (list[int]): Cells no longer in the path
+            joined (list[int]): Cells added to the path
+        """
+        if self._path_is_chain:
+            self._path = None
+            return self.exit_field().path_change(old, new)
+
+        path = self._path
+        offset = self._path_offset
+        if path is not None and offset + 1 < len(path) \
+                and path[offset + 1].index == new:
+            # Moved on the next path cell: the rest is still the
+            # shortest path
+            self._path_offset += 1
+            return [old], []
+
+        # Left the path: compare it once to the one of the field
+        old_path = [cell.index for cell in self.path]
+        new_path = self.exit_field().path_from(new)
+        self._path = None
+        self._path_is_chain = True
+        old_cells = set(old_path)
+        new_cells = set(new_path)
+        return ([index for index in old_path if index not in new_cells],
+                [index for index in new_path if index not in old_cells])
+
+    def exit_field(self) -> DistanceField:
+        """
+        Return the BFS distance field from the exit.
+
+        Computed on the first call, then reused until the grid,
+        a wall or the exit change.
+        """
+        end = self.grid.index(*self.end)
+        if self.field is None or not self.field.is_valid(self.grid, end):
+            self.field = DistanceField(self.grid, end)
+        return self.field
+
+    def build_field(self) -> None:
+        """
+        Build the exit's distance field as soon as the maze is ready,
+        when it is displayed (the player can move): move_entry() then
+        only follows parents, even on the first move off the path.
+        Headless mazes (batch, server) never move, they skip it.
+        """
+        if self.displayer:
+            with self.phase("field"):
+                self.exit_field()
+
     def switch_algo(self, direction: int) -> None:
         """
         Switch to the next or last algorithm
 
         direction (int): 1 or -1 to change the algo.
-                        Use modulo 3 to get a result between 0 and 2.
+                        Use modulo 5 to get a result between 0 and 4.
+        """
+        self.algo = (self.algo + direction) % 5
+
+    def phase(self, name: str) -> AbstractContextManager[None]:
+        """
+        Time a phase in self.stats: 'with self.phase("bfs"): ...'
+
+        Only called at phase boundaries, never in the loops, so
+        disabled stats cost a single check per phase.
+
+        Args:
+            name (str): Name of the phase
         """
-        self.algo = (self.algo + direction) % 3
+        if self.stats is None:
+            return NO_STATS
+        return self.stats.phase(name)
 
     def user_option(self) -> None:
         """Display the user option using the displayer"""
         if self.displayer:
             self.displayer.user_option(self)
 
-    def build_grid(self) -> list[list[Cell]]:
+    def build_grid(self) -> Grid:
         """
         Build the grid and return it
 
         Returns:
-            maze (list[list[Cell]]): 2d list of cells
+            maze (Grid): Flat arrays of walls and flags,
+                         grid[y][x] still give a Cell-like view
         """
-        maze: list[list[Cell]] = []
-        for y in range(self.height):
-            maze.append([])
-            for x in range(self.width):
-                maze[y].append(Cell(x, y))
-        return maze
+        return Grid(self.width, self.height)
 
-    def set_neighbours(self) -> None:
-        """
-        Set neighbours for each cell of the grid
-        """
-        for y, rows in enumerate(self.grid):
-            for x, cell in enumerate(rows):
-                if y < self.height - 1:
-                    cell.add_neighbour(self.grid[y + 1][x])
-                if y > 0:
-                    cell.add_neighbour(self.grid[y - 1][x])
-                if x < self.width - 1:
-                    cell.add_neighbour(self.grid[y][x + 1])
-                if x > 0:
-                    cell.add_neighbour(self.grid[y][x - 1])
-
-    def apply_algo(self, *args: Any, **kwargs: Any) -> None:
+    def apply_algo(self, perfect: bool, displaying: bool = False,
+                   animate: bool = False, **kwargs: Any) -> None:
         """
         Apply a generation algorithm on the initialised grid,
-        based on self.algo
+        based on self.algo. The grid is reset in place when the
+        size didn't change (reset_maze()).
+
+        With a cache, a maze already generated (same size, entry, exit,
+        perfect, seed and algo) is read back instead, unless animated
+        (the animation needs the algorithm steps). New mazes are stored.
+
+        Args:
+            perfect (bool): False to add loops (unperfect())
+            displaying (bool): True to display the maze
+            animate (bool): Whether the maze is displayed cell by cell
+            kwargs: Options of the algorithm (workers for division())
         """
-        self.init_maze()
+        if self.stats:
+            self.stats.begin(self.seed * 10 + self.algo, self.algo)
+        self.reset_maze()
+        cache = self.cache
+        key = ""
+        if cache is not None:
+            key = maze_key(self.width, self.height, self.start, self.end,
+                           perfect, self.seed * 10 + self.algo,
+                           self.loop_ratio, self.loops)
         random.seed(self.seed)
         self.seed += 1
+        if (cache is not None and not animate
+                and self.load_cached(cache, key, displaying)):
+            return
         if self.algo == 0:
-            self.backtracking(*args, **kwargs)
+            self.backtracking(perfect, displaying, animate, **kwargs)
         elif self.algo == 1:
-            self.prims(*args, **kwargs)
+            self.prims(perfect, displaying, animate, **kwargs)
         elif self.algo == 2:
-            self.kruskal(*args, **kwargs)
+            self.kruskal(perfect, displaying, animate, **kwargs)
+        elif self.algo == DIVISION:
+            self.division(perfect, displaying, animate, **kwargs)
+        elif self.algo == ELLER:
+            self.eller(perfect, displaying, animate, **kwargs)
+        if cache is not None:
+            with self.phase("cache"):
+                cache.put(key, self.packed())
+
+    def load_cached(self, cache: MazeCache, key: str,
+                    displaying: bool) -> bool:
+        """
+        Replace the grid and the path by the cached maze 'key'.
+
+        An unreadable entry is removed from the cache, the maze is
+        then generated as if it was missing.
+
+        Args:
+            cache (MazeCache): Where to look
+            key (str): maze_key() of the maze
+            displaying (bool): True to display the maze
+
+        Returns:
+            bool: True if the maze was in the cache
+        """
+        # packed.py imports this module
+        from mazegen.packed import read_packed
+
+        with self.phase("cache"):
+            data = cache.get(key)
+            if data is not None:
+                try:
+                    read_packed(self, data)
+                except ValueError:
+                    cache.discard(key)
+                    self.reset_maze()
+                    data = None
+        if self.stats:
+            self.stats.count("cache_misses" if data is None
+                             else "cache_hits")
+        if data is None:
+            return False
+        if self.displayer and displaying:
+            with self.phase("display"):
+                self.displayer.display_grid(self)
+        return True
+
+    def packed(self) -> bytes:
+        """The maze in the packed format (packed.py), as bytes"""
+        from mazegen.packed import write_packed
+
+        data = io.BytesIO()
+        write_packed(self, data)
+        return data.getvalue()
 
     def set_reserved(self) -> None:
         """
@@ -213,74 +449,198 @@ class MazeGenerator:
         start_x = int(self.width / 2)
         start_y = int(self.height / 2)
 
-        self.grid[start_y][start_x - 1].reserved = True
-        self.grid[start_y][start_x - 2].reserved = True
-        self.grid[start_y][start_x - 3].reserved = True
+        for x, y in PATTERN_42:
+            self.grid.reserved[self.grid.index(start_x + x, start_y + y)] = 1
 
-        self.grid[start_y][start_x + 1].reserved = True
-        self.grid[start_y][start_x + 2].reserved = True
-        self.grid[start_y][start_x + 3].reserved = True
+    def save_maze(self, filename: str) -> None:
+        """
+        Save the maze's structure and the shortest path from entry to exit,
+        into the output file.
 
-        self.grid[start_y - 1][start_x + 3].reserved = True
-        self.grid[start_y - 2][start_x + 3].reserved = True
+        Args:
+            filename (str): Path to the output file
+        """
+        with self.phase("save"), open(filename, 'w') as f:
+            written = self.write_maze(f)
+            if self.stats:
+                self.stats.count("bytes_written", written)
 
-        self.grid[start_y - 1][start_x - 3].reserved = True
-        self.grid[start_y - 2][start_x - 3].reserved = True
+    def write_maze(self, f: TextIO) -> int:
+        """
+        Write the maze in the save_maze() format to an open text stream
+        (file, io.StringIO...).
 
-        self.grid[start_y + 1][start_x - 1].reserved = True
-        self.grid[start_y + 2][start_x - 1].reserved = True
+        Args:
+            f (TextIO): Where to write
 
-        self.grid[start_y + 1][start_x + 1].reserved = True
-        self.grid[start_y + 2][start_x + 1].reserved = True
+        Returns:
+            written (int): Characters written, it's ascii so also the bytes
+        """
+        grid = self.grid
+        written = 0
+        chunk: list[bytes | bytearray] = []
+        size = 0
+        for row in range(0, grid.size, grid.width):
+            # The maze structure is written in hexa format,
+            # each character tell us how much walls are closed.
+            # The grid already store walls as N=1 E=2 S=4 W=8,
+            # so a whole row is translated at once
+            chunk.append(grid.walls[row:row + grid.width]
+                         .translate(HEX_DIGITS))
+            size += grid.width + 1
+            # Write by big chunks instead of once per cell
+            if size >= WRITE_CHUNK:
+                chunk.append(b"")
+                written += f.write(b"\n".join(chunk).decode('ascii'))
+                chunk = []
+                size = 0
+        chunk.append(b"")
+        written += f.write(b"\n".join(chunk).decode('ascii'))
+        written += f.write('\n')
+
+        written += f.write(f"{self.start[0]},{self.start[1]}\n")
+        written += f.write(f"{self.end[0]},{self.end[1]}\n")
+
+        # Write the direction taken from one cell to another
+        moves = grid.moves()
+        path = [cell.index for cell in self.path]
+        written += f.write("".join([moves[curr - prev]
+                                    for prev, curr
+                                    in zip(path, path[1:])]))
+        return written
+
+    @classmethod
+    def load_maze(cls, filename: str,
+                  displayer: Any = None) -> 'MazeGenerator':
+        """
+        Build a maze from a file written by save_maze().
 
-        self.grid[start_y + 2][start_x + 2].reserved = True
-        self.grid[start_y + 2][start_x + 3].reserved = True
+        The file is read a row at a time, each row is decoded at once
+        (bytes.translate) straight into the walls bytearray, and checked:
+        a wall closed on one side need to be closed on the other side,
+        and the border of the maze need to be closed.
+        The seed is not stored in the file, a random one is used.
+        An empty path line (save_eller()) is solved with BFS.
 
-        self.grid[start_y - 2][start_x + 1].reserved = True
-        self.grid[start_y - 2][start_x + 2].reserved = True
+        Args:
+            filename (str): Path to the maze file
+            displayer (Optional[Any]): Class to display the maze
 
-    def save_maze(self, filename: str) -> None:
+        Returns:
+            maze (MazeGenerator): The maze with its grid, entry, exit, path
+
+        Raises:
+            ValueError: If the file is not a valid maze
         """
-        Save the maze's structure and the shortest path from entry to exit,
-        into the output file.
+        walls = bytearray()
+        width = 0
+        previous = b""
+        with open(filename, 'rb') as f:
+            number = 0
+            while True:
+                number += 1
+                row = f.readline().rstrip(b"\r\n")
+                # An empty line end the maze structure
+                if not row:
+                    break
+                decoded = row.translate(FROM_HEX)
+                if not width:
+                    width = len(row)
+                elif len(row) != width:
+                    raise ValueError(f"line {number}: expected {width} "
+                                     f"cells, got {len(row)}")
+                if 255 in decoded:
+                    raise ValueError(f"line {number}: invalid hexa "
+                                     "character")
+                # Border: west of the first cell, east of the last one,
+                # north of the first row
+                if not decoded[0] & WEST or not decoded[-1] & EAST:
+                    raise ValueError(f"line {number}: the west and east "
+                                     "borders need to be closed")
+                if not previous and 0 in decoded.translate(WALL_BITS[NORTH]):
+                    raise ValueError(f"line {number}: the north border "
+                                     "need to be closed")
+                # east wall of a cell = west wall of the next one
+                if (decoded[:-1].translate(WALL_BITS[EAST])
+                        != decoded[1:].translate(WALL_BITS[WEST])):
+                    raise ValueError(f"line {number}: east and west walls "
+                                     "don't match")
+                # north wall of a cell = south wall of the one above
+                if (previous and previous.translate(WALL_BITS[SOUTH])
+                        != decoded.translate(WALL_BITS[NORTH])):
+                    raise ValueError(f"line {number}: north and south walls "
+                                     "don't match")
+                walls += decoded
+                previous = decoded
+
+            if not walls:
+                raise ValueError("No maze in the file")
+            if 0 in previous.translate(WALL_BITS[SOUTH]):
+                raise ValueError(f"line {number - 1}: the south border "
+                                 "need to be closed")
+            height = len(walls) // width
+
+            # Entry and exit lines: 'x,y'
+            points: list[tuple[int, int]] = []
+            for name in ("entry", "exit"):
+                line = f.readline().strip()
+                try:
+                    x, y = (int(v) for v in line.split(b","))
+                except ValueError:
+                    raise ValueError(f"Invalid {name} line: "
+                                     f"{line.decode(errors='replace')!r}")
+                if not (0 <= x < width and 0 <= y < height):
+                    raise ValueError(f"The {name} is out of the maze")
+                points.append((x, y))
+            moves = f.readline().strip()
+
+        maze = cls(width, height, points[0], points[1],
+                   displayer=displayer)
+        maze.grid.walls = walls
+        if moves or maze.start == maze.end:
+            maze.replay_path(moves)
+        else:
+            # No path line (streamed maze, save_eller()): solve it
+            maze.path = breadth_first_search(maze)
+        maze.build_field()
+        return maze
+
+    def replay_path(self, moves: bytes) -> None:
+        """
+        Rebuild self.path by following moves (b"ESSW...") from the entry.
 
         Args:
-            filename (str): Path to the output file
+            moves (bytes): One letter (N, E, S, W) per move
+
+        Raises:
+            ValueError: If a move is unknown, goes through a wall or out
+                        of the maze, or if the path doesn't end at the exit
         """
-        with open(filename, 'w') as f:
-            for rows in self.grid:
-                for cell in rows:
-                    # The maze structure is written in hexa format,
-                    # each character tell us how much walls are closed
-                    i = 0
-                    if cell.walls['north']:
-                        i += 1
-                    if cell.walls['east']:
-                        i += 2
-                    if cell.walls['south']:
-                        i += 4
-                    if cell.walls['west']:
-                        i += 8
-                    f.write(f"{hex(i)[2:].capitalize()}")
-                f.write('\n')
-            f.write('\n')
-
-            f.write(f"{self.start[0]},{self.start[1]}\n")
-            f.write(f"{self.end[0]},{self.end[1]}\n")
-
-            for i in range(1, len(self.path)):
-                prev = self.path[i - 1]
-                curr = self.path[i]
-
-                # Write the direction taken from one cell to another
-                if curr.x == prev.x + 1:
-                    f.write("E")
-                elif curr.x == prev.x - 1:
-                    f.write("W")
-                elif curr.y == prev.y + 1:
-                    f.write("S")
-                elif curr.y == prev.y - 1:
-                    f.write("N")
+        grid = self.grid
+        walls = grid.walls
+        # Wall crossed and (x, y) difference of each move
+        steps = {ord("N"): (NORTH, 0, -1), ord("E"): (EAST, 1, 0),
+                 ord("S"): (SOUTH, 0, 1), ord("W"): (WEST, -1, 0)}
+        x, y = self.start
+        path = [grid.index(x, y)]
+        for move in moves:
+            step = steps.get(move)
+            if step is None:
+                raise ValueError(f"Invalid move in the path: {chr(move)}")
+            wall, dx, dy = step
+            # Checked on the coordinates: the index of a move out of a
+            # row would wrap to the next one
+            if not (0 <= x + dx < self.width and 0 <= y + dy < self.height):
+                raise ValueError("The path goes out of the maze")
+            # Only through open walls
+            if walls[path[-1]] & wall:
+                raise ValueError("The path goes through a wall")
+            x += dx
+            y += dy
+            path.append(grid.index(x, y))
+        if (x, y) != tuple(self.end):
+            raise ValueError("The path doesn't end at the exit")
+        self.path = [grid.cell(index) for index in path]
 
     def save_seed(self) -> None:
         """
@@ -291,6 +651,64 @@ class MazeGenerator:
         with open("seed.txt", 'a') as f:
             f.write(f"{int((self.seed - 1) * 10 + self.algo)}\n")
 
+    def events(self, perfect: bool = True) -> Iterator[tuple[int, int]]:
+        """
+        Generate a maze with self.algo as a stream of events.
+
+        Same steps as apply_algo() (grid reset, seed), but each wall
+        destroyed is yielded as (cell_1, cell_2), indexes of the two
+        cells now linked. The consumer take them at its own pace
+        (renderer, file, socket...), the grid is already updated when
+        an event is received. self.path is computed once the stream
+        is exhausted. The maze is the same as with apply_algo().
+
+        Args:
+            perfect (bool): False to also stream the unperfect() walls
+
+        Yields:
+            tuple[int, int]: The two cells linked
+        """
+        if self.stats:
+            self.stats.begin(self.seed * 10 + self.algo, self.algo)
+        self.reset_maze()
+        random.seed(self.seed)
+        self.seed += 1
+        yield from self.carve()
+        if not perfect:
+            yield from self.unperfect_walls()
+        self.path = breadth_first_search(self)
+        self.build_field()
+
+    def carve(self) -> Iterator[tuple[int, int]]:
+        """Stream of the perfect maze of self.algo, on the actual grid"""
+        if self.algo == 1:
+            return self.prims_walls()
+        if self.algo == 2:
+            return self.kruskal_walls()
+        if self.algo == DIVISION:
+            return self.division_walls()
+        if self.algo == ELLER:
+            return self.eller_walls()
+        return self.backtracking_walls()
+
+    def consume(self, events: Iterator[tuple[int, int]],
+                animate: bool) -> None:
+        """
+        Run a stream of events, showing each link if animated.
+
+        Without animation nothing is done per event, the stream is
+        drained at C speed (deque with maxlen 0).
+
+        Args:
+            events (Iterator[tuple[int, int]]): Cells linked
+            animate (bool): Whether cells will be displayed one by one
+        """
+        if animate and self.displayer:
+            for cell_1, cell_2 in events:
+                self.show_link(cell_1, cell_2)
+        else:
+            deque(events, maxlen=0)
+
     def unperfect(self, animate: bool) -> None:
         """
         Destroy some walls to make the maze unperfect
@@ -301,26 +719,49 @@ class MazeGenerator:
         Args:
             animate (bool): Wether cells will be displayed one by one or not
         """
-        candidates: list[tuple[Cell, Cell]] = []
+        self.consume(self.unperfect_walls(), animate)
+
+    def unperfect_walls(self) -> Iterator[tuple[int, int]]:
+        """
+        Stream of the walls destroyed by unperfect().
+
+        Candidates are the walls between a dead end (3 walls, not on
+        the border) and a free neighbour. They are shuffled once, then
+        destroyed in that order in a single pass: self.loops walls if
+        set, else self.loop_ratio of the candidates.
+        """
+        grid = self.grid
+        width = grid.width
+        walls = grid.walls
+        reserved = grid.reserved
+        candidates: list[tuple[int, int]] = []
 
         for y in range(1, self.height - 1):
-            for x in range(1, self.width - 1):
+            for cell in range(y * width + 1, (y + 1) * width - 1):
                 # Store destroyable cells, 3 walls + not reserved
-                cell = self.grid[y][x]
-                if not cell.reserved and cell.count_wall() == 3:
-                    for n in cell.neighbours:
-                        if not n.reserved and cell.is_wall_between(n):
-                            candidates.append((cell, n))
+                if reserved[cell] or WALL_COUNT[walls[cell]] != 3:
+                    continue
+                # Not on the border: the 4 neighbours exist
+                for wall, n in ((SOUTH, cell + width), (NORTH, cell - width),
+                                (EAST, cell + 1), (WEST, cell - 1)):
+                    if walls[cell] & wall and not reserved[n]:
+                        candidates.append((cell, n))
 
-        # Divide by 5 so we don't detroy too much
         random.shuffle(candidates)
-        candidates = candidates[:int(len(candidates) / 5)]
+        if self.loops is None:
+            remaining = int(len(candidates) * self.loop_ratio)
+        else:
+            remaining = self.loops
 
-        while candidates:
-            # Remove a wall between the cell and a random neighbours
-            actual, chosen = random.choice(candidates)
-            self.link_two(actual, chosen, animate)
-            candidates.remove((actual, chosen))
+        for actual, chosen in candidates:
+            if remaining <= 0:
+                break
+            # Two dead ends side by side share their wall
+            if not walls[actual] & grid.direction(actual, chosen):
+                continue
+            grid.link(actual, chosen)
+            yield actual, chosen
+            remaining -= 1
 
     def backtracking(self, perfect: bool, displaying: bool = False,
                      animate: bool = False) -> None:
@@ -332,144 +773,277 @@ class MazeGenerator:
         displaying (bool): True to display the maze.
         animate (bool): Whether the maze is displayed cell by cell.
         """
-        my_stack = [self.grid[0][0]]
+        with self.phase("algorithm"):
+            self.start_animation(animate)
+            self.consume(self.backtracking_walls(), animate)
+        self.finish_maze(perfect, displaying, animate)
+
+    def backtracking_walls(self) -> Iterator[tuple[int, int]]:
+        """Stream of the walls destroyed by backtracking()"""
+        grid = self.grid
+        visited = grid.visited
+        reserved = grid.reserved
+        my_stack = [0]
 
         while my_stack:
             # Pop the last cell and store it's available neighbours
-            actual: Cell = my_stack.pop()
-            available: list[Cell] = [n for n in actual.neighbours
-                                     if not n.visited and not n.reserved]
+            actual: int = my_stack.pop()
+            available: list[int] = [n for n in grid.neighbours(actual)
+                                    if not visited[n] and not reserved[n]]
             # Mark it as visited
-            actual.visited = True
+            visited[actual] = 1
             if available:
                 # Chose a random neighbour and link it with the cell
                 chosen = random.choice(available)
-                self.link_two(actual, chosen, animate)
+                grid.link(actual, chosen)
+                yield actual, chosen
                 # Append the actual then chosen so it is the next popped
                 my_stack.append(actual)
                 my_stack.append(chosen)
 
-        if not perfect:
-            self.unperfect(animate)
-        self.path = breadth_first_search(self)
-        if self.displayer and displaying:
-            self.displayer.display_grid(self)
-
     def prims(self, perfect: bool, displaying: bool = False,
               animate: bool = False) -> None:
         """
-        Docstring for prims
+        Prim's algorithm, each step is O(1): the frontier is a list where
+        a random pair is swap-removed, the maze is the visited bytearray.
 
         perfect (bool): True make the maze perfect, otherwise,
                         call self.unperfect() after maze generation.
         displaying (bool): True to display the maze.
         animate (bool): Whether the maze is displayed cell by cell.
         """
-        start = self.grid[0][0]
-        my_maze = [start]
+        with self.phase("algorithm"):
+            self.start_animation(animate)
+            self.consume(self.prims_walls(), animate)
+        self.finish_maze(perfect, displaying, animate)
+
+    def prims_walls(self) -> Iterator[tuple[int, int]]:
+        """Stream of the walls destroyed by prims()"""
+        grid = self.grid
+        # visited mark the cells already in the maze
+        my_maze = grid.visited
+        reserved = grid.reserved
+        start = 0
+        my_maze[start] = 1
         neighbours = []
 
         # Append tupple of cells that can be linked
-        for cell in start.neighbours:
-            if not cell.reserved:
+        for cell in grid.neighbours(start):
+            if not reserved[cell]:
                 neighbours.append((start, cell))
 
         while neighbours:
-            cell, next_cell = random.choice(neighbours)
-            neighbours.remove((cell, next_cell))
+            # Pick a random pair, then fill its slot with the last pair
+            # so the removal doesn't shift the whole list
+            chosen = random.randrange(len(neighbours))
+            cell, next_cell = neighbours[chosen]
+            neighbours[chosen] = neighbours[-1]
+            neighbours.pop()
             # Verify if we already linked this cell
-            if next_cell in my_maze:
+            if my_maze[next_cell]:
                 continue
-            # Append so we don't relink it
-            my_maze.append(next_cell)
-            self.link_two(cell, next_cell, animate)
-            for cell in next_cell.neighbours:
-                if cell not in my_maze and not cell.reserved:
+            # Mark so we don't relink it
+            my_maze[next_cell] = 1
+            grid.link(cell, next_cell)
+            yield cell, next_cell
+            for cell in grid.neighbours(next_cell):
+                if not my_maze[cell] and not reserved[cell]:
                     # Append other tupples of possible linked cells
                     neighbours.append((next_cell, cell))
 
-        if not perfect:
-            self.unperfect(animate)
-        self.path = breadth_first_search(self)
-        if self.displayer and displaying:
-            self.displayer.display_grid(self)
-
     def kruskal(self, perfect: bool, displaying: bool = False,
                 animate: bool = False) -> None:
         """
-        Docstring for prims
+        Kruskal with a shuffled list of walls and a disjoint-set forest,
+        near linear in the number of cells.
 
         perfect (bool): True make the maze perfect, otherwise,
                         call self.unperfect() after maze generation.
         displaying (bool): True to display the maze.
         animate (bool): Whether the maze is displayed cell by cell.
         """
-        all_links = [{cell} for rows in self.grid
-                     for cell in rows
-                     if not cell.reserved]
-
-        # While we didn't linked all cells into one set
-        while len(all_links) != 1:
-            my_set = random.choice(all_links)
-            # Because sets are already random, we need a way to
-            # derandomize it using sort
-            actual = random.choice(list(
-                sorted(
-                    my_set,
-                    key=lambda x: (len(x.neighbours), x.x, x.y)
-                )
-            )
-            )
-            # available cells
-            unvisited = [cell for cell in actual.neighbours
-                         if not cell.reserved]
-            # do not compute if there is less than 2
-            if len(unvisited) < 2:
-                continue
-            chosen = random.choice(unvisited)
-            unvisited.remove(chosen)
-            # Verify that chosen is not already in the same set
-            # no loop protection + no link between same sets
-            if chosen in my_set:
+        with self.phase("algorithm"):
+            self.start_animation(animate)
+            self.consume(self.kruskal_walls(), animate)
+        self.finish_maze(perfect, displaying, animate)
+
+    def kruskal_walls(self) -> Iterator[tuple[int, int]]:
+        """Stream of the walls destroyed by kruskal()"""
+        grid = self.grid
+        width = grid.width
+        reserved = grid.reserved
+
+        # Store every wall between two free cells, encoded in one int:
+        # cell * 2 for the east wall, cell * 2 + 1 for the south wall
+        walls: list[int] = []
+        for cell in range(grid.size):
+            if reserved[cell]:
                 continue
-            for cell in all_links:
-                # Search for the set that store chosen so we link thems
-                if chosen in cell:
-                    my_set.update(cell)
-                    all_links.remove(cell)
-                    self.link_two(actual, chosen, animate)
-                    break
+            if cell % width < width - 1 and not reserved[cell + 1]:
+                walls.append(cell << 1)
+            if cell + width < grid.size and not reserved[cell + width]:
+                walls.append(cell << 1 | 1)
+        # The random order of the walls is the whole algorithm
+        random.shuffle(walls)
+
+        # Each free cell start in its own set, a wall is destroyed only
+        # if it separates two different sets (no loop)
+        all_links = DisjointSet(grid.size)
+        # A perfect maze of n cells has n - 1 passages
+        remaining = grid.size - reserved.count(1) - 1
+        for wall in walls:
+            if remaining <= 0:
+                break
+            actual = wall >> 1
+            chosen = actual + width if wall & 1 else actual + 1
+            if all_links.union(actual, chosen):
+                grid.link(actual, chosen)
+                yield actual, chosen
+                remaining -= 1
+
+    def division(self, perfect: bool, displaying: bool = False,
+                 animate: bool = False, workers: int = 1) -> None:
+        """
+        Recursive division, chambers are cut in two by a wall with
+        one gap (see division.py).
+
+        Once the first lines are carved, the chambers left are
+        independent: with more than one worker they are carved in
+        parallel by a process pool. The maze is the same whatever
+        the number of workers (and with division_walls()).
+
+        perfect (bool): True make the maze perfect, otherwise,
+                        call self.unperfect() after maze generation.
+        displaying (bool): True to display the maze.
+        animate (bool): Whether the maze is displayed cell by cell.
+        workers (int): Number of processes carving the chambers.
+        """
+        with self.phase("algorithm"):
+            self.start_animation(animate)
+            if animate and self.displayer:
+                self.consume(self.division_walls(), animate)
+            else:
+                # No events needed, the chambers are carved in bulk
+                divide_grid(self.grid, random.getrandbits(63), workers)
+        self.finish_maze(perfect, displaying, animate)
+
+    def division_walls(self) -> Iterator[tuple[int, int]]:
+        """Stream of the walls destroyed by division(), in this process"""
+        return division_events(self.grid, random.getrandbits(63))
 
+    def eller(self, perfect: bool, displaying: bool = False,
+              animate: bool = False) -> None:
+        """
+        Eller's algorithm, the maze is built row by row (see eller.py).
+
+        Same maze as save_eller() with the same seed when perfect,
+        use save_eller() when the maze doesn't fit in memory.
+
+        perfect (bool): True make the maze perfect, otherwise,
+                        call self.unperfect() after maze generation.
+        displaying (bool): True to display the maze.
+        animate (bool): Whether the maze is displayed cell by cell.
+        """
+        with self.phase("algorithm"):
+            self.start_animation(animate)
+            self.consume(self.eller_walls(), animate)
+        self.finish_maze(perfect, displaying, animate)
+
+    def eller_walls(self) -> Iterator[tuple[int, int]]:
+        """Stream of the walls destroyed by eller(), row by row"""
+        grid = self.grid
+        width = grid.width
+        walls = grid.walls
+        for y, row in enumerate(eller_rows(self.width, self.height)):
+            start = y * width
+            walls[start:start + width] = row
+            grid.version += 1
+            # Links of the row: to the cell above and to the left
+            for cell in range(start, start + width):
+                if not walls[cell] & NORTH:
+                    yield cell - width, cell
+                if cell > start and not walls[cell] & WEST:
+                    yield cell - 1, cell
+
+    def start_animation(self, animate: bool) -> None:
+        """
+        Tell the displayer how much walls will be destroyed, a perfect
+        maze has one passage less than free cells. The displayer
+        spread them over its animation time (walls destroyed by
+        unperfect() follow at the same pace).
+
+        Args:
+            animate (bool): Whether the maze is displayed cell by cell
+        """
+        if animate and self.displayer:
+            links = self.grid.size - self.grid.reserved.count(1) - 1
+            self.displayer.start_animation(self, links)
+
+    def finish_maze(self, perfect: bool, displaying: bool,
+                    animate: bool) -> None:
+        """
+        Common end of the algorithms: loops if not perfect,
+        shortest path, then display.
+
+        perfect (bool): False to call self.unperfect()
+        displaying (bool): True to display the maze.
+        animate (bool): Whether the maze is displayed cell by cell.
+        """
+        if animate and self.displayer:
+            self.displayer.end_animation()
+        stats = self.stats
+        if stats:
+            # Cells reached by the algorithm have at least one opening
+            stats.count("cells_visited",
+                        self.grid.size - self.grid.walls.count(ALL_WALLS))
         if not perfect:
-            self.unperfect(animate)
-        self.path = breadth_first_search(self)
+            with self.phase("unperfect"):
+                self.unperfect(animate)
+        if stats:
+            stats.count("walls_removed", self.grid.open_walls())
+        with self.phase("bfs"):
+            self.path = breadth_first_search(self)
+        self.build_field()
         if self.displayer and displaying:
-            self.displayer.display_grid(self)
+            with self.phase("display"):
+                self.displayer.display_grid(self)
 
-    def link_two(self, cell_1: Cell, cell_2: Cell, animate: bool) -> None:
+    def link_two(self, cell_1: int | CellView, cell_2: int | CellView,
+                 animate: bool) -> None:
         """
         Destroy the wall between cell_1 and cell_2.
 
-        cell_1 and cell_2 need to be neighbours
+        cell_1 and cell_2 need to be neighbours, given as cells
+        (grid[y][x]) like before the Grid, or as their index.
+
+        Raises:
+            ValueError: If the cells are not neighbours
 
         Args:
-            cell_1 (Cell): Neighbour of cell_2
-            cell_2 (Cell): Neighbour of cell_1   :)
+            cell_1 (int | CellView): Neighbour of cell_2
+            cell_2 (int | CellView): Neighbour of cell_1   :)
             animate (bool): Whether cells will be displayed one by one or not
         """
-        if cell_2.x == cell_1.x + 1:
-            cell_2.destroy_wall('west')
-            cell_1.destroy_wall('east')
-        elif cell_2.x == cell_1.x - 1:
-            cell_2.destroy_wall('east')
-            cell_1.destroy_wall('west')
-        elif cell_2.y == cell_1.y + 1:
-            cell_2.destroy_wall('north')
-            cell_1.destroy_wall('south')
-        else:
-            cell_2.destroy_wall('south')
-            cell_1.destroy_wall('north')
+        if isinstance(cell_1, CellView):
+            cell_1 = cell_1.index
+        if isinstance(cell_2, CellView):
+            cell_2 = cell_2.index
+        if cell_2 not in self.grid.neighbours(cell_1):
+            raise ValueError(f"Cells {cell_1} and {cell_2} are not "
+                             "neighbours, can't link them")
+        self.grid.link(cell_1, cell_2)
         if animate and self.displayer:
-            self.displayer.update_cell(cell_1, self)
-            self.displayer.update_cell(cell_2, self)
-            time.sleep(0.02)
+            self.show_link(cell_1, cell_2)
+
+    def show_link(self, cell_1: int, cell_2: int) -> None:
+        """
+        Display the two cells just linked (one animation step).
+
+        Args:
+            cell_1 (int): Index of a neighbour of cell_2
+            cell_2 (int): Index of a neighbour of cell_1
+        """
+        self.displayer.update_cell(self.grid.cell(cell_1), self)
+        self.displayer.update_cell(self.grid.cell(cell_2), self)
+        # The displayer keep the pace (frame rate), no sleep here
+        self.displayer.step()
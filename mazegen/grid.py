@@ -0,0 +1,490 @@
+from collections.abc import Iterator, MutableMapping
+
+
+# Wall bits, same values as the hexa output format
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+ALL_WALLS = NORTH | EAST | SOUTH | WEST
+
+DIRECTIONS: dict[str, int] = {
+    "north": NORTH,
+    "east": EAST,
+    "south": SOUTH,
+    "west": WEST
+}
+
+# Number of closed walls for each possible mask
+WALL_COUNT: bytes = bytes(bin(mask).count("1") for mask in range(16))
+
+# Translation table from a wall mask to its hexa character (bytes.translate)
+HEX_DIGITS: bytes = bytes.maketrans(bytes(range(16)), b"0123456789ABCDEF")
+
+# Reverse table, from a hexa character to its wall mask, 255 if invalid
+FROM_HEX: bytes = bytes(
+    int(chr(c), 16) if chr(c) in "0123456789ABCDEFabcdef" else 255
+    for c in range(256)
+)
+
+# For each wall, table giving 1 if the wall is closed in the mask, else 0
+WALL_BITS: dict[int, bytes] = {
+    wall: bytes(1 if mask & wall else 0 for mask in range(256))
+    for wall in (NORTH, EAST, SOUTH, WEST)
+}
+
+# Number of characters written at once in the hexa format
+WRITE_CHUNK = 1 << 20
+
+# Reserved cells of the 42 pattern, relative to the middle of the maze
+PATTERN_42: tuple[tuple[int, int], ...] = (
+    (-1, 0), (-2, 0), (-3, 0),
+    (1, 0), (2, 0), (3, 0),
+    (3, -1), (3, -2),
+    (-3, -1), (-3, -2),
+    (-1, 1), (-1, 2),
+    (1, 1), (1, 2),
+    (2, 2), (3, 2),
+    (1, -2), (2, -2)
+)
+
+
+def fill(buffer: bytearray, value: int) -> None:
+    """
+    Set every byte of buffer to value, in place (no new array).
+
+    The filled part is copied after itself, doubling each time,
+    so it's a few memmove() whatever the size.
+
+    Args:
+        buffer (bytearray): The array to fill
+        value (int): The byte to write
+    """
+    size = len(buffer)
+    if not size:
+        return
+    with memoryview(buffer) as view:
+        view[0] = value
+        filled = 1
+        while filled < size:
+            step = min(filled, size - filled)
+            view[filled:filled + step] = view[:step]
+            filled += step
+
+
+class Grid:
+    """
+    Compact representation of a maze's grid.
+
+    Cells are not objects, they are addressed by their index
+    (y * width + x) in flat bytearrays:
+        walls: 4 bits mask per cell (north=1, east=2, south=4, west=8)
+        reserved, visited, path: one flag per cell (0 or 1)
+
+    Neighbours are computed from the index, nothing is stored.
+    Indexing the grid (grid[y][x]) gives a CellView, a Cell-like object
+    that read and write directly in the arrays.
+
+    Args:
+        width (int): Number of cells per row
+        height (int): Number of rows
+        size (int): Total number of cells
+        version (int): Increased each time a wall is changed through
+                       the grid, so cached results can be invalidated
+    """
+    def __init__(self, width: int, height: int) -> None:
+        """
+        Build a grid where all cells have their 4 walls closed.
+
+        Args:
+            width (int): Number of cells per row
+            height (int): Number of rows
+        """
+        self.width: int = width
+        self.height: int = height
+        self.size: int = width * height
+        self.walls: bytearray = bytearray([ALL_WALLS]) * self.size
+        self.reserved: bytearray = bytearray(self.size)
+        self.visited: bytearray = bytearray(self.size)
+        self.path: bytearray = bytearray(self.size)
+        self.version: int = 0
+
+    def reset(self) -> None:
+        """
+        Close all walls and clear the visited and path flags, in place.
+
+        The arrays are reused (no allocation), reserved cells are kept:
+        they only depend on the size.
+        """
+        fill(self.walls, ALL_WALLS)
+        fill(self.visited, 0)
+        fill(self.path, 0)
+        self.version += 1
+
+    def check_border(self) -> None:
+        """
+        Check that no wall of the border is open (loaded mazes).
+
+        Raises:
+            ValueError: If a border wall of the grid is open
+        """
+        walls = self.walls
+        width = self.width
+        if (0 in walls[:width].translate(WALL_BITS[NORTH])
+                or 0 in walls[-width:].translate(WALL_BITS[SOUTH])
+                or 0 in walls[::width].translate(WALL_BITS[WEST])
+                or 0 in walls[width - 1::width].translate(WALL_BITS[EAST])):
+            raise ValueError("The border of the maze need to be closed")
+
+    def check_walls(self) -> None:
+        """
+        Check a whole loaded grid, like load_maze() does row by row:
+        the border is closed and a wall closed on one side is closed
+        on the other side too.
+
+        The end of a row and the start of the next one are compared
+        too, they are both border walls (closed).
+
+        Raises:
+            ValueError: If the border is open or a wall is only
+                        closed on one side
+        """
+        self.check_border()
+        walls = self.walls
+        width = self.width
+        for wall, other, step in ((EAST, WEST, 1), (SOUTH, NORTH, width)):
+            near = walls[:-step].translate(WALL_BITS[wall])
+            far = walls[step:].translate(WALL_BITS[other])
+            if near != far:
+                # Only on error: find the first cell to report it
+                index = next(i for i, (a, b) in enumerate(zip(near, far))
+                             if a != b)
+                x, y = self.coords(index)
+                raise ValueError(f"Cell ({x}, {y}): its "
+                                 f"{'east' if wall == EAST else 'south'} "
+                                 "wall doesn't match its neighbour's")
+
+    def index(self, x: int, y: int) -> int:
+        """Return the index of the cell at (x, y)"""
+        return y * self.width + x
+
+    def coords(self, index: int) -> tuple[int, int]:
+        """Return the (x, y) coordinate of the cell at index"""
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def neighbours(self, index: int) -> list[int]:
+        """
+        Return the index of the neighbours of a cell.
+
+        The order is always south, north, east, west.
+
+        Args:
+            index (int): Index of the cell
+
+        Return:
+            neighbours (list[int]): Index of each neighbour in the grid
+        """
+        width = self.width
+        x = index % width
+        neighbours = []
+        if index + width < self.size:
+            neighbours.append(index + width)
+        if index >= width:
+            neighbours.append(index - width)
+        if x < width - 1:
+            neighbours.append(index + 1)
+        if x > 0:
+            neighbours.append(index - 1)
+        return neighbours
+
+    def moves(self) -> dict[int, str]:
+        """
+        Letter of the move for each index difference between neighbours.
+
+        Vertical moves are set last, so a grid of width 1 works too.
+        """
+        return {1: "E", -1: "W", self.width: "S", -self.width: "N"}
+
+    def open_neighbours(self, index: int) -> list[int]:
+        """
+        Return the neighbours that can be reached (no wall between).
+
+        Same order as neighbours().
+
+        Args:
+            index (int): Index of the cell
+
+        Return:
+            accessible (list[int]): Index of each accessible neighbour
+        """
+        width = self.width
+        mask = self.walls[index]
+        accessible = []
+        if not mask & SOUTH and index + width < self.size:
+            accessible.append(index + width)
+        if not mask & NORTH and index >= width:
+            accessible.append(index - width)
+        if not mask & EAST and index % width < width - 1:
+            accessible.append(index + 1)
+        if not mask & WEST and index % width > 0:
+            accessible.append(index - 1)
+        return accessible
+
+    def direction(self, index_1: int, index_2: int) -> int:
+        """
+        Return the wall of index_1 that face its neighbour index_2.
+
+        Vertical moves are checked first, so a grid of width 1 works too.
+        """
+        diff = index_2 - index_1
+        if diff == self.width:
+            return SOUTH
+        elif diff == -self.width:
+            return NORTH
+        elif diff == 1:
+            return EAST
+        return WEST
+
+    def link(self, index_1: int, index_2: int) -> None:
+        """
+        Destroy the wall between two neighbours.
+
+        Args:
+            index_1 (int): Neighbour of index_2
+            index_2 (int): Neighbour of index_1
+        """
+        self.version += 1
+        diff = index_2 - index_1
+        if diff == self.width:
+            self.walls[index_1] &= ~SOUTH
+            self.walls[index_2] &= ~NORTH
+        elif diff == -self.width:
+            self.walls[index_1] &= ~NORTH
+            self.walls[index_2] &= ~SOUTH
+        elif diff == 1:
+            self.walls[index_1] &= ~EAST
+            self.walls[index_2] &= ~WEST
+        else:
+            self.walls[index_1] &= ~WEST
+            self.walls[index_2] &= ~EAST
+
+    def is_wall_between(self, index_1: int, index_2: int) -> bool:
+        """Check if there is a wall between two neighbours"""
+        return bool(self.walls[index_1] & self.direction(index_1, index_2))
+
+    def count_wall(self, index: int) -> int:
+        """Count how much closed wall does the cell have"""
+        return WALL_COUNT[self.walls[index]]
+
+    def open_walls(self) -> int:
+        """
+        Count the passages of the whole maze (walls destroyed).
+
+        A passage opens a wall on both cells, 16 C-speed counts
+        (one per mask) instead of a loop over the cells.
+        """
+        opened = sum(self.walls.count(mask) * (4 - WALL_COUNT[mask])
+                     for mask in range(16))
+        return opened // 2
+
+    def cell(self, index: int) -> 'CellView':
+        """Return a Cell-like view on the cell at index"""
+        y, x = divmod(index, self.width)
+        return CellView(self, x, y)
+
+    def __getitem__(self, y: int) -> 'RowView':
+        """Return a view of the row y, so grid[y][x] still works"""
+        if not 0 <= y < self.height:
+            raise IndexError("grid row out of range")
+        return RowView(self, y)
+
+    def __iter__(self) -> Iterator['RowView']:
+        """Iterate over the rows"""
+        for y in range(self.height):
+            yield RowView(self, y)
+
+    def __len__(self) -> int:
+        """Number of rows, like the old list[list[Cell]]"""
+        return self.height
+
+
+class RowView:
+    """
+    One row of the grid, give CellView for each x.
+
+    Args:
+        grid (Grid): The grid the row belong to
+        y (int): Row number
+    """
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid: Grid, y: int) -> None:
+        """Store the grid and the row number"""
+        self.grid: Grid = grid
+        self.y: int = y
+
+    def __getitem__(self, x: int) -> 'CellView':
+        """Return the cell at x in this row"""
+        if not 0 <= x < self.grid.width:
+            raise IndexError("grid column out of range")
+        return CellView(self.grid, x, self.y)
+
+    def __iter__(self) -> Iterator['CellView']:
+        """Iterate over the cells of the row"""
+        for x in range(self.grid.width):
+            yield CellView(self.grid, x, self.y)
+
+    def __len__(self) -> int:
+        """Number of cells in the row"""
+        return self.grid.width
+
+
+class WallsView(MutableMapping[str, bool]):
+    """
+    Dict-like access to the walls of a cell ({'north': True, ...}).
+
+    Args:
+        grid (Grid): Grid storing the walls
+        index (int): Index of the cell
+    """
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid: Grid, index: int) -> None:
+        """Store the grid and the cell index"""
+        self.grid: Grid = grid
+        self.index: int = index
+
+    def __getitem__(self, direction: str) -> bool:
+        """Return True if the wall in this direction is closed"""
+        return bool(self.grid.walls[self.index] & DIRECTIONS[direction])
+
+    def __setitem__(self, direction: str, closed: bool) -> None:
+        """Close or open the wall in this direction (this cell only)"""
+        self.grid.version += 1
+        if closed:
+            self.grid.walls[self.index] |= DIRECTIONS[direction]
+        else:
+            self.grid.walls[self.index] &= ~DIRECTIONS[direction]
+
+    def __delitem__(self, direction: str) -> None:
+        """Walls are fixed, they can't be removed from the mapping"""
+        raise TypeError("A cell always has 4 walls")
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the directions"""
+        return iter(DIRECTIONS)
+
+    def __len__(self) -> int:
+        """Always 4 walls"""
+        return 4
+
+
+class CellView:
+    """
+    Cell-like object reading and writing in a Grid.
+
+    Offer the same interface as the old Cell class (walls dict,
+    neighbours, visited, reserved, path, x, y), so code written for
+    the old list[list[Cell]] grid keeps working.
+    Two views on the same cell are equal and have the same hash.
+
+    Attributes:
+        grid (Grid): The grid the cell belong to
+        x (int): x position of the cell
+        y (int): y position of the cell
+        index (int): Index of the cell in the grid arrays
+    """
+    __slots__ = ("grid", "x", "y", "index")
+
+    def __init__(self, grid: Grid, x: int, y: int) -> None:
+        """
+        Initialise the view on the cell (x, y) of the grid.
+
+        Args:
+            grid (Grid): The grid storing the cell
+            x (int): X-coordinate of the cell
+            y (int): Y-coordinate of the cell
+        """
+        self.grid: Grid = grid
+        self.x: int = x
+        self.y: int = y
+        self.index: int = y * grid.width + x
+
+    @property
+    def walls(self) -> WallsView:
+        """The walls of the cell in different directions"""
+        return WallsView(self.grid, self.index)
+
+    @property
+    def neighbours(self) -> list['CellView']:
+        """The neighbours of the cell (south, north, east, west)"""
+        return [self.grid.cell(n) for n in self.grid.neighbours(self.index)]
+
+    @property
+    def visited(self) -> bool:
+        """Status in the generation algorithms"""
+        return bool(self.grid.visited[self.index])
+
+    @visited.setter
+    def visited(self, value: bool) -> None:
+        self.grid.visited[self.index] = 1 if value else 0
+
+    @property
+    def reserved(self) -> bool:
+        """Is the cell in the 42 pattern at the mid"""
+        return bool(self.grid.reserved[self.index])
+
+    @reserved.setter
+    def reserved(self, value: bool) -> None:
+        self.grid.reserved[self.index] = 1 if value else 0
+
+    @property
+    def path(self) -> bool:
+        """Is the cell displayed as part of the path"""
+        return bool(self.grid.path[self.index])
+
+    @path.setter
+    def path(self, value: bool) -> None:
+        self.grid.path[self.index] = 1 if value else 0
+
+    def destroy_wall(self, direction: str) -> None:
+        """
+        Destroy the wall in the specified direction (this cell only)
+
+        Args:
+            direction (str): one of 'south', 'east', 'west', 'north'
+        """
+        self.grid.version += 1
+        self.grid.walls[self.index] &= ~DIRECTIONS[direction]
+
+    def count_wall(self) -> int:
+        """Count how much closed wall does the cell have"""
+        return self.grid.count_wall(self.index)
+
+    def is_wall_between(self, n: 'CellView') -> bool:
+        """
+        Check if ther is a wall between the given neighbour n
+
+        Args:
+            n (CellView): Neighbour cell to check.
+
+        Return:
+            bool: True if wall between, False otherwise.
+        """
+        return self.grid.is_wall_between(self.index, n.index)
+
+    def __eq__(self, other: object) -> bool:
+        """Views are equal when they look at the same cell"""
+        if not isinstance(other, CellView):
+            return NotImplemented
+        return self.grid is other.grid and self.index == other.index
+
+    def __hash__(self) -> int:
+        """Hash on the index, so views can be stored in sets/dicts"""
+        return hash(self.index)
+
+    def __repr__(self) -> str:
+        """Show the coordinate and the hexa walls"""
+        mask = self.grid.walls[self.index]
+        return f"CellView({self.x}, {self.y}, walls={mask:X})"
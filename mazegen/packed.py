@@ -0,0 +1,348 @@
+from mazegen.generate import MazeGenerator
+from mazegen.solve import breadth_first_search
+from types import TracebackType
+from typing import Any, BinaryIO
+import mmap
+import struct
+
+
+# Header: magic, version, flags, padding, width, height,
+# entry x, entry y, exit x, exit y, seed (seed * 10 + algo, 0 if unknown),
+# number of moves in the path. Little endian, 48 bytes.
+HEADER = struct.Struct("<4sBBHIIIIIIQQ")
+MAGIC = b"AMZP"
+VERSION = 1
+HAS_PATH = 1
+
+# Moves are stored on 2 bits: N=0, E=1, S=2, W=3
+MOVE_LETTERS = b"NESW"
+TO_CODE: bytes = bytes.maketrans(MOVE_LETTERS, bytes(range(4)))
+TO_LETTER: bytes = bytes.maketrans(bytes(range(4)), MOVE_LETTERS)
+
+# translate() tables to build/split packed bytes
+HIGH_NIBBLE: bytes = bytes((v << 4) & 255 for v in range(256))
+LOW_NIBBLE: bytes = bytes(v & 15 for v in range(256))
+FROM_HIGH_NIBBLE: bytes = bytes(v >> 4 for v in range(256))
+TO_MOVE: list[bytes] = [bytes((v << (2 * k)) & 255 for v in range(256))
+                        for k in range(4)]
+FROM_MOVE: list[bytes] = [bytes((v >> (2 * k)) & 3 for v in range(256))
+                          for k in range(4)]
+
+
+def or_bytes(*parts: bytes) -> bytes:
+    """
+    Bitwise or of byte strings of the same length.
+
+    Done on big ints, so it stays in C even for millions of bytes.
+    """
+    total = 0
+    for part in parts:
+        total |= int.from_bytes(part, "big")
+    return total.to_bytes(len(parts[0]), "big")
+
+
+def pack_walls(walls: bytes | bytearray) -> bytes:
+    """
+    Two cells per byte: even cell in the low nibble, odd cell in the high.
+
+    Args:
+        walls (bytes): One wall mask (0-15) per cell
+
+    Returns:
+        packed (bytes): (len(walls) + 1) // 2 bytes
+    """
+    even = bytes(walls[0::2])
+    odd = bytes(walls[1::2]).ljust(len(even), b"\0")
+    return or_bytes(even, odd.translate(HIGH_NIBBLE))
+
+
+def unpack_walls(packed: bytes, size: int) -> bytearray:
+    """
+    Reverse of pack_walls().
+
+    Args:
+        packed (bytes): Packed walls
+        size (int): Number of cells
+
+    Returns:
+        walls (bytearray): One wall mask per cell
+    """
+    walls = bytearray(len(packed) * 2)
+    walls[0::2] = packed.translate(LOW_NIBBLE)
+    walls[1::2] = packed.translate(FROM_HIGH_NIBBLE)
+    del walls[size:]
+    return walls
+
+
+def pack_moves(moves: bytes) -> bytes:
+    """
+    Four moves per byte, the first one in the lowest bits.
+
+    Args:
+        moves (bytes): One letter (N, E, S, W) per move
+    """
+    if not moves:
+        return b""
+    codes = moves.translate(TO_CODE)
+    codes = codes.ljust(-(-len(codes) // 4) * 4, b"\0")
+    return or_bytes(*(codes[k::4].translate(TO_MOVE[k]) for k in range(4)))
+
+
+def unpack_moves(packed: bytes, count: int) -> bytes:
+    """
+    Reverse of pack_moves().
+
+    Args:
+        packed (bytes): Packed moves
+        count (int): Number of moves
+
+    Returns:
+        moves (bytes): One letter (N, E, S, W) per move
+    """
+    codes = bytearray(len(packed) * 4)
+    for k in range(4):
+        codes[k::4] = packed.translate(FROM_MOVE[k])
+    del codes[count:]
+    return bytes(codes.translate(TO_LETTER))
+
+
+def maze_moves(maze: MazeGenerator) -> bytes:
+    """Letters of the moves of maze.path (same as in save_maze())"""
+    moves = maze.grid.moves()
+    path = [cell.index for cell in maze.path]
+    return "".join([moves[curr - prev]
+                    for prev, curr in zip(path, path[1:])]).encode()
+
+
+def save_packed(maze: MazeGenerator, filename: str,
+                seed: int | None = None) -> None:
+    """
+    Save the maze in the packed binary format.
+
+    Args:
+        maze (MazeGenerator): The maze to save
+        filename (str): Path to the output file
+        seed (Optional[int]): Seed written in the header (seed * 10 + algo),
+                              by default the seed of the last apply_algo(),
+                              0 for unknown
+    """
+    with open(filename, "wb") as f:
+        write_packed(maze, f, seed)
+
+
+def write_packed(maze: MazeGenerator, f: BinaryIO,
+                 seed: int | None = None) -> None:
+    """
+    Write the maze in the packed format to an open binary stream
+    (file, io.BytesIO...).
+
+    Args:
+        maze (MazeGenerator): The maze to write
+        f (BinaryIO): Where to write
+        seed (Optional[int]): Seed written in the header, see save_packed()
+    """
+    if seed is None:
+        seed = (maze.seed - 1) * 10 + maze.algo
+    moves = maze_moves(maze)
+    f.write(HEADER.pack(MAGIC, VERSION, HAS_PATH if moves else 0, 0,
+                        maze.width, maze.height,
+                        maze.start[0], maze.start[1],
+                        maze.end[0], maze.end[1],
+                        max(seed, 0), len(moves)))
+    f.write(pack_walls(maze.grid.walls))
+    f.write(pack_moves(moves))
+
+
+def read_packed(maze: MazeGenerator, data: bytes) -> None:
+    """
+    Load write_packed() bytes in the grid of maze, in place.
+
+    The maze keep its seed and settings, only the walls and the path
+    are replaced (cached maze, see MazeCache).
+
+    Args:
+        maze (MazeGenerator): Maze of the same size, entry and exit
+        data (bytes): The packed maze
+
+    Raises:
+        ValueError: If data is not a packed maze of this size,
+                    entry and exit, its walls are not valid (see
+                    Grid.check_walls()) or its path is not valid
+                    (see replay_path())
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Not a packed maze")
+    (magic, version, _, _, width, height,
+     entry_x, entry_y, exit_x, exit_y, _, moves) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a packed maze")
+    if ((width, height, (entry_x, entry_y), (exit_x, exit_y))
+            != (maze.width, maze.height, tuple(maze.start), tuple(maze.end))):
+        raise ValueError("The packed maze is not the same size, "
+                         "entry or exit")
+    walls_size = (width * height + 1) // 2
+    if len(data) != HEADER.size + walls_size + (moves + 3) // 4:
+        raise ValueError("Truncated packed maze")
+    grid = maze.grid
+    grid.walls[:] = unpack_walls(data[HEADER.size:HEADER.size + walls_size],
+                                 width * height)
+    grid.version += 1
+    grid.check_walls()
+    load_path(maze, unpack_moves(data[HEADER.size + walls_size:], moves))
+
+
+def load_path(maze: MazeGenerator, moves: bytes) -> None:
+    """
+    Set the path of a loaded maze, like load_maze(): replayed from
+    its moves, or solved with BFS if the file had no path.
+
+    Raises:
+        ValueError: If the path is not valid (see replay_path())
+    """
+    if moves or maze.start == maze.end:
+        maze.replay_path(moves)
+    else:
+        maze.path = breadth_first_search(maze)
+    maze.build_field()
+
+
+class PackedMaze:
+    """
+    Read a packed maze file through mmap.
+
+    Only the header is parsed when opening, walls() read a single
+    byte of the file, so any cell is O(1) without loading the maze.
+
+    Attributes:
+        width (int): Maze width
+        height (int): Maze height
+        entry (tuple[int, int]): Entry coordinate
+        exit (tuple[int, int]): Exit coordinate
+        seed (int): seed * 10 + algo, 0 if unknown
+        moves (int): Number of moves in the path
+
+    Can be used as a context manager to close the file.
+    """
+    def __init__(self, filename: str) -> None:
+        """
+        Map the file and read its header.
+
+        Args:
+            filename (str): Path to a file written by save_packed()
+
+        Raises:
+            ValueError: If the file is not a packed maze
+        """
+        self.file = open(filename, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            if len(self.data) < HEADER.size:
+                raise ValueError("Not a packed maze file")
+            (magic, version, _, _, width, height,
+             entry_x, entry_y, exit_x, exit_y,
+             seed, moves) = HEADER.unpack_from(self.data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not a packed maze file")
+            self.width: int = width
+            self.height: int = height
+            self.entry: tuple[int, int] = (entry_x, entry_y)
+            self.exit: tuple[int, int] = (exit_x, exit_y)
+            self.seed: int = seed
+            self.moves: int = moves
+            self.walls_size: int = (width * height + 1) // 2
+            if (len(self.data) < HEADER.size + self.walls_size
+                    + (self.moves + 3) // 4):
+                raise ValueError("Truncated packed maze file")
+        except Exception:
+            self.close()
+            raise
+
+    def walls(self, x: int, y: int) -> int:
+        """
+        Return the wall mask of the cell (x, y) (north=1 ... west=8)
+
+        Raises:
+            IndexError: If (x, y) is out of the maze
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError("cell out of the maze")
+        index = y * self.width + x
+        byte = self.data[HEADER.size + index // 2]
+        return byte >> 4 if index & 1 else byte & 15
+
+    def path(self) -> bytes:
+        """Return the moves of the path (b"ESSW...")"""
+        start = HEADER.size + self.walls_size
+        return unpack_moves(self.data[start:start + (self.moves + 3) // 4],
+                            self.moves)
+
+    def to_maze(self, displayer: Any = None) -> MazeGenerator:
+        """
+        Load the whole maze in a MazeGenerator.
+
+        Args:
+            displayer (Optional[Any]): Class to display the maze
+
+        Raises:
+            ValueError: If the walls are not valid (see
+                        Grid.check_walls()) or the path is not valid
+        """
+        seed = self.seed if self.seed > 1 else None
+        maze = MazeGenerator(self.width, self.height, self.entry, self.exit,
+                             seed, displayer)
+        if seed is not None:
+            # Already generated, like after apply_algo()
+            maze.seed += 1
+        start = HEADER.size
+        maze.grid.walls = unpack_walls(
+            self.data[start:start + self.walls_size],
+            self.width * self.height
+        )
+        maze.grid.check_walls()
+        load_path(maze, self.path())
+        return maze
+
+    def close(self) -> None:
+        """Unmap and close the file"""
+        if getattr(self, "data", None) is not None:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> 'PackedMaze':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None,
+                 exc: BaseException | None,
+                 traceback: TracebackType | None) -> None:
+        self.close()
+
+
+def text_to_packed(source: str, destination: str) -> None:
+    """
+    Convert a save_maze() text file to the packed format (seed unknown).
+
+    Args:
+        source (str): Hexa text file
+        destination (str): Packed file to write
+    """
+    save_packed(MazeGenerator.load_maze(source), destination, seed=0)
+
+
+def packed_to_text(source: str, destination: str) -> None:
+    """
+    Convert a packed file to the save_maze() text format.
+
+    Args:
+        source (str): Packed file
+        destination (str): Hexa text file to write
+    """
+    with PackedMaze(source) as packed:
+        maze = packed.to_maze()
+    maze.save_maze(destination)
+
+
+def is_packed(filename: str) -> bool:
+    """Check if the file starts like a packed maze"""
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
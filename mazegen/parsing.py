@@ -6,6 +6,10 @@ class ParsingError(Exception):
     pass
 
 
+# Keys that need to be in a config file
+MANDATORY = ("WIDTH", "HEIGHT", "ENTRY", "EXIT", "OUTPUT_FILE", "PERFECT")
+
+
 class ParsingResult(TypedDict, total=False):
     """
     The return of the parsing function.
@@ -17,7 +21,14 @@ class ParsingResult(TypedDict, total=False):
         exit (list[int, int]): Exit cell coordinate (x, y).
         output_file (str): File where to store the maze structure.
         perfect (bool): whethere th maze is perfect or not (loop or not).
+        loop_ratio (float): Optional part of the dead ends opened
+                            when the maze is not perfect (0 to 1).
+        loops (int): Optional number of walls destroyed when the maze
+                     is not perfect, instead of loop_ratio.
         seed (int): Optional argument to generate a maze based on a seed.
+        cache_dir (str): Optional directory where generated mazes are
+                         kept, to read them back instead of generating.
+        cache_size (int): Optional size limit of cache_dir, in MiB.
     """
     width: int
     height: int
@@ -25,7 +36,11 @@ class ParsingResult(TypedDict, total=False):
     exit: tuple[int, int]
     output_file: str
     perfect: bool
+    loop_ratio: float
+    loops: int
     seed: int
+    cache_dir: str
+    cache_size: int
 
 
 def parsing(filename: str) -> ParsingResult:
@@ -38,117 +53,179 @@ def parsing(filename: str) -> ParsingResult:
     Args:
         filename (str): Path to the input file.
 
+    Returns:
+        dic (ParsingResult): The dictionary with all maze information.
+    """
+    with open(filename, "r") as c:
+        return parse_config(c.read())
+
+
+def parse_config(text: str, mandatory: tuple[str, ...] = MANDATORY,
+                 quiet: bool = False) -> ParsingResult:
+    """
+    Parse the content of a config file (KEY=value lines), so the same
+    parameters can come from somewhere else than a file (server).
+
+    Raises:
+        ParsingError: If the config format is invalid.
+
+    Args:
+        text (str): The config, one KEY=value per line.
+        mandatory (tuple[str, ...]): Keys that need to be present.
+        quiet (bool): Don't print the [INFO] messages (server).
+
     Returns:
         dic (ParsingResult): The dictionary with all maze information.
     """
     dic: ParsingResult = {}
 
-    # store the mandatory input
-    mandatory = ["WIDTH",
-                 "HEIGHT",
-                 "ENTRY",
-                 "EXIT",
-                 "OUTPUT_FILE",
-                 "PERFECT"]
+    # Check the presence of all mandatory
+    for option in mandatory:
+        if option not in text:
+            raise ParsingError(f"Mandatory option {option} was not found!")
 
-    with open(filename, "r") as c:
-        all_file = c.read()
-        # Check the presence of all mandatory
-        for option in mandatory:
-            if option not in all_file:
-                raise ParsingError(f"Mandatory option {option} was not found!")
-
-        c.seek(0)
-        for line in c:
-
-            # Chech if a mandatory is commented or not
-            for i in mandatory:
-                if line.startswith("#" + i):
-                    raise ParsingError("Cannot comment a "
-                                       f"mandatory variable: {i}")
-
-            if '#' in line:
-                continue
+    for line in text.splitlines(keepends=True):
 
-            elif '=' not in line:
-                raise ParsingError("Wrong format, expected: key=value "
-                                   f"in line '{line.strip()}'")
+        # Chech if a mandatory is commented or not
+        for i in mandatory:
+            if line.startswith("#" + i):
+                raise ParsingError("Cannot comment a "
+                                   f"mandatory variable: {i}")
 
-            # Width and Heigh parsing
-            for i in ["WIDTH", "HEIGHT"]:
-                if i in line:
-                    key, value = line.split("=", 1)
-                    try:
-                        int_value: int = int(value.strip())
-                    except ValueError:
-                        raise ParsingError(f"'{key}' accept only numbers "
-                                           f"not: '{value.strip()}'")
-                    if i == "WIDTH":
-                        dic["width"] = int_value
-                    else:
-                        dic["height"] = int_value
-                    continue
+        if '#' in line:
+            continue
 
-            # Entry and Exit parsing
-            for i in ["ENTRY", "EXIT"]:
-                if i in line:
-                    if ',' in line:
-                        key, tup = line.split("=", 1)
-                        v_1, v_2 = tup.split(",", 1)
-                        try:
-                            value_1: int = int(v_1.strip())
-                            value_2: int = int(v_2.strip())
-                        except ValueError:
-                            raise ParsingError(f"'{key}' accept only numbers "
-                                               f"not: '{tup.strip()}'")
-                        if i == "ENTRY":
-                            dic["entry"] = (value_1, value_2)
-                        else:
-                            dic["exit"] = (value_1, value_2)
-                        continue
-                    else:
-                        raise ParsingError(f"Wrong format for {i}, "
-                                           "expected: key=(value_1, value_2)")
-
-            # Output file parsing
-            if "OUTPUT_FILE" in line:
-                k, v = line.split("=", 1)
-                name: str = v.strip()
-
-                if not name.endswith(".txt"):
-                    raise ParsingError(f"filename must be a valid .txt, "
-                                       f"got '{name.strip()}'")
-                dic["output_file"] = name
-                continue
+        elif '=' not in line:
+            raise ParsingError("Wrong format, expected: key=value "
+                               f"in line '{line.strip()}'")
 
-            # Perfect parsing
-            elif "PERFECT" in line:
-                k, v = line.split("=", 1)
-                perfect = v.strip()
-                if perfect == "True":
-                    dic["perfect"] = True
-                elif perfect == "False":
-                    dic["perfect"] = False
+        # Width and Heigh parsing
+        for i in ["WIDTH", "HEIGHT"]:
+            if i in line:
+                key, value = line.split("=", 1)
+                try:
+                    int_value: int = int(value.strip())
+                except ValueError:
+                    raise ParsingError(f"'{key}' accept only numbers "
+                                       f"not: '{value.strip()}'")
+                if i == "WIDTH":
+                    dic["width"] = int_value
                 else:
-                    raise ParsingError("Only True or False are "
-                                       "allowed for PERFECT")
+                    dic["height"] = int_value
                 continue
 
-            # Seed parsing
-            elif "SEED" in line:
-                key, value = line.split("=", 1)
-                if not value.strip():
+        # Entry and Exit parsing
+        for i in ["ENTRY", "EXIT"]:
+            if i in line:
+                if ',' in line:
+                    key, tup = line.split("=", 1)
+                    v_1, v_2 = tup.split(",", 1)
+                    try:
+                        value_1: int = int(v_1.strip())
+                        value_2: int = int(v_2.strip())
+                    except ValueError:
+                        raise ParsingError(f"'{key}' accept only numbers "
+                                           f"not: '{tup.strip()}'")
+                    if i == "ENTRY":
+                        dic["entry"] = (value_1, value_2)
+                    else:
+                        dic["exit"] = (value_1, value_2)
                     continue
-                try:
-                    seed = int(value.strip())
-                    if seed <= 10 or not (0 <= seed % 10 <= 2):
-                        raise ValueError
-                except ValueError:
-                    raise ParsingError("The seed need to be a valid integer "
-                                       "greater than 10, whose last digit is "
-                                       "0, 1 or 2")
-                dic["seed"] = seed
+                else:
+                    raise ParsingError(f"Wrong format for {i}, "
+                                       "expected: key=(value_1, value_2)")
+
+        # Output file parsing
+        if "OUTPUT_FILE" in line:
+            k, v = line.split("=", 1)
+            name: str = v.strip()
+
+            if not name.endswith(".txt"):
+                raise ParsingError(f"filename must be a valid .txt, "
+                                   f"got '{name.strip()}'")
+            dic["output_file"] = name
+            continue
+
+        # Perfect parsing
+        elif "PERFECT" in line:
+            k, v = line.split("=", 1)
+            perfect = v.strip()
+            if perfect == "True":
+                dic["perfect"] = True
+            elif perfect == "False":
+                dic["perfect"] = False
+            else:
+                raise ParsingError("Only True or False are "
+                                   "allowed for PERFECT")
+            continue
+
+        # Loop density parsing (only used if not PERFECT)
+        elif "LOOP_RATIO" in line:
+            key, value = line.split("=", 1)
+            try:
+                ratio = float(value.strip())
+                if not 0 <= ratio <= 1:
+                    raise ValueError
+            except ValueError:
+                raise ParsingError("LOOP_RATIO need to be a number "
+                                   "between 0 and 1, not: "
+                                   f"'{value.strip()}'")
+            dic["loop_ratio"] = ratio
+            continue
+
+        elif "LOOPS" in line:
+            key, value = line.split("=", 1)
+            try:
+                loops = int(value.strip())
+                if loops < 0:
+                    raise ValueError
+            except ValueError:
+                raise ParsingError("LOOPS need to be a positive int, "
+                                   f"not: '{value.strip()}'")
+            dic["loops"] = loops
+            continue
+
+        # Cache of generated mazes
+        elif "CACHE_DIR" in line:
+            key, value = line.split("=", 1)
+            if not value.strip():
+                raise ParsingError("CACHE_DIR need a directory")
+            dic["cache_dir"] = value.strip()
+            continue
+
+        elif "CACHE_SIZE" in line:
+            key, value = line.split("=", 1)
+            try:
+                size = int(value.strip())
+                if size <= 0:
+                    raise ValueError
+            except ValueError:
+                raise ParsingError("CACHE_SIZE need to be a positive int "
+                                   f"(MiB), not: '{value.strip()}'")
+            dic["cache_size"] = size
+            continue
+
+        # Seed parsing
+        elif "SEED" in line:
+            key, value = line.split("=", 1)
+            if not value.strip():
                 continue
+            try:
+                seed = int(value.strip())
+                if seed <= 10 or seed % 10 > 4:
+                    raise ValueError
+            except ValueError:
+                raise ParsingError("The seed need to be a valid integer "
+                                   "greater than 10, whose last digit is "
+                                   "between 0 and 4")
+            dic["seed"] = seed
+            continue
+
+    # A mandatory key can be in the text but not on a valid line
+    # (commented at the end of the line, part of another key...)
+    for option in mandatory:
+        if option.lower() not in dic:
+            raise ParsingError(f"Mandatory option {option} was not found!")
 
     # verify if the entry and exit are in the range of the width and heigh
     if not (0 <= dic['entry'][0] < dic['width']
@@ -166,7 +243,7 @@ def parsing(filename: str) -> ParsingResult:
         raise ParsingError("Entry and Exit shoud be at different coordinate")
 
     # Verify that the width and height let us display the 42 pattern
-    if dic['width'] < 9 or dic['height'] < 7:
+    if not quiet and (dic['width'] < 9 or dic['height'] < 7):
         print("[INFO]: The given maze size is too small "
               "to display the 42 pattern")
     return dic
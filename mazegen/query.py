@@ -0,0 +1,126 @@
+from mazegen.grid import Grid, CellView
+from mazegen.solve import DistanceField
+from collections import OrderedDict
+from typing import Any
+
+
+class PathQuery:
+    """
+    Answer many shortest path questions on the same maze.
+
+    A BFS tree (DistanceField) is computed per source cell and kept
+    in a LRU cache. A query (a, b) reuse the tree of a or of b when one
+    of them is cached: a tree from b give the path a -> b by following
+    parents, a tree from a give it reversed. The maze itself is never
+    modified (start/end are not used).
+
+    Trees are dropped when the maze's grid or a wall changes.
+
+    Attributes:
+        maze (MazeGenerator): The maze to query (anything with a .grid)
+        max_trees (int): Number of trees kept in the cache
+        hits (int): Queries answered with a cached tree
+        misses (int): Queries that needed a new BFS
+    """
+    def __init__(self, maze: Any, max_trees: int = 16,
+                 max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Initialise an empty cache.
+
+        Args:
+            maze (MazeGenerator): The maze to query
+            max_trees (int): Maximum number of cached trees
+            max_bytes (int): Memory cap of the cache, a tree use 8 bytes
+                             per cell. At least one tree is always kept.
+        """
+        self.maze: Any = maze
+        size = maze.grid.size
+        self.max_trees: int = max(1, min(max_trees, max_bytes // (8 * size)))
+        self.trees: OrderedDict[int, DistanceField] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.grid: Grid = maze.grid
+        self.version: int = maze.grid.version
+
+    def check_grid(self) -> Grid:
+        """Drop all trees if the maze changed since they were computed"""
+        grid: Grid = self.maze.grid
+        if grid is not self.grid or grid.version != self.version:
+            self.trees.clear()
+            self.grid = grid
+            self.version = grid.version
+        return grid
+
+    def cached(self, source: int) -> DistanceField | None:
+        """Return the cached tree of source (now most recent), or None"""
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+        return tree
+
+    def tree(self, source: int) -> DistanceField:
+        """
+        Return the BFS tree of source, from the cache or computed.
+
+        Args:
+            source (int): Index of the source cell
+        """
+        grid = self.check_grid()
+        tree = self.cached(source)
+        if tree is None:
+            tree = DistanceField(grid, source)
+            self.trees[source] = tree
+            # Evict the least recently used trees
+            while len(self.trees) > self.max_trees:
+                self.trees.popitem(last=False)
+        return tree
+
+    def find(self, a: tuple[int, int], b: tuple[int, int]
+             ) -> tuple[DistanceField, int, int]:
+        """
+        Pick the tree answering (a, b): cached one of a or b, or a new one.
+
+        Returns:
+            tree (DistanceField): The tree to use
+            source (int): Index of the tree's source (a or b)
+            other (int): Index of the other cell
+        """
+        grid = self.check_grid()
+        index_a = grid.index(*a)
+        index_b = grid.index(*b)
+        for source, other in ((index_a, index_b), (index_b, index_a)):
+            tree = self.cached(source)
+            if tree is not None:
+                self.hits += 1
+                return tree, source, other
+        self.misses += 1
+        return self.tree(index_a), index_a, index_b
+
+    def path(self, a: tuple[int, int],
+             b: tuple[int, int]) -> list[CellView]:
+        """
+        Shortest path from a to b.
+
+        Args:
+            a (tuple[int, int]): First cell (x, y)
+            b (tuple[int, int]): Last cell (x, y)
+
+        Return:
+            path (list[CellView]): Cells from a to b, empty if no path
+        """
+        tree, source, other = self.find(a, b)
+        path = tree.path_from(other)
+        if source != self.grid.index(*b):
+            # Tree of a: the path goes from b up to a
+            path.reverse()
+        return [self.grid.cell(index) for index in path]
+
+    def distance(self, a: tuple[int, int], b: tuple[int, int]) -> int:
+        """
+        Length (in moves) of the shortest path between a and b.
+
+        Return:
+            int: Number of moves, -1 if b can't be reached from a
+        """
+        tree, _, other = self.find(a, b)
+        return tree.distance[other]
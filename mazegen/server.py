@@ -0,0 +1,571 @@
+from mazegen.batch import job_maze, job_seeds
+from mazegen.generate import LOOP_RATIO
+from mazegen.grid import WRITE_CHUNK
+from mazegen.packed import write_packed
+from mazegen.parsing import parse_config, ParsingError, ParsingResult
+from mazegen.parsing import MANDATORY
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from typing import Any, TypedDict
+from urllib.parse import parse_qsl
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import time
+
+
+# Keys needed in a request: the config file ones, except the output file
+REQUIRED = tuple(key for key in MANDATORY if key != "OUTPUT_FILE")
+
+# Biggest request body accepted, a config is a few lines
+MAX_BODY = 64 * 1024
+
+# Biggest maze generated for a request (width * height), a bigger
+# one would hold a worker for seconds and a lot of memory
+MAX_CELLS = 1000 * 1000
+
+# Workers are started by a fork server when the platform has one: a
+# worker forked from the server itself (a worker restarted after a
+# crash) would inherit the client connections, and keep them open
+# after the server closed them
+START_METHOD = ("forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else None)
+
+# Latencies kept per endpoint for the percentiles
+LATENCY_WINDOW = 1024
+
+# Content type of each output format (?format=)
+FORMATS = {
+    "text": "text/plain; charset=ascii",
+    "packed": "application/octet-stream"
+}
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+# A generation waiting for a worker: config, seed, format, result
+Job = tuple[ParsingResult, int, str, 'asyncio.Future[bytes]']
+
+
+class HTTPError(Exception):
+    """Error sent back to the client, with its HTTP status"""
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status: int = status
+
+
+class EndpointReport(TypedDict):
+    """
+    Metrics of one endpoint.
+
+    Keys:
+        requests (int): Requests answered
+        errors (int): Answers with an error status (4xx, 5xx)
+        bytes (int): Body bytes sent
+        per_second (float): Requests per second since the server started
+        mean_ms (float): Mean latency of the last LATENCY_WINDOW requests
+        p50_ms (float): Median latency
+        p99_ms (float): 99th percentile latency
+        max_ms (float): Slowest of the last requests
+    """
+    requests: int
+    errors: int
+    bytes: int
+    per_second: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class ServerReport(TypedDict):
+    """
+    Answer of GET /metrics.
+
+    Keys:
+        uptime (float): Seconds since the server started
+        workers (int): Processes generating the mazes
+        queued (int): Generations waiting for a worker
+        queue_size (int): Generations that can wait before a 503
+        in_flight (int): Distinct seeded generations queued or running
+        coalesced (int): Requests answered by a generation already asked
+        rejected (int): Requests refused because the queue was full
+        restarts (int): Times the worker pool was started again
+        endpoints (dict[str, EndpointReport]): Metrics by path
+    """
+    uptime: float
+    workers: int
+    queued: int
+    queue_size: int
+    in_flight: int
+    coalesced: int
+    rejected: int
+    restarts: int
+    endpoints: dict[str, EndpointReport]
+
+
+class EndpointMetrics:
+    """
+    Counters and recent latencies of one endpoint.
+
+    Attributes:
+        requests (int): Requests answered
+        errors (int): Answers with an error status
+        bytes (int): Body bytes sent
+        latencies (deque[float]): Seconds of the last requests
+    """
+    def __init__(self) -> None:
+        """Start with no request"""
+        self.requests: int = 0
+        self.errors: int = 0
+        self.bytes: int = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, status: int, seconds: float, size: int) -> None:
+        """
+        Count an answered request.
+
+        Args:
+            status (int): HTTP status sent
+            seconds (float): Time from the request read to the answer sent
+            size (int): Body bytes sent
+        """
+        self.requests += 1
+        if status >= 400:
+            self.errors += 1
+        self.bytes += size
+        self.latencies.append(seconds)
+
+    def report(self, uptime: float) -> EndpointReport:
+        """
+        Snapshot of the metrics.
+
+        Args:
+            uptime (float): Seconds since the server started
+        """
+        latencies = sorted(self.latencies) or [0.0]
+
+        def percentile(part: float) -> float:
+            """Latency under which 'part' of the requests are, in ms"""
+            return latencies[int(part * (len(latencies) - 1))] * 1000
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'per_second': self.requests / max(uptime, 1e-9),
+            'mean_ms': sum(latencies) / len(latencies) * 1000,
+            'p50_ms': percentile(0.5),
+            'p99_ms': percentile(0.99),
+            'max_ms': latencies[-1] * 1000
+        }
+
+
+def render_maze(config: ParsingResult, seed: int, fmt: str) -> bytes:
+    """
+    Generate a maze and encode it (job of a worker process).
+
+    The generator of the process is reused between jobs with the same
+    size (job_maze()), like the batch generation.
+
+    Args:
+        config (ParsingResult): The parsed request
+        seed (int): Seed of the maze (seed * 10 + algo)
+        fmt (str): "text" (save_maze() format) or "packed"
+
+    Returns:
+        data (bytes): The encoded maze
+
+    Raises:
+        ValueError: If entry or exit cell is reserved by the 42 pattern.
+    """
+    maze = job_maze(config['width'], config['height'],
+                    config['entry'], config['exit'],
+                    config.get('loop_ratio', LOOP_RATIO), config.get('loops'))
+    # Same as MazeGenerator(..., seed): the last digit is the algo
+    maze.seed, maze.algo = divmod(seed, 10)
+    maze.apply_algo(config['perfect'])
+    if fmt == "packed":
+        binary = io.BytesIO()
+        write_packed(maze, binary, seed)
+        return binary.getvalue()
+    text = io.StringIO()
+    maze.write_maze(text)
+    return text.getvalue().encode('ascii')
+
+
+class MazeServer:
+    """
+    Maze generation service, HTTP/1.1 on localhost.
+
+    Endpoints:
+        GET|POST /maze     The parameters of config.txt, as the request
+                           body (KEY=value lines) or in the query string
+                           (?width=10&height=8&entry=0,0...).
+                           ?format=text (save_maze() format, default)
+                           or ?format=packed (packed.py binary format).
+                           The seed used is sent in the X-Maze-Seed header
+        GET /metrics       ServerReport, in JSON
+
+    Mazes are generated by a process pool, one dispatcher task per
+    worker takes the generations from a bounded queue: when it's full
+    the request is refused at once (503, Retry-After) instead of
+    piling up. Mazes bigger than max_cells are refused (413) before
+    being queued. A worker crash (killed, out of memory) fails its
+    requests with a 500 and the pool is started again. Requests with
+    the same parameters and seed while the first one is queued or
+    running share its result (coalescing), without a seed each
+    request is a new maze.
+
+    Attributes:
+        workers (int): Processes generating the mazes
+        max_cells (int): Biggest maze accepted (width * height)
+        queue (asyncio.Queue[Job]): Generations waiting for a worker
+        pending (dict[tuple, asyncio.Future[bytes]]): Seeded generations
+                                                      queued or running
+        coalesced (int): Requests answered by a pending generation
+        rejected (int): Requests refused because the queue was full
+        restarts (int): Times the pool was started again after a crash
+        metrics (dict[str, EndpointMetrics]): Metrics by path
+    """
+    def __init__(self, workers: int = 1, queue_size: int = 64,
+                 max_cells: int = MAX_CELLS) -> None:
+        """
+        Args:
+            workers (int): Processes generating the mazes
+            queue_size (int): Generations that can wait for a worker
+            max_cells (int): Biggest maze accepted (width * height)
+        """
+        self.workers: int = workers
+        self.max_cells: int = max_cells
+        self.queue: asyncio.Queue[Job] = asyncio.Queue(queue_size)
+        self.pending: dict[tuple[Any, ...], asyncio.Future[bytes]] = {}
+        self.coalesced: int = 0
+        self.rejected: int = 0
+        self.restarts: int = 0
+        self.metrics: dict[str, EndpointMetrics] = {
+            path: EndpointMetrics() for path in ("/maze", "/metrics", "other")
+        }
+        self.started: float = time.monotonic()
+        self.pool: ProcessPoolExecutor | None = None
+        self.dispatchers: list[asyncio.Task[None]] = []
+
+    async def start(self, host: str = "127.0.0.1",
+                    port: int = 4242) -> asyncio.Server:
+        """
+        Start the workers and listen, serve_forever() the returned server.
+
+        Args:
+            host (str): Address to listen on, localhost by default
+            port (int): Port to listen on, 0 for any free port
+        """
+        await self.start_pool()
+        self.dispatchers = [asyncio.create_task(self.dispatch())
+                            for _ in range(self.workers)]
+        self.started = time.monotonic()
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_pool(self) -> None:
+        """
+        Start the worker processes, before the first request so it
+        doesn't wait for them.
+        """
+        context = (multiprocessing.get_context(START_METHOD)
+                   if START_METHOD else None)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        mp_context=context)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, os.getpid)
+                               for _ in range(self.workers)))
+
+    async def close(self) -> None:
+        """Stop the dispatchers and the worker processes"""
+        for task in self.dispatchers:
+            task.cancel()
+        for task in self.dispatchers:
+            with suppress(asyncio.CancelledError):
+                await task
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def dispatch(self) -> None:
+        """Give the queued generations to a worker, one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            config, seed, fmt, future = await self.queue.get()
+            pool = self.pool
+            try:
+                data = await loop.run_in_executor(pool, render_maze,
+                                                  config, seed, fmt)
+            except BrokenProcessPool as error:
+                if not future.done():
+                    future.set_exception(error)
+                # Only the first dispatcher to see it starts a new pool
+                if self.pool is pool:
+                    self.restarts += 1
+                    if pool:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                    await self.start_pool()
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(data)
+            finally:
+                self.queue.task_done()
+
+    async def generate(self, config: ParsingResult,
+                       fmt: str) -> tuple[bytes, int]:
+        """
+        Get a maze from the workers, or from the same pending request.
+
+        Args:
+            config (ParsingResult): The parsed request
+            fmt (str): Output format
+
+        Returns:
+            data (bytes): The encoded maze
+            seed (int): Its seed (seed * 10 + algo)
+
+        Raises:
+            HTTPError: 503 if the queue is full
+            ValueError: If entry or exit cell is reserved by the 42 pattern
+        """
+        seed = job_seeds(config.get('seed'), 1)[0]
+        key: tuple[Any, ...] | None = None
+        if 'seed' in config:
+            key = (fmt, *sorted((name, value) for name, value
+                                in config.items() if name != 'output_file'))
+            future = self.pending.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return await asyncio.shield(future), seed
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((config, seed, fmt, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPError(503, "Too many mazes waiting, retry later")
+        # Retrieve the error even if every client left (no warning)
+        future.add_done_callback(
+            lambda done: done.cancelled() or done.exception())
+        if key is not None:
+            self.pending[key] = future
+            future.add_done_callback(lambda _: self.pending.pop(key, None))
+        # Shielded: a client leaving don't cancel the others' maze
+        return await asyncio.shield(future), seed
+
+    async def route(self, method: str, target: str,
+                    body: bytes) -> tuple[int, str, bytes, list[str]]:
+        """
+        Answer a request.
+
+        Args:
+            method (str): HTTP method
+            target (str): Path and query string
+            body (bytes): Request body
+
+        Returns:
+            status (int): HTTP status
+            content_type (str): Type of the body
+            data (bytes): Body of the answer
+            headers (list[str]): More headers ("Name: value")
+
+        Raises:
+            HTTPError: If the request can't be answered
+            Exception: If the generation failed (worker crash...)
+        """
+        path, _, query = target.partition("?")
+        if path == "/metrics":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            report = json.dumps(self.report(), indent=2).encode()
+            return 200, "application/json", report, []
+        if path != "/maze":
+            raise HTTPError(404, f"No endpoint {path}, use /maze or /metrics")
+        if method not in ("GET", "POST"):
+            raise HTTPError(405, "Use GET or POST")
+
+        # Query parameters become config lines, after the body ones
+        fmt = "text"
+        lines = body.decode('utf-8', errors='replace').splitlines()
+        for name, value in parse_qsl(query):
+            if name == "format":
+                fmt = value
+            else:
+                lines.append(f"{name.upper()}={value}")
+        if fmt not in FORMATS:
+            raise HTTPError(400, f"Unknown format {fmt}, use "
+                            + " or ".join(FORMATS))
+        try:
+            config = parse_config("\n".join(line.strip() for line in lines
+                                            if line.strip()) + "\n",
+                                  REQUIRED, quiet=True)
+            if config['width'] * config['height'] > self.max_cells:
+                raise HTTPError(413, f"The maze is limited to "
+                                f"{self.max_cells} cells (width * height)")
+            data, seed = await self.generate(config, fmt)
+        except (ParsingError, ValueError) as error:
+            raise HTTPError(400, str(error))
+        return 200, FORMATS[fmt], data, [f"X-Maze-Seed: {seed}"]
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """
+        One client connection, its requests are answered in order
+        (keep-alive) until it closes or ask to.
+        """
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as error:
+                    # The stream can't be trusted anymore
+                    await send(writer, error.status, "text/plain",
+                               f"{error}\n".encode(), ["Connection: close"])
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                start = time.perf_counter()
+                try:
+                    status, content_type, data, extra = await self.route(
+                        method, target, body)
+                except HTTPError as error:
+                    status, content_type = error.status, "text/plain"
+                    data = f"{error}\n".encode()
+                    extra = ["Retry-After: 1"] if status == 503 else []
+                except Exception as error:
+                    # Anything else is our fault, the connection stays
+                    # usable and the error is counted
+                    status, content_type = 500, "text/plain"
+                    data = (f"Generation failed: "
+                            f"{type(error).__name__}\n").encode()
+                    extra = []
+                await send(writer, status, content_type, data, extra)
+                path = target.partition("?")[0]
+                self.metrics.get(path, self.metrics["other"]).record(
+                    status, time.perf_counter() - start, len(data))
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    def report(self) -> ServerReport:
+        """Snapshot of the server metrics"""
+        uptime = time.monotonic() - self.started
+        return {
+            'uptime': uptime,
+            'workers': self.workers,
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'in_flight': len(self.pending),
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'restarts': self.restarts,
+            'endpoints': {path: metrics.report(uptime)
+                          for path, metrics in self.metrics.items()}
+        }
+
+
+async def read_request(reader: asyncio.StreamReader
+                       ) -> tuple[str, str, dict[str, str], bytes] | None:
+    """
+    Read one HTTP request.
+
+    Returns:
+        request (Optional[tuple]): method, target, headers (lower case
+                                   names) and body, None at the end of
+                                   the connection
+
+    Raises:
+        HTTPError: If the request is malformed or too big
+    """
+    try:
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if not 0 <= length <= MAX_BODY:
+            raise HTTPError(413, f"The body is limited to {MAX_BODY} bytes")
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    except ValueError:
+        # Line longer than the reader limit
+        raise HTTPError(400, "Request line or header too long")
+    return method, target, headers, body
+
+
+async def send(writer: asyncio.StreamWriter, status: int, content_type: str,
+               data: bytes, headers: list[str]) -> None:
+    """
+    Send an answer, big bodies by chunks: each one wait for the client
+    to read the previous ones (drain), so a slow client don't make the
+    server buffer the whole maze twice.
+    """
+    head = [f"HTTP/1.1 {status} {REASONS[status]}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(data)}", *headers]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+    view = memoryview(data)
+    for start in range(0, len(data), WRITE_CHUNK):
+        writer.write(view[start:start + WRITE_CHUNK])
+        await writer.drain()
+    await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 4242,
+                workers: int = 1, queue_size: int = 64,
+                max_cells: int = MAX_CELLS) -> None:
+    """
+    Run the service until interrupted.
+
+    Args:
+        host (str): Address to listen on
+        port (int): Port to listen on
+        workers (int): Processes generating the mazes
+        queue_size (int): Generations that can wait for a worker
+        max_cells (int): Biggest maze accepted (width * height)
+    """
+    service = MazeServer(workers, queue_size, max_cells)
+    server = await service.start(host, port)
+    print(f"Serving mazes on http://{host}:{port}/maze "
+          f"({workers} worker(s), metrics on /metrics)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
@@ -1,34 +1,25 @@
-from mazegen.cell import Cell
+from mazegen.grid import Grid, CellView
+from array import array
 from collections import deque
-from typing import Any
-import time
+from heapq import heappop, heappush
+from typing import Any, Callable, TypedDict
 
 
-def get_accessible_neighbors(cell: Cell) -> list[Cell]:
+def get_accessible_neighbors(cell: CellView) -> list[CellView]:
     """
     Return neighbors that can be reached (no wall between).
 
     Args:
-        cell (Cell): The cell to verify
+        cell (CellView): The cell to verify
 
     Return:
-        accessible (list[Cell]): List of accessible neighbours
+        accessible (list[CellView]): List of accessible neighbours
     """
-    accessible = []
-    for neighbor in cell.neighbours:
-        if neighbor.x == cell.x + 1 and not cell.walls['east']:
-            accessible.append(neighbor)
-        elif neighbor.x == cell.x - 1 and not cell.walls['west']:
-            accessible.append(neighbor)
-        elif neighbor.y == cell.y + 1 and not cell.walls['south']:
-            accessible.append(neighbor)
-        elif neighbor.y == cell.y - 1 and not cell.walls['north']:
-            accessible.append(neighbor)
+    grid = cell.grid
+    return [grid.cell(n) for n in grid.open_neighbours(cell.index)]
 
-    return accessible
 
-
-def breadth_first_search(maze: Any) -> list[Cell]:
+def breadth_first_search(maze: Any) -> list[CellView]:
     """
     BFS (breadth first search) to find shortest path from
     start to end in the maze.
@@ -40,18 +31,16 @@ def breadth_first_search(maze: Any) -> list[Cell]:
         list(path) (list): A list of cell representing the shortest
         path from the entry to the exit
     """
-    start_x, start_y = maze.start
-    end_x, end_y = maze.end
+    grid = maze.grid
 
-    # Initialise the start and end cell of the path
-    start_cell = maze.grid[start_y][start_x]
-    end_cell = maze.grid[end_y][end_x]
+    # Initialise the start and end cell of the path (index in the grid)
+    start_cell: int = grid.index(*maze.start)
+    end_cell: int = grid.index(*maze.end)
 
-    # Initialise the relations between cells in a dict
-    # [key=child: value=parent]
-    relation: dict[Cell, Cell | None] = {cell: None
-                                         for row in maze.grid
-                                         for cell in row}
+    # Initialise the relations between cells in a flat list
+    # [index=child: value=parent], -1 for no parent yet
+    relation: list[int] = [-1] * grid.size
+    relation[start_cell] = start_cell
     # Store all cells that we will evaluate
     all_paths = deque([start_cell])
     while all_paths:
@@ -64,26 +53,391 @@ def breadth_first_search(maze: Any) -> list[Cell]:
             break
 
         # get the accessible neighbours and iterate over it
-        accessible = get_accessible_neighbors(actual)
-        for neighbour in accessible:
-            # Update the dict if the neighbours still do not have a
+        for neighbour in grid.open_neighbours(actual):
+            # Update the relation if the neighbours still do not have a
             # parent, if it have then there is a closes parent,
             # then append it to all_paths
-            if not relation[neighbour] and neighbour != start_cell:
+            if relation[neighbour] == -1:
                 relation[neighbour] = actual
                 all_paths.append(neighbour)
 
+    stats = getattr(maze, 'stats', None)
+    if stats:
+        # Every cell with a parent was queued, the ones left weren't popped
+        stats.count("bfs_expanded",
+                    grid.size - relation.count(-1) - len(all_paths))
+
     actual = end_cell
-    path: deque[Cell] = deque([])
+    path: deque[CellView] = deque([])
     # Append the parent to the path,
-    # until we find Null (parent of the entrance)
-    while actual:
-        path.appendleft(actual)
-        actual = relation[actual]
+    # until we find the entrance (its own parent) or no parent
+    while True:
+        path.appendleft(grid.cell(actual))
+        parent = relation[actual]
+        if parent == -1 or parent == actual:
+            break
+        actual = parent
     return list(path)
 
 
-def switch_path(path: list[Cell], maze: Any,
+class DistanceField:
+    """
+    BFS from one source over the whole grid, computed once.
+
+    Store for each cell its distance to the source and its parent
+    (the next cell on a shortest path to the source), so the path from
+    any cell is read by following parents, no new search.
+
+    Attributes:
+        grid (Grid): The grid the field was computed on
+        source (int): Index of the source cell
+        distance (array[int]): Distance of each cell, -1 if unreachable
+        parent (array[int]): Next cell toward the source, -1 if none
+    """
+    def __init__(self, grid: Grid, source: int) -> None:
+        """
+        Run the BFS from source.
+
+        Args:
+            grid (Grid): The maze's grid
+            source (int): Index of the source cell (usually the exit)
+        """
+        self.grid: Grid = grid
+        self.source: int = source
+        # Remember the walls state, to know when the field is outdated
+        self.walls: bytearray = grid.walls
+        self.version: int = grid.version
+
+        self.distance: array[int] = array('i', [-1]) * grid.size
+        self.parent: array[int] = array('i', [-1]) * grid.size
+        distance = self.distance
+        parent = self.parent
+        distance[source] = 0
+        all_paths = deque([source])
+        while all_paths:
+            actual = all_paths.popleft()
+            for neighbour in grid.open_neighbours(actual):
+                if distance[neighbour] == -1:
+                    distance[neighbour] = distance[actual] + 1
+                    parent[neighbour] = actual
+                    all_paths.append(neighbour)
+
+    def is_valid(self, grid: Grid, source: int) -> bool:
+        """
+        Check that the field still describe this grid and source
+
+        Outdated when the grid changed (new maze) or a wall changed
+        """
+        return (grid is self.grid and grid.walls is self.walls
+                and grid.version == self.version and source == self.source)
+
+    def path_from(self, index: int) -> list[int]:
+        """
+        Shortest path from index to the source, by following parents.
+
+        Args:
+            index (int): Index of the first cell
+
+        Return:
+            path (list[int]): Index of the cells from index to the source,
+                              empty if the source can't be reached
+        """
+        if self.distance[index] == -1:
+            return []
+        path = [index]
+        while index != self.source:
+            index = self.parent[index]
+            path.append(index)
+        return path
+
+    def path_change(self, old: int, new: int) -> tuple[list[int], list[int]]:
+        """
+        Cells that change when the first cell of a path moves from old
+        to new: path_from(old) and path_from(new) meet at their common
+        ancestor, and are the same after it, only the cells before
+        are walked (a few cells for a player move, not the whole path).
+
+        Args:
+            old (int): Index of the first cell of the old path
+            new (int): Index of the first cell of the new path
+
+        Return:
+            left (list[int]): Cells of path_from(old) not in path_from(new)
+            joined (list[int]): Cells of path_from(new) not in
+                                path_from(old)
+        """
+        distance = self.distance
+        parent = self.parent
+        if distance[old] == -1 or distance[new] == -1:
+            # No common part, at least one of the paths is empty
+            return self.path_from(old), self.path_from(new)
+        left = []
+        joined = []
+        while distance[old] > distance[new]:
+            left.append(old)
+            old = parent[old]
+        while distance[new] > distance[old]:
+            joined.append(new)
+            new = parent[new]
+        while old != new:
+            left.append(old)
+            joined.append(new)
+            old = parent[old]
+            new = parent[new]
+        return left, joined
+
+
+class SearchBuffers:
+    """
+    Arrays reused by the search strategies, allocated once per grid size.
+
+    Instead of clearing the arrays before each search, a cell counts as
+    seen only if its 'seen' value is the stamp of the current search.
+
+    Attributes:
+        size (int): Number of cells the buffers can handle
+        parent (array[int]): Parent of each cell (forward search)
+        parent_back (array[int]): Parent of each cell (backward search)
+        cost (array[int]): Distance from the start (A*)
+        seen (array[int]): Stamp of the last search that saw the cell
+        seen_back (array[int]): Same for the backward search
+        stamp (int): Stamp of the current search
+    """
+    def __init__(self, size: int) -> None:
+        """
+        Allocate the buffers for grids of 'size' cells.
+
+        Args:
+            size (int): Number of cells
+        """
+        self.size: int = size
+        self.parent: array[int] = array('i', [0]) * size
+        self.parent_back: array[int] = array('i', [0]) * size
+        self.cost: array[int] = array('i', [0]) * size
+        self.seen: array[int] = array('I', [0]) * size
+        self.seen_back: array[int] = array('I', [0]) * size
+        self.stamp: int = 0
+
+    def new_search(self) -> int:
+        """Return a new stamp, all cells become unseen"""
+        self.stamp += 1
+        if self.stamp == 0xFFFFFFFF:
+            # The stamps overflow, clear the arrays for real
+            self.seen = array('I', [0]) * self.size
+            self.seen_back = array('I', [0]) * self.size
+            self.stamp = 1
+        return self.stamp
+
+
+class SearchResult(TypedDict):
+    """
+    Result of a search strategy.
+
+    Keys:
+        path (list[int]): Index of the cells from start to end,
+                          empty if the end can't be reached.
+        visited (int): Number of cells expanded by the search.
+    """
+    path: list[int]
+    visited: int
+
+
+def follow_parents(parent: 'array[int]', index: int,
+                   root: int) -> list[int]:
+    """Cells from index up to root by following parent, index first"""
+    path = [index]
+    while index != root:
+        index = parent[index]
+        path.append(index)
+    return path
+
+
+def bfs_search(grid: Grid, start: int, end: int,
+               buffers: SearchBuffers) -> SearchResult:
+    """
+    Classic BFS from start, stop when end is expanded.
+
+    Same neighbour order as breadth_first_search(), same path.
+    """
+    stamp = buffers.new_search()
+    seen = buffers.seen
+    parent = buffers.parent
+    seen[start] = stamp
+    all_paths = deque([start])
+    visited = 0
+    while all_paths:
+        actual = all_paths.popleft()
+        visited += 1
+        if actual == end:
+            path = follow_parents(parent, end, start)
+            path.reverse()
+            return {'path': path, 'visited': visited}
+        for neighbour in grid.open_neighbours(actual):
+            if seen[neighbour] != stamp:
+                seen[neighbour] = stamp
+                parent[neighbour] = actual
+                all_paths.append(neighbour)
+    return {'path': [], 'visited': visited}
+
+
+def bidirectional_search(grid: Grid, start: int, end: int,
+                         buffers: SearchBuffers) -> SearchResult:
+    """
+    BFS from both start and end, a whole layer at a time,
+    always growing the smallest frontier.
+
+    Stop on the first cell reached by both sides: the other side
+    already contains every cell closer than its frontier, so this
+    first meeting is on a shortest path.
+    """
+    if start == end:
+        return {'path': [start], 'visited': 1}
+    stamp = buffers.new_search()
+    forward = ([start], buffers.seen, buffers.parent)
+    backward = ([end], buffers.seen_back, buffers.parent_back)
+    buffers.seen[start] = stamp
+    buffers.seen_back[end] = stamp
+    visited = 0
+
+    while forward[0] and backward[0]:
+        # Grow the side with the smallest frontier
+        if len(forward[0]) <= len(backward[0]):
+            side, other, root, other_root = forward, backward, start, end
+        else:
+            side, other, root, other_root = backward, forward, end, start
+        frontier, seen, parent = side
+        other_seen = other[1]
+        next_layer: list[int] = []
+        for actual in frontier:
+            visited += 1
+            for neighbour in grid.open_neighbours(actual):
+                if seen[neighbour] == stamp:
+                    continue
+                if other_seen[neighbour] == stamp:
+                    # Both sides meet: join the two half paths
+                    half = follow_parents(parent, actual, root)
+                    rest = follow_parents(other[2], neighbour, other_root)
+                    path = half[::-1] + rest
+                    if side is backward:
+                        path.reverse()
+                    return {'path': path, 'visited': visited}
+                seen[neighbour] = stamp
+                parent[neighbour] = actual
+                next_layer.append(neighbour)
+        frontier[:] = next_layer
+    return {'path': [], 'visited': visited}
+
+
+def astar_search(grid: Grid, start: int, end: int,
+                 buffers: SearchBuffers) -> SearchResult:
+    """
+    A* with the Manhattan distance to end as heuristic.
+
+    The heap is ordered by (cost + heuristic, heuristic), so on ties
+    the cell closest to the end is expanded first.
+    """
+    stamp = buffers.new_search()
+    seen = buffers.seen
+    parent = buffers.parent
+    cost = buffers.cost
+    width = grid.width
+    end_y, end_x = divmod(end, width)
+
+    def heuristic(index: int) -> int:
+        y, x = divmod(index, width)
+        return abs(x - end_x) + abs(y - end_y)
+
+    seen[start] = stamp
+    cost[start] = 0
+    start_h = heuristic(start)
+    heap = [(start_h, start_h, start)]
+    visited = 0
+    while heap:
+        priority, h, actual = heappop(heap)
+        # Skip the outdated entries (a shorter way was found since)
+        if cost[actual] + h < priority:
+            continue
+        visited += 1
+        if actual == end:
+            path = follow_parents(parent, end, start)
+            path.reverse()
+            return {'path': path, 'visited': visited}
+        next_cost = cost[actual] + 1
+        for neighbour in grid.open_neighbours(actual):
+            if seen[neighbour] != stamp or next_cost < cost[neighbour]:
+                seen[neighbour] = stamp
+                cost[neighbour] = next_cost
+                parent[neighbour] = actual
+                h = heuristic(neighbour)
+                heappush(heap, (next_cost + h, h, neighbour))
+    return {'path': [], 'visited': visited}
+
+
+# Available strategies for search() and solve()
+SOLVERS: dict[str, Callable[[Grid, int, int, SearchBuffers], SearchResult]]
+SOLVERS = {
+    'bfs': bfs_search,
+    'bidirectional': bidirectional_search,
+    'astar': astar_search
+}
+
+
+def search(grid: Grid, start: int, end: int, strategy: str = 'bfs',
+           buffers: SearchBuffers | None = None) -> SearchResult:
+    """
+    Find a shortest path between two cells with the chosen strategy.
+
+    Args:
+        grid (Grid): The maze's grid
+        start (int): Index of the first cell
+        end (int): Index of the last cell
+        strategy (str): One of SOLVERS ('bfs', 'bidirectional', 'astar')
+        buffers (Optional[SearchBuffers]): Arrays to reuse between calls,
+                                           allocated if None or too small
+
+    Return:
+        result (SearchResult): The path (indexes) and visited cells count
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    if strategy not in SOLVERS:
+        raise ValueError(f"Unknown strategy '{strategy}', "
+                         f"choose one of: {', '.join(SOLVERS)}")
+    if buffers is None or buffers.size < grid.size:
+        buffers = SearchBuffers(grid.size)
+    return SOLVERS[strategy](grid, start, end, buffers)
+
+
+def solve(maze: Any, strategy: str = 'bfs',
+          start: tuple[int, int] | None = None,
+          end: tuple[int, int] | None = None) -> list[CellView]:
+    """
+    Shortest path in the maze with the chosen strategy.
+
+    The search buffers are kept on the maze (maze.search_buffers),
+    so next calls don't allocate them again.
+
+    Args:
+        maze (MazeGenerator): The maze to solve
+        strategy (str): One of SOLVERS ('bfs', 'bidirectional', 'astar')
+        start (Optional[tuple[int, int]]): First cell, maze.start if None
+        end (Optional[tuple[int, int]]): Last cell, maze.end if None
+
+    Return:
+        path (list[CellView]): Cells from start to end, empty if no path
+    """
+    grid = maze.grid
+    buffers = getattr(maze, 'search_buffers', None)
+    if buffers is None or buffers.size < grid.size:
+        buffers = SearchBuffers(grid.size)
+        maze.search_buffers = buffers
+    result = search(grid, grid.index(*(start or maze.start)),
+                    grid.index(*(end or maze.end)), strategy, buffers)
+    return [grid.cell(index) for index in result['path']]
+
+
+def switch_path(path: list[CellView], maze: Any,
                 animate: bool = False,
                 visible: bool | None = None) -> None:
     """
@@ -96,7 +450,7 @@ def switch_path(path: list[Cell], maze: Any,
     if animate is set to True, animate the path cell by cell
 
     Args:
-        path (list[Cell]): The path to show or hide
+        path (list[CellView]): The path to show or hide
         displayer (Optional[ShowMaze]): The class to display cells
         animate (Optional[bool]): Displaying the cell one by one
         visible (Optional[bool]): Path visibility, True to show False to hide
@@ -110,10 +464,16 @@ def switch_path(path: list[Cell], maze: Any,
         else:
             cell.path = visible
     if animate and maze.displayer:
+        # 10ms per cell like before, but never more than the
+        # displayer's animation time
+        maze.displayer.start_animation(
+            maze, len(path),
+            min(len(path) * 0.01, maze.displayer.duration))
         for cell in path:
             maze.displayer.update_cell(cell, maze)
-            time.sleep(0.01)
+            maze.displayer.step()
         maze.displayer.update_cell(maze.grid[maze.end[1]]
                                    [maze.end[0]], maze)
         maze.displayer.update_cell(maze.grid[maze.start[1]]
                                    [maze.start[0]], maze)
+        maze.displayer.end_animation()
@@ -0,0 +1,95 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypedDict
+import time
+
+
+class StatsReport(TypedDict):
+    """
+    Snapshot of the stats of one maze.
+
+    Keys:
+        seed (int): Seed of the maze (seed * 10 + algo, like seed.txt)
+        algo (int): Algorithm used, 0 = backtracking, 1 = prims,
+                    2 = kruskal, 3 = recursive division, 4 = eller
+        phases (dict[str, float]): Seconds spent in each phase
+        counters (dict[str, int]): Work done (walls_removed, cells_visited,
+                                   bfs_expanded, bytes_written,
+                                   cache_hits, cache_misses)
+        total (float): Sum of the phases
+    """
+    seed: int
+    algo: int
+    phases: dict[str, float]
+    counters: dict[str, int]
+    total: float
+
+
+class MazeStats:
+    """
+    Timings and counters of a MazeGenerator, enabled by passing one to it.
+
+    Phases: init, algorithm, unperfect, bfs, field, display, save,
+    cache.
+    A phase run more than once (save_maze() twice) add up.
+
+    Args:
+        hook (Optional[Callable]): Called at the end of each phase with
+                                   (phase name, seconds, stats), counters
+                                   of the phase are already updated
+
+    Attributes:
+        seed (int): Seed of the maze being generated (seed * 10 + algo)
+        algo (int): Algorithm of the maze being generated
+        phases (dict[str, float]): Seconds by phase
+        counters (dict[str, int]): Counters by name
+    """
+    def __init__(self, hook: Callable[[str, float, 'MazeStats'], None]
+                 | None = None) -> None:
+        self.hook = hook
+        self.seed: int = 0
+        self.algo: int = 0
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def begin(self, seed: int, algo: int) -> None:
+        """
+        Start the stats of a new maze, previous ones are cleared.
+
+        Args:
+            seed (int): Seed of the maze (seed * 10 + algo)
+            algo (int): Algorithm used
+        """
+        self.seed = seed
+        self.algo = algo
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the code of the with block as the phase 'name'.
+
+        Args:
+            name (str): Name of the phase
+        """
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.hook:
+            self.hook(name, seconds, self)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add value to the counter 'name'"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> StatsReport:
+        """Return a copy of the stats of the actual maze"""
+        return {
+            'seed': self.seed,
+            'algo': self.algo,
+            'phases': dict(self.phases),
+            'counters': dict(self.counters),
+            'total': sum(self.phases.values())
+        }
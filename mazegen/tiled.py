@@ -0,0 +1,231 @@
+from mazegen.generate import MazeGenerator
+from mazegen.grid import Grid, NORTH, EAST, SOUTH, WEST
+from collections import OrderedDict
+import hashlib
+import random
+
+
+def derive_seed(seed: int, *parts: int) -> int:
+    """
+    Seed of a part of a tiled maze (a tile, a border), the same on
+    every run and every machine (hash() of a tuple is not guaranteed
+    to be).
+
+    Args:
+        seed (int): Seed of the whole maze
+        parts (int): What the seed is for (kind, tile coordinates)
+
+    Returns:
+        seed (int): A positive 63 bits seed
+    """
+    key = ",".join(str(part) for part in (seed, *parts)).encode()
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+class TiledMaze:
+    """
+    A maze without borders, made of tiles generated on demand.
+
+    The world is cut in tiles of tile_width x tile_height cells, tile
+    (tx, ty) hold the cells (tx * tile_width + x, ty * tile_height + y),
+    coordinates can be negative. Each tile is a MazeGenerator maze
+    (42 pattern included when the tile is big enough) generated from
+    derive_seed(seed, tx, ty), so it only depends on the seed and its
+    coordinates, never on the order tiles are visited.
+
+    Tiles are closed mazes, they are connected by doors: walls opened
+    on the border between two tiles. The doors of a border are drawn
+    from its own seed, both tiles find the same ones, so the whole
+    world is connected.
+
+    Generated tiles are kept in a LRU cache (max_tiles), memory stay
+    the same however far the world is explored: an evicted tile is
+    regenerated, identical, when needed again.
+
+    Attributes:
+        seed (int): Seed of the world, without the algo digit
+        algo (int): Generation algorithm of the tiles (last seed digit)
+        tile_width (int): Cells per tile row
+        tile_height (int): Rows per tile
+        doors (int): Openings on each border between two tiles
+        max_tiles (int): Number of tiles kept in the cache
+        hits (int): Tiles found in the cache
+        misses (int): Tiles generated
+    """
+    def __init__(self, tile_width: int, tile_height: int,
+                 seed: int | None = None, perfect: bool = True,
+                 doors: int = 1, max_tiles: int = 256,
+                 max_bytes: int = 16 * 1024 * 1024) -> None:
+        """
+        Prepare the generator of the tiles, nothing is generated yet.
+
+        Args:
+            tile_width (int): Cells per tile row
+            tile_height (int): Rows per tile
+            seed (Optional[int]): World seed, with the algo as last digit
+                                  like MazeGenerator, random if None
+            perfect (bool): False to add loops inside each tile
+            doors (int): Openings on each border between two tiles
+            max_tiles (int): Maximum number of cached tiles
+            max_bytes (int): Memory cap of the cache, a tile use one byte
+                             per cell. At least one tile is always kept.
+        """
+        # One generator for every tile, its grid is reset in place
+        self.maze: MazeGenerator = MazeGenerator(
+            tile_width, tile_height, (0, 0),
+            (tile_width - 1, tile_height - 1), seed)
+        self.seed: int = self.maze.seed
+        self.algo: int = self.maze.algo
+        self.tile_width: int = tile_width
+        self.tile_height: int = tile_height
+        self.perfect: bool = perfect
+        self.doors: int = doors
+
+        size = tile_width * tile_height
+        self.max_tiles: int = max(1, min(max_tiles, max_bytes // size))
+        self.tiles: OrderedDict[tuple[int, int], bytes] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+        # The 42 pattern is at the same place in every tile
+        self.reserved: bytes = bytes(self.maze.grid.reserved)
+        # Border cells that can get a door on both sides
+        last_row = (tile_height - 1) * tile_width
+        self.east_doors: list[int] = [
+            y for y in range(tile_height)
+            if not self.reserved[y * tile_width]
+            and not self.reserved[y * tile_width + tile_width - 1]]
+        self.south_doors: list[int] = [
+            x for x in range(tile_width)
+            if not self.reserved[x] and not self.reserved[last_row + x]]
+
+    def border_doors(self, side: int, tx: int, ty: int) -> list[int]:
+        """
+        Doors of the east or south border of a tile (the west and north
+        borders are the east and south ones of the tiles before).
+
+        Args:
+            side (int): EAST or SOUTH
+            tx (int): Tile column
+            ty (int): Tile row
+
+        Returns:
+            doors (list[int]): Row (EAST) or column (SOUTH) of each door
+        """
+        candidates = self.east_doors if side == EAST else self.south_doors
+        # Own generator: the global random is used by the tiles
+        rng = random.Random(derive_seed(self.seed, side, tx, ty))
+        return rng.sample(candidates, min(self.doors, len(candidates)))
+
+    def build_tile(self, tx: int, ty: int) -> bytes:
+        """
+        Generate the walls of a tile, doors opened.
+
+        Args:
+            tx (int): Tile column
+            ty (int): Tile row
+
+        Returns:
+            walls (bytes): Walls of the tile cells, row by row
+        """
+        maze = self.maze
+        maze.reset_maze()
+        random.seed(derive_seed(self.seed, tx, ty))
+        maze.consume(maze.carve(), False)
+        if not self.perfect:
+            maze.consume(maze.unperfect_walls(), False)
+
+        width = self.tile_width
+        last_row = (self.tile_height - 1) * width
+        walls = bytearray(maze.grid.walls)
+        for y in self.border_doors(EAST, tx, ty):
+            walls[y * width + width - 1] &= ~EAST
+        for y in self.border_doors(EAST, tx - 1, ty):
+            walls[y * width] &= ~WEST
+        for x in self.border_doors(SOUTH, tx, ty):
+            walls[last_row + x] &= ~SOUTH
+        for x in self.border_doors(SOUTH, tx, ty - 1):
+            walls[x] &= ~NORTH
+        return bytes(walls)
+
+    def tile(self, tx: int, ty: int) -> bytes:
+        """
+        Return the walls of a tile, from the cache or generated.
+
+        Args:
+            tx (int): Tile column
+            ty (int): Tile row
+
+        Returns:
+            walls (bytes): Walls of the tile cells, row by row
+        """
+        key = (tx, ty)
+        walls = self.tiles.get(key)
+        if walls is not None:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+            return walls
+        self.misses += 1
+        walls = self.build_tile(tx, ty)
+        self.tiles[key] = walls
+        # Evict the least recently used tiles
+        while len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return walls
+
+    def walls(self, x: int, y: int) -> int:
+        """
+        Return the walls of a cell of the world (4 bits mask).
+
+        Args:
+            x (int): Column of the cell, can be negative
+            y (int): Row of the cell, can be negative
+        """
+        tx, x = divmod(x, self.tile_width)
+        ty, y = divmod(y, self.tile_height)
+        return self.tile(tx, ty)[y * self.tile_width + x]
+
+    def region(self, x: int, y: int, width: int, height: int) -> Grid:
+        """
+        Copy a part of the world in a Grid, only the tiles it touches
+        are looked up (each one once). The grid can be solved
+        (DistanceField, breadth_first_search) or displayed like a
+        generated maze, but cells on its border keep their passages
+        to the cells outside.
+
+        Args:
+            x (int): Column of the top left cell, can be negative
+            y (int): Row of the top left cell, can be negative
+            width (int): Number of columns
+            height (int): Number of rows
+
+        Returns:
+            grid (Grid): Walls and reserved cells of the region
+
+        Raises:
+            ValueError: If the region is empty
+        """
+        if width < 1 or height < 1:
+            raise ValueError("The region need at least one cell")
+        grid = Grid(width, height)
+        tile_width = self.tile_width
+        tile_height = self.tile_height
+        for ty in range(y // tile_height, (y + height - 1) // tile_height + 1):
+            # Rows of the tile inside the region
+            top = max(y, ty * tile_height)
+            bottom = min(y + height, (ty + 1) * tile_height)
+            for tx in range(x // tile_width,
+                            (x + width - 1) // tile_width + 1):
+                walls = self.tile(tx, ty)
+                # Columns of the tile inside the region
+                left = max(x, tx * tile_width)
+                count = min(x + width, (tx + 1) * tile_width) - left
+                for row in range(top, bottom):
+                    src = ((row - ty * tile_height) * tile_width
+                           + left - tx * tile_width)
+                    dst = (row - y) * width + left - x
+                    grid.walls[dst:dst + count] = walls[src:src + count]
+                    grid.reserved[dst:dst + count] = \
+                        self.reserved[src:src + count]
+        return grid
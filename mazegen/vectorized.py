@@ -0,0 +1,162 @@
+from mazegen.grid import Grid, NORTH, EAST, SOUTH, WEST
+from collections.abc import Iterable
+from typing import Any
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError as e:    # optional dependency
+    raise ImportError("mazegen.vectorized needs numpy: "
+                      "pip install numpy (or mazegen[numpy])") from e
+
+
+class DistanceGrid:
+    """
+    Result of distance_transform(): full distance and parent grids.
+
+    Attributes:
+        width (int): Maze width
+        height (int): Maze height
+        distance (NDArray[int32]): (height, width) distance to the nearest
+                                   source, -1 if unreachable
+        parent (NDArray[int64]): Flat, previous cell toward the nearest
+                                 source (cell index), -1 for sources
+        nearest (NDArray[int64]): (height, width) index of the nearest
+                                  source of each cell, -1 if unreachable
+    """
+    def __init__(self, width: int, height: int,
+                 distance: npt.NDArray[np.int32],
+                 parent: npt.NDArray[np.int64],
+                 nearest: npt.NDArray[np.int64]) -> None:
+        """Store the flat arrays, distance and nearest as 2d views"""
+        self.width: int = width
+        self.height: int = height
+        self.distance: npt.NDArray[np.int32] = distance.reshape(height,
+                                                                width)
+        self.parent: npt.NDArray[np.int64] = parent
+        self.nearest: npt.NDArray[np.int64] = nearest.reshape(height, width)
+
+    def path_to(self, index: int) -> list[int]:
+        """
+        Shortest path from the nearest source to the cell index.
+
+        Args:
+            index (int): Index of the last cell (y * width + x)
+
+        Return:
+            path (list[int]): Index of the cells, source first,
+                              empty if the cell can't be reached
+        """
+        if self.distance.flat[index] == -1:
+            return []
+        parent = self.parent
+        path = [index]
+        while parent[index] != -1:
+            index = int(parent[index])
+            path.append(index)
+        path.reverse()
+        return path
+
+
+# Under this many cells, a layer is expanded in plain Python:
+# NumPy calls cost more than they save on a thin frontier (corridors)
+SMALL_FRONTIER = 128
+
+
+def distance_transform(grid: Grid, sources: Iterable[int]) -> DistanceGrid:
+    """
+    Multi-source BFS where each layer is a few NumPy operations.
+
+    The frontier is a NumPy array of cell indexes, in the order a BFS
+    queue would hold them. The neighbours of every frontier cell are
+    computed at once (offsets +width, -width, +1, -1: south, north,
+    east, west like open_neighbours()), in a (cells, directions) array
+    read row by row: the BFS discovery order. A cell reached twice
+    keeps its first parent (np.unique(return_index=True)), and the
+    next layer stays in discovery order. The cost of a layer depends
+    on the frontier, not on the maze size. Thin frontiers (long
+    corridors of perfect mazes) are expanded in plain Python on the
+    same arrays.
+
+    Distances and parents are the same as a BFS queue started with the
+    sources in increasing index order: with one source, path_to() gives
+    the path of breadth_first_search(), ties included.
+
+    Args:
+        grid (Grid): The maze's grid
+        sources (Iterable[int]): Index of each source cell
+
+    Return:
+        result (DistanceGrid): Distances, parents and nearest source
+    """
+    size = grid.size
+    width = grid.width
+    walls = np.frombuffer(grid.walls, dtype=np.uint8)
+
+    distance = np.full(size, -1, dtype=np.int32)
+    parent = np.full(size, -1, dtype=np.int64)
+    nearest = np.full(size, -1, dtype=np.int64)
+    # Python access to the same memory, for the thin layers
+    distance_view = distance.data
+    parent_view = parent.data
+    nearest_view = nearest.data
+
+    frontier: Any = np.unique(np.fromiter(sources, dtype=np.int64))
+    distance[frontier] = 0
+    nearest[frontier] = frontier
+
+    layer = 0
+    while len(frontier):
+        layer += 1
+        if len(frontier) < SMALL_FRONTIER:
+            if not isinstance(frontier, list):
+                frontier = frontier.tolist()
+            next_layer = []
+            for actual in frontier:
+                for cell in grid.open_neighbours(actual):
+                    if distance_view[cell] == -1:
+                        distance_view[cell] = layer
+                        parent_view[cell] = actual
+                        nearest_view[cell] = nearest_view[actual]
+                        next_layer.append(cell)
+            frontier = next_layer
+            continue
+
+        if isinstance(frontier, list):
+            frontier = np.array(frontier, dtype=np.int64)
+        masks = walls[frontier]
+        column = frontier % width
+        # One column per direction, in the order of open_neighbours():
+        # (wall, offset to the neighbour, neighbour inside the grid)
+        moves: list[tuple[int, int, Any]] = [
+            (SOUTH, width, frontier < size - width),
+            (NORTH, -width, frontier >= width),
+            (EAST, 1, column < width - 1),
+            (WEST, -1, column > 0)
+        ]
+        cells = np.stack([frontier + offset for _, offset, _ in moves],
+                         axis=1)
+        movers = np.broadcast_to(frontier[:, None], cells.shape)
+        can_move = np.stack([((masks & wall) == 0) & inside
+                             for wall, _, inside in moves], axis=1)
+        # Cells out of the grid are never read (clamped to 0)
+        can_move &= distance[np.where(can_move, cells, 0)] == -1
+        # Row by row: frontier order, then direction order
+        cells = cells[can_move]
+        movers = movers[can_move]
+        # First discovery of each cell, kept in discovery order
+        _, first = np.unique(cells, return_index=True)
+        first.sort()
+        cells = cells[first]
+        movers = movers[first]
+        distance[cells] = layer
+        parent[cells] = movers
+        nearest[cells] = nearest[movers]
+        frontier = cells
+
+    return DistanceGrid(width, grid.height, distance, parent, nearest)
+
+
+def exit_distances(maze: Any) -> DistanceGrid:
+    """Distance of every cell of the maze to its exit"""
+    return distance_transform(maze.grid, [maze.grid.index(*maze.end)])
@@ -0,0 +1,44 @@
+from mazegen.batch import generate_mazes
+from mazegen.generate import MazeGenerator
+from mazegen.parsing import ParsingResult
+from pathlib import Path
+import pytest
+
+
+def config(tmp_path: Path, **keys: object) -> ParsingResult:
+    """Config of an imperfect eller maze (seed ending by 4)"""
+    result: ParsingResult = {
+        'width': 30, 'height': 20, 'entry': (0, 0), 'exit': (29, 19),
+        'output_file': str(tmp_path / "batch.txt"), 'perfect': False,
+        'seed': 42424
+    }
+    result.update(keys)  # type: ignore[typeddict-item]
+    return result
+
+
+def test_eller_same_as_apply_algo(tmp_path: Path) -> None:
+    generate_mazes(config(tmp_path, loops=7))
+    maze = MazeGenerator(30, 20, (0, 0), (29, 19), 42424, loops=7)
+    maze.apply_algo(False)
+    filename = str(tmp_path / "ui.txt")
+    maze.save_maze(filename)
+    assert (Path(filename).read_text()
+            == (tmp_path / "batch.txt").read_text())
+
+
+def test_stream_leaves_path_empty(tmp_path: Path) -> None:
+    generate_mazes(config(tmp_path, perfect=True), stream=True)
+    lines = (tmp_path / "batch.txt").read_text().split("\n")
+    assert lines[-2:] == ["29,19", ""]
+    # Same walls as the maze generated in memory
+    maze = MazeGenerator(30, 20, (0, 0), (29, 19), 42424)
+    maze.apply_algo(True)
+    loaded = MazeGenerator.load_maze(str(tmp_path / "batch.txt"))
+    assert loaded.grid.walls == maze.grid.walls
+    assert len(loaded.path) == len(maze.path)
+
+
+def test_stream_refuses_loops(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="LOOPS"):
+        generate_mazes(config(tmp_path, loops=7), stream=True)
+    assert not (tmp_path / "batch.txt").exists()
@@ -0,0 +1,73 @@
+from mazegen.cache import MazeCache, maze_key
+from mazegen.generate import MazeGenerator, LOOP_RATIO
+from pathlib import Path
+import os
+import pytest
+
+
+def entries(directory: Path) -> set[str]:
+    return set(os.listdir(directory))
+
+
+def test_least_recently_used_evicted(tmp_path: Path) -> None:
+    cache = MazeCache(str(tmp_path), max_bytes=250)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    # Old uses, then 'a' is read: 'b' is the least recently used
+    os.utime(cache.path("a"), (1, 1))
+    os.utime(cache.path("b"), (2, 2))
+    assert cache.get("a") == b"a" * 100
+    cache.put("c", b"c" * 100)
+    assert entries(tmp_path) == {"a.amz", "c.amz"}
+    assert cache.report()['evictions'] == 1
+    assert cache.report()['bytes'] == 200
+    assert cache.get("b") is None
+
+
+def test_order_from_another_process(tmp_path: Path) -> None:
+    MazeCache(str(tmp_path)).put("old", b"o" * 100)
+    os.utime(tmp_path / "old.amz", (1, 1))
+    # A new process finds the entries by their last use
+    cache = MazeCache(str(tmp_path), max_bytes=150)
+    cache.put("new", b"n" * 100)
+    assert entries(tmp_path) == {"new.amz"}
+    # The last entry written is kept, even bigger than the limit
+    cache.put("big", b"b" * 200)
+    assert entries(tmp_path) == {"big.amz"}
+
+
+def test_atomic_overwrite(tmp_path: Path,
+                          monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = MazeCache(str(tmp_path))
+    cache.put("key", b"first")
+    cache.put("key", b"second maze")
+    assert cache.get("key") == b"second maze"
+    assert cache.report()['bytes'] == len(b"second maze")
+
+    def crash(source: str, destination: str) -> None:
+        raise OSError("disk full")
+
+    # A write that fails never replaces the entry, nor leaves a file
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        cache.put("key", b"third")
+    monkeypatch.undo()
+    assert cache.get("key") == b"second maze"
+    assert entries(tmp_path) == {"key.amz"}
+
+
+def test_generator_reads_back(tmp_path: Path) -> None:
+    cache = MazeCache(str(tmp_path))
+    first = MazeGenerator(20, 15, (0, 0), (19, 14), 42421, cache=cache)
+    first.apply_algo(False)
+    second = MazeGenerator(20, 15, (0, 0), (19, 14), 42421, cache=cache)
+    second.apply_algo(False)
+    assert second.grid.walls == first.grid.walls
+    assert cache.report()['hits'] == 1
+    # A corrupt entry is removed and the maze generated again
+    key = maze_key(20, 15, (0, 0), (19, 14), False, 42421, LOOP_RATIO, None)
+    Path(cache.path(key)).write_bytes(b"not a maze")
+    third = MazeGenerator(20, 15, (0, 0), (19, 14), 42421, cache=cache)
+    third.apply_algo(False)
+    assert third.grid.walls == first.grid.walls
+    assert cache.report()['invalid'] == 1
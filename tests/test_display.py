@@ -0,0 +1,146 @@
+from mazegen.display import ShowMaze, build_tile, cell_segments
+from mazegen.display import special_segments, TILE_ENTRY, TILE_EXIT
+from mazegen.generate import MazeGenerator
+from collections.abc import Iterator
+from typing import Any, cast
+import curses
+import pytest
+
+
+class Screen:
+    """curses window stand-in, keeps what is written at each position"""
+
+    def __init__(self, lines: int, cols: int) -> None:
+        self.size = (lines, cols)
+        self.text: dict[tuple[int, int], tuple[str, int]] = {}
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return self.size
+
+    def addstr(self, y: int, x: int, text: str, attr: int) -> None:
+        assert 0 <= y < self.size[0] and 0 <= x + len(text) <= self.size[1]
+        self.text[(y, x)] = (text, attr)
+
+    def erase(self) -> None:
+        self.text.clear()
+
+    def clear(self) -> None:
+        self.text.clear()
+
+    def move(self, y: int, x: int) -> None:
+        pass
+
+    def refresh(self) -> None:
+        pass
+
+
+@pytest.fixture
+def screen(monkeypatch: pytest.MonkeyPatch) -> Iterator[Screen]:
+    """A 30x80 screen, curses colors need a terminal: they do nothing"""
+    for name in ("start_color", "use_default_colors", "init_pair"):
+        monkeypatch.setattr(curses, name, lambda *args: None)
+    monkeypatch.setattr(curses, "color_pair", lambda pair: pair << 8)
+    monkeypatch.setattr(curses, "COLORS", 256, raising=False)
+    yield Screen(30, 80)
+
+
+def show(screen: Screen, size: int) -> tuple[ShowMaze, MazeGenerator]:
+    maze = MazeGenerator(size, size, (0, 0), (size - 1, size - 1), 42420)
+    maze.apply_algo(True)
+    display = ShowMaze(cast(Any, screen), 42)
+    maze.displayer = display
+    display.display_grid(maze)
+    return display, maze
+
+
+def test_small_maze_no_viewport(screen: Screen) -> None:
+    display, maze = show(screen, 3)
+    assert not display.viewport
+    assert (display.view_x, display.view_y) == (0, 0)
+    assert (display.view_width, display.view_height) == (3, 3)
+    display.pan(maze, 1, 1)
+    assert (display.view_x, display.view_y) == (0, 0)
+
+
+def test_follow_clamped(screen: Screen) -> None:
+    display, maze = show(screen, 100)
+    assert display.viewport
+    # (80 - 1) // 4 columns of cells, (30 - 2) // 2 rows
+    assert (display.view_width, display.view_height) == (19, 14)
+    # The player in the top left corner can't be centred
+    assert (display.view_x, display.view_y) == (0, 0)
+    maze.start = (99, 99)
+    display.follow(maze)
+    assert (display.view_x, display.view_y) == (100 - 19, 100 - 14)
+    maze.start = (50, 50)
+    display.follow(maze)
+    assert (display.view_x, display.view_y) == (50 - 9, 50 - 7)
+
+
+def test_pan_clamped(screen: Screen) -> None:
+    display, maze = show(screen, 100)
+    display.pan(maze, -1, -1)
+    assert (display.view_x, display.view_y) == (0, 0)
+    display.pan(maze, 1, 1)
+    assert (display.view_x, display.view_y) == (9, 7)
+    for _ in range(20):
+        display.pan(maze, 1, 1)
+    assert (display.view_x, display.view_y) == (81, 86)
+    display.pan(maze, -1, 0)
+    assert (display.view_x, display.view_y) == (72, 86)
+
+
+def test_only_visible_cells_drawn(screen: Screen) -> None:
+    display, maze = show(screen, 100)
+    drawn = dict(screen.text)
+    # Out of the view: nothing written
+    display.update_cell(maze.grid[50][50], maze)
+    assert screen.text == drawn
+    # Every position written is inside the screen (checked by addstr)
+    display.pan(maze, 1, 1)
+    assert screen.text and screen.text != drawn
+
+
+def line_texts(segments: list[tuple[int, int, str, int]]
+               ) -> dict[tuple[int, int], tuple[str, int]]:
+    """Each character of the segments by position, with its color"""
+    chars = {}
+    for dy, dx, text, pair in segments:
+        for offset, char in enumerate(text):
+            assert (dy, dx + offset) not in chars, "segments overlap"
+            chars[(dy, dx + offset)] = (char, pair)
+    return chars
+
+
+@pytest.mark.parametrize("key", range(0, 1 << 13, 11))
+def test_tile_merges_segments(key: int) -> None:
+    if key & TILE_ENTRY and key & TILE_EXIT:
+        return
+    if key & (TILE_ENTRY | TILE_EXIT):
+        raw = special_segments(key, 8 if key & TILE_ENTRY else 7)
+    else:
+        raw = cell_segments(key)
+    tile = build_tile(key)
+    # Same characters and colors, in fewer addstr() calls
+    assert line_texts(tile) == line_texts(raw)
+    assert len(tile) <= len(raw)
+    for (y_1, x_1, text, pair), (y_2, x_2, _, other) in zip(tile, tile[1:]):
+        # Merged: two tiles next to each other never share a color
+        assert (y_1, x_1 + len(text), pair) != (y_2, x_2, other)
+
+
+def test_tile_cache_same_drawing(screen: Screen) -> None:
+    display, maze = show(screen, 9)
+    maze.path_visible = True
+    for cell in maze.path:
+        cell.path = True
+    display.tiles.clear()
+    display.display_grid(maze)
+    cached = dict(screen.text)
+    tiles = len(display.tiles)
+    # A few kinds of cells, whatever the number of cells
+    assert 0 < tiles < maze.grid.size
+    # Drawn again from the cache only: same text and colors
+    display.display_grid(maze)
+    assert screen.text == cached
+    assert len(display.tiles) == tiles
@@ -0,0 +1,58 @@
+from mazegen import division
+from mazegen.division import divide_grid, division_events
+from mazegen.generate import MazeGenerator
+from mazegen.grid import Grid, ALL_WALLS
+import pytest
+
+
+def new_grid() -> Grid:
+    """A grid with the 42 pattern, walls closed"""
+    return MazeGenerator(60, 45, (0, 0), (59, 44)).grid
+
+
+@pytest.fixture
+def small_chambers(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Many chambers on a small grid, planned in this process so the
+    # workers don't need the patched value
+    monkeypatch.setattr(division, "CHAMBER_CELLS", 150)
+
+
+def test_same_maze_whatever_the_workers(small_chambers: None) -> None:
+    _, chambers, _ = division.plan_division(new_grid(), 4242)
+    assert len(chambers) > 4
+    mazes = []
+    for workers in (1, 2, 3):
+        grid = new_grid()
+        divide_grid(grid, 4242, workers)
+        mazes.append(bytes(grid.walls))
+    assert mazes[0] == mazes[1] == mazes[2]
+    # Same maze from the stream of events
+    grid = new_grid()
+    for _ in division_events(grid, 4242):
+        pass
+    assert bytes(grid.walls) == mazes[0]
+
+
+def test_perfect_and_pattern_kept(small_chambers: None) -> None:
+    grid = new_grid()
+    divide_grid(grid, 4243, 2)
+    free = [i for i in range(grid.size) if not grid.reserved[i]]
+    assert grid.open_walls() == len(free) - 1
+    seen = {free[0]}
+    todo = [free[0]]
+    while todo:
+        for neighbour in grid.open_neighbours(todo.pop()):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                todo.append(neighbour)
+    assert seen == set(free)
+    # The 42 pattern is never cut through
+    assert all(grid.walls[i] == ALL_WALLS for i in range(grid.size)
+               if grid.reserved[i])
+
+
+def test_seed_changes_maze() -> None:
+    grids = [new_grid(), new_grid()]
+    divide_grid(grids[0], 1)
+    divide_grid(grids[1], 2)
+    assert grids[0].walls != grids[1].walls
@@ -0,0 +1,106 @@
+from mazegen.cache import MazeCache
+from mazegen.generate import MazeGenerator
+from mazegen.packed import save_packed, PackedMaze
+from pathlib import Path
+from typing import Any, cast
+import random
+import pytest
+
+
+class Displayer:
+    """Just enough of ShowMaze for a player to move"""
+
+    def __init__(self) -> None:
+        self.updated = 0
+
+    def follow(self, maze: MazeGenerator) -> None:
+        pass
+
+    def display_grid(self, maze: MazeGenerator) -> None:
+        pass
+
+    def update_cell(self, cell: Any, maze: MazeGenerator) -> None:
+        self.updated += 1
+
+
+def displayed(width: int, height: int, seed: int,
+              cache: MazeCache | None = None) -> MazeGenerator:
+    """A maze with a player, as in the interactive UI"""
+    return MazeGenerator(width, height, (0, 0), (width - 1, height - 1),
+                         seed, cast(Any, Displayer()), cache=cache)
+
+
+def test_field_built_with_maze() -> None:
+    maze = displayed(20, 15, 4241)
+    maze.apply_algo(False)
+    field = maze.field
+    assert field is not None
+    assert field.is_valid(maze.grid, maze.grid.index(*maze.end))
+    # Moving only reads the field, it is not built again
+    if maze.grid[0][0].walls['east']:
+        maze.move_entry(0, 1)
+    else:
+        maze.move_entry(1, 0)
+    assert maze.start != (0, 0)
+    assert maze.field is field
+
+
+def test_headless_maze_has_no_field() -> None:
+    maze = MazeGenerator(20, 15, (0, 0), (19, 14), 4241)
+    maze.apply_algo(False)
+    assert maze.field is None
+
+
+def test_field_built_when_loaded(tmp_path: Path) -> None:
+    maze = displayed(20, 15, 4240)
+    maze.apply_algo(True)
+    filename = str(tmp_path / "out.amz")
+    save_packed(maze, filename)
+    with PackedMaze(filename) as packed:
+        loaded = packed.to_maze(Displayer())
+    assert loaded.field is not None
+
+
+def test_field_built_from_cache(tmp_path: Path) -> None:
+    cache = MazeCache(str(tmp_path / "cache"))
+    displayed(20, 15, 4242, cache).apply_algo(True)
+    maze = displayed(20, 15, 4242, cache)
+    maze.apply_algo(True)
+    assert cache.report()['hits'] == 1
+    assert maze.field is not None
+
+
+@pytest.mark.parametrize("perfect", [True, False])
+def test_moves_keep_a_shortest_path(perfect: bool) -> None:
+    maze = displayed(40, 30, 4240)
+    maze.apply_algo(perfect)
+    maze.path_visible = True
+    for cell in maze.path:
+        cell.path = True
+    grid = maze.grid
+    field = maze.exit_field()
+    directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    random.seed(42)
+    for _ in range(400):
+        maze.move_entry(*random.choice(directions))
+        start = grid.index(*maze.start)
+        path = [cell.index for cell in maze.path]
+        assert path[0] == start and path[-1] == grid.index(*maze.end)
+        assert len(path) == field.distance[start] + 1
+        assert all(maze.grid.is_wall_between(a, b) is False
+                   for a, b in zip(path, path[1:]))
+        # Only the path cells are flagged
+        assert {i for i in range(grid.size) if grid.path[i]} == set(path)
+
+
+def test_walking_the_path_is_cheap() -> None:
+    maze = displayed(200, 200, 4242)
+    maze.apply_algo(True)
+    bfs_path = [cell.index for cell in maze.path]
+    displayer = maze.displayer
+    for cell, next_cell in zip(maze.path[:50], maze.path[1:51]):
+        maze.move_entry(next_cell.x - cell.x, next_cell.y - cell.y)
+    # The BFS path is kept while the player walks on it
+    assert [cell.index for cell in maze.path] == bfs_path[50:]
+    # Old cell, player cell, cell leaving the path: not the whole path
+    assert displayer.updated == 50 * 3
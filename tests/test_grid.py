@@ -0,0 +1,24 @@
+from mazegen.generate import MazeGenerator
+from mazegen.grid import NORTH, EAST, SOUTH, WEST
+import pytest
+
+
+def test_link_two_cells_and_indexes() -> None:
+    maze = MazeGenerator(4, 3, (0, 0), (3, 2))
+    grid = maze.grid
+    # Cell views, like the old Cell objects
+    maze.link_two(grid[0][0], grid[0][1], False)
+    assert not grid[0][0].walls['east'] and not grid[0][1].walls['west']
+    # Indexes
+    maze.link_two(grid.index(1, 0), grid.index(1, 1), False)
+    assert grid.walls[grid.index(1, 0)] == NORTH | EAST
+    assert grid.walls[grid.index(1, 1)] == EAST | SOUTH | WEST
+
+
+@pytest.mark.parametrize("cells", [((0, 0), (2, 0)), ((3, 0), (0, 1)),
+                                   ((1, 1), (1, 1))])
+def test_link_two_not_neighbours(cells: tuple[tuple[int, int], ...]) -> None:
+    maze = MazeGenerator(4, 3, (0, 0), (3, 2))
+    (x_1, y_1), (x_2, y_2) = cells
+    with pytest.raises(ValueError, match="neighbours"):
+        maze.link_two(maze.grid[y_1][x_1], maze.grid[y_2][x_2], False)
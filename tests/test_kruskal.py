@@ -0,0 +1,45 @@
+from mazegen.disjoint_set import DisjointSet
+from mazegen.generate import MazeGenerator
+from mazegen.grid import Grid
+import pytest
+
+
+def is_spanning_tree(grid: Grid) -> bool:
+    """Every free cell reachable, and no loop: free cells - 1 passages"""
+    free = [i for i in range(grid.size) if not grid.reserved[i]]
+    seen = {free[0]}
+    todo = [free[0]]
+    while todo:
+        for neighbour in grid.open_neighbours(todo.pop()):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                todo.append(neighbour)
+    return len(seen) == len(free) and grid.open_walls() == len(free) - 1
+
+
+def test_disjoint_set() -> None:
+    sets = DisjointSet(6)
+    assert sets.union(0, 1) and sets.union(2, 3) and sets.union(1, 3)
+    assert not sets.union(0, 2)
+    assert sets.count == 3
+    assert sets.find(0) == sets.find(3) != sets.find(4)
+    assert sets.find(5) == 5
+
+
+@pytest.mark.parametrize("width, height", [(1, 1), (1, 12), (12, 1),
+                                           (2, 2), (9, 7), (45, 30)])
+@pytest.mark.parametrize("seed", [42, 4242])
+def test_kruskal_is_perfect(width: int, height: int, seed: int) -> None:
+    maze = MazeGenerator(width, height, (0, 0), (width - 1, height - 1),
+                         seed * 10 + 2)
+    maze.apply_algo(True)
+    assert is_spanning_tree(maze.grid)
+
+
+def test_kruskal_same_seed_same_maze() -> None:
+    mazes = []
+    for _ in range(2):
+        maze = MazeGenerator(30, 20, (0, 0), (29, 19), 42422)
+        maze.apply_algo(True)
+        mazes.append(bytes(maze.grid.walls))
+    assert mazes[0] == mazes[1]
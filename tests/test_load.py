@@ -0,0 +1,90 @@
+from mazegen.generate import MazeGenerator
+from mazegen.packed import save_packed, PackedMaze, read_packed, write_packed
+from mazegen.packed import HEADER
+from pathlib import Path
+import io
+import pytest
+
+
+def write(tmp_path: Path, content: str) -> str:
+    """Write a maze file and return its path"""
+    path = tmp_path / "maze.txt"
+    path.write_text(content)
+    return str(path)
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    maze = MazeGenerator(12, 9, (0, 0), (11, 8), 4242)
+    maze.apply_algo(False)
+    filename = str(tmp_path / "out.txt")
+    maze.save_maze(filename)
+    loaded = MazeGenerator.load_maze(filename)
+    assert loaded.grid.walls == maze.grid.walls
+    assert ([cell.index for cell in loaded.path]
+            == [cell.index for cell in maze.path])
+
+
+@pytest.mark.parametrize("content", [
+    "13\nC6\n\n0,0\n1,1\nES\n",     # west border of the first column
+    "91\nC6\n\n0,0\n1,1\nES\n",     # east border of the last column
+    "83\nC6\n\n0,0\n1,1\nES\n",     # north border of the first row
+    "93\n86\n\n0,0\n1,1\nES\n",     # south border of the last row
+])
+def test_open_border(tmp_path: Path, content: str) -> None:
+    with pytest.raises(ValueError, match="border"):
+        MazeGenerator.load_maze(write(tmp_path, content))
+
+
+def test_path_wrapping_row(tmp_path: Path) -> None:
+    # The second E would wrap from (1, 0) to (0, 1)
+    with pytest.raises(ValueError, match="out of the maze"):
+        MazeGenerator.load_maze(write(tmp_path, "93\nC6\n\n0,0\n1,1\nEE\n"))
+
+
+def test_path_out_of_grid(tmp_path: Path) -> None:
+    # The second E would be (2, 0), the index of (0, 1) out of the grid
+    with pytest.raises(ValueError, match="out of the maze"):
+        MazeGenerator.load_maze(write(tmp_path, "D7\n\n0,0\n1,0\nEE\n"))
+
+
+def test_path_not_at_exit(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="exit"):
+        MazeGenerator.load_maze(write(tmp_path, "D7\n\n0,0\n1,0\nEW\n"))
+
+
+def test_path_through_wall(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="wall"):
+        MazeGenerator.load_maze(write(tmp_path, "D3\nD6\n\n0,0\n1,1\nSE\n"))
+
+
+def test_packed_open_border(tmp_path: Path) -> None:
+    maze = MazeGenerator(6, 5, (0, 0), (5, 4), 4240)
+    maze.apply_algo(True)
+    # Open the west wall of the first cell
+    maze.grid.walls[0] &= ~8
+    filename = str(tmp_path / "out.amz")
+    save_packed(maze, filename)
+    with PackedMaze(filename) as packed, pytest.raises(ValueError,
+                                                       match="border"):
+        packed.to_maze()
+    data = io.BytesIO()
+    write_packed(maze, data)
+    with pytest.raises(ValueError, match="border"):
+        read_packed(MazeGenerator(6, 5, (0, 0), (5, 4)), data.getvalue())
+
+
+def test_packed_asymmetric_wall(tmp_path: Path) -> None:
+    maze = MazeGenerator(6, 5, (0, 0), (5, 4), 4240)
+    maze.apply_algo(True)
+    data = io.BytesIO()
+    write_packed(maze, data)
+    packed = bytearray(data.getvalue())
+    # Flip the east wall of cell 14 (2, 2), the low nibble of its byte
+    packed[HEADER.size + 7] ^= 0x02
+    with pytest.raises(ValueError, match="match"):
+        read_packed(MazeGenerator(6, 5, (0, 0), (5, 4)), bytes(packed))
+    filename = tmp_path / "out.amz"
+    filename.write_bytes(packed)
+    with PackedMaze(str(filename)) as loaded, pytest.raises(ValueError,
+                                                            match="match"):
+        loaded.to_maze()
@@ -0,0 +1,24 @@
+from mazegen.parsing import parse_config, ParsingError
+import pytest
+
+
+CONFIG = ("WIDTH=8\nHEIGHT=6\nENTRY=0,0\nEXIT=7,5\n"
+          "OUTPUT_FILE=output.txt\nPERFECT=True\n")
+
+
+@pytest.mark.parametrize("old, new", [
+    ("WIDTH=8", "WIDTH=8 # comment"),
+    ("EXIT=7,5", "EXIT=7,5  #"),
+    ("HEIGHT=6", "HEIGHT=6 # tall"),
+])
+def test_mandatory_not_on_a_valid_line(old: str, new: str) -> None:
+    with pytest.raises(ParsingError, match="Mandatory"):
+        parse_config(CONFIG.replace(old, new))
+
+
+def test_quiet(capsys: pytest.CaptureFixture[str]) -> None:
+    parse_config(CONFIG)
+    assert "[INFO]" in capsys.readouterr().out
+    config = parse_config(CONFIG, quiet=True)
+    assert capsys.readouterr().out == ""
+    assert config['width'] == 8 and config['exit'] == (7, 5)
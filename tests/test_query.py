@@ -0,0 +1,50 @@
+from mazegen.generate import MazeGenerator
+from mazegen.query import PathQuery
+from mazegen.solve import search
+
+
+def maze_10x10() -> MazeGenerator:
+    maze = MazeGenerator(10, 10, (0, 0), (9, 9), 42420)
+    maze.apply_algo(False)
+    return maze
+
+
+def test_memory_cap() -> None:
+    maze = maze_10x10()
+    # A tree is 8 bytes per cell: 800 bytes, 3 fit in 2500
+    query = PathQuery(maze, max_trees=16, max_bytes=2500)
+    assert query.max_trees == 3
+    # Never less than one tree
+    assert PathQuery(maze, max_bytes=1).max_trees == 1
+    for x in range(6):
+        query.distance((x, 0), (9, 9 - x))
+    assert len(query.trees) == 3
+    assert query.misses == 6
+
+
+def test_least_recently_used_evicted() -> None:
+    maze = maze_10x10()
+    grid = maze.grid
+    query = PathQuery(maze, max_trees=2)
+    query.path((0, 0), (9, 9))     # tree of (0, 0)
+    query.path((1, 0), (9, 9))     # tree of (1, 0)
+    query.path((0, 0), (5, 5))     # hit, (0, 0) is now the most recent
+    query.path((2, 0), (9, 9))     # evicts (1, 0)
+    assert list(query.trees) == [grid.index(0, 0), grid.index(2, 0)]
+    assert (query.hits, query.misses) == (1, 3)
+
+
+def test_paths_and_invalidation() -> None:
+    maze = maze_10x10()
+    grid = maze.grid
+    query = PathQuery(maze)
+    for a, b in [((0, 0), (9, 9)), ((9, 9), (0, 0)), ((3, 8), (7, 1))]:
+        path = [cell.index for cell in query.path(a, b)]
+        expected = search(grid, grid.index(*a), grid.index(*b))['path']
+        assert path[0] == grid.index(*a) and path[-1] == grid.index(*b)
+        assert len(path) == len(expected)
+        assert query.distance(a, b) == len(expected) - 1
+    # A wall change drops the cached trees
+    grid.link(grid.index(0, 0), grid.index(1, 0))
+    query.distance((0, 0), (9, 9))
+    assert len(query.trees) == 1
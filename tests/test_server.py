@@ -0,0 +1,79 @@
+from mazegen.server import MazeServer
+from collections.abc import Awaitable, Callable
+import asyncio
+import os
+import pytest
+import signal
+
+
+CONFIG = b"WIDTH=20\nHEIGHT=15\nENTRY=0,0\nEXIT=19,14\nPERFECT=True\n"
+
+
+async def request(port: int, target: str,
+                  body: bytes = b"") -> tuple[int, bytes]:
+    """Send one request on a new connection, return status and body"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"POST {target} HTTP/1.1\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    answer = await asyncio.wait_for(reader.read(), 30)
+    writer.close()
+    head, _, data = answer.partition(b"\r\n\r\n")
+    return int(head.split()[1]), data
+
+
+def run_server(test: Callable[[MazeServer, int], Awaitable[None]]) -> None:
+    """Run test(service, port) against a server with one worker"""
+    async def main() -> None:
+        service = MazeServer(workers=1, queue_size=4, max_cells=2000)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            await test(service, port)
+        finally:
+            server.close()
+            await service.close()
+    asyncio.run(main())
+
+
+def test_too_many_cells() -> None:
+    async def test(service: MazeServer, port: int) -> None:
+        status, _ = await request(port, "/maze?width=3000&height=3000"
+                                  "&entry=0,0&exit=1,1&perfect=True")
+        assert status == 413
+        assert service.queue.qsize() == 0
+        status, _ = await request(port, "/maze", CONFIG)
+        assert status == 200
+    run_server(test)
+
+
+def test_worker_crash() -> None:
+    async def test(service: MazeServer, port: int) -> None:
+        assert service.pool is not None
+        for pid in list(service.pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        status, data = await request(port, "/maze", CONFIG)
+        assert status == 500, data
+        # The pool is started again, next requests work
+        status, _ = await request(port, "/maze", CONFIG)
+        assert status == 200
+        report = service.report()
+        assert report['restarts'] == 1
+        assert report['endpoints']['/maze']['errors'] == 1
+    run_server(test)
+
+
+def test_malformed_config(capsys: pytest.CaptureFixture[str]) -> None:
+    async def test(service: MazeServer, port: int) -> None:
+        # WIDTH is in the body, but on a commented line
+        status, data = await request(port, "/maze",
+                                     CONFIG.replace(b"WIDTH=20",
+                                                    b"WIDTH=20 # wide"))
+        assert status == 400, data
+        assert b"WIDTH" in data
+        # Too small for the 42 pattern: nothing printed by the server
+        status, _ = await request(port, "/maze?width=5&height=4"
+                                  "&entry=0,0&exit=4,3&perfect=True")
+        assert status == 200
+    run_server(test)
+    assert "[INFO]" not in capsys.readouterr().out
@@ -0,0 +1,50 @@
+from mazegen.generate import MazeGenerator
+from mazegen.solve import breadth_first_search, search, solve, SOLVERS
+import pytest
+
+
+def imperfect_maze(seed: int) -> MazeGenerator:
+    """Loops everywhere: many shortest paths to choose from"""
+    maze = MazeGenerator(40, 30, (0, 0), (39, 29), seed, loop_ratio=1.0)
+    maze.apply_algo(False)
+    return maze
+
+
+@pytest.mark.parametrize("strategy", SOLVERS)
+@pytest.mark.parametrize("seed", [42420, 42421, 42422, 42423, 42424])
+def test_shortest_path(strategy: str, seed: int) -> None:
+    maze = imperfect_maze(seed)
+    grid = maze.grid
+    # The same buffers are reused by every call (solve() keeps them)
+    for start, end in [((0, 0), (39, 29)), ((39, 0), (0, 29)),
+                       ((5, 5), (6, 5)), ((12, 3), (12, 3))]:
+        path = [cell.index for cell in solve(maze, strategy, start, end)]
+        assert path[0] == grid.index(*start)
+        assert path[-1] == grid.index(*end)
+        assert all(not grid.is_wall_between(a, b)
+                   for a, b in zip(path, path[1:]))
+        expected = search(grid, grid.index(*start), grid.index(*end))
+        assert len(path) == len(expected['path'])
+
+
+def test_bfs_same_path_as_breadth_first_search() -> None:
+    maze = imperfect_maze(42420)
+    expected = [cell.index for cell in breadth_first_search(maze)]
+    assert [cell.index for cell in solve(maze, 'bfs')] == expected
+
+
+@pytest.mark.parametrize("strategy", SOLVERS)
+def test_unreachable(strategy: str) -> None:
+    maze = MazeGenerator(20, 15, (0, 0), (19, 14), 42420)
+    maze.apply_algo(True)
+    grid = maze.grid
+    # A cell of the 42 pattern keeps its 4 walls
+    reserved = grid.reserved.index(1)
+    assert search(grid, 0, reserved, strategy)['path'] == []
+
+
+def test_unknown_strategy() -> None:
+    maze = MazeGenerator(10, 10, (0, 0), (9, 9), 42420)
+    maze.apply_algo(True)
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        solve(maze, 'dijkstra')
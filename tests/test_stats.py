@@ -0,0 +1,35 @@
+from mazegen.generate import MazeGenerator
+from mazegen.stats import MazeStats
+from pathlib import Path
+
+
+def test_phases_add_up() -> None:
+    calls: list[str] = []
+    stats = MazeStats(hook=lambda phase, seconds, stats: calls.append(phase))
+    stats.begin(42420, 0)
+    for _ in range(2):
+        with stats.phase("save"):
+            pass
+    stats.count("bytes_written", 10)
+    stats.count("bytes_written", 5)
+    report = stats.report()
+    assert calls == ["save", "save"]
+    assert report['counters'] == {'bytes_written': 15}
+    assert report['total'] == report['phases']['save'] >= 0
+    # The report is a copy, begin() starts a new maze
+    stats.begin(42421, 1)
+    assert stats.phases == {} and report['counters'] == {'bytes_written': 15}
+
+
+def test_generator_stats(tmp_path: Path) -> None:
+    stats = MazeStats()
+    maze = MazeGenerator(20, 15, (0, 0), (19, 14), 42422, stats=stats)
+    maze.apply_algo(False)
+    maze.save_maze(str(tmp_path / "out.txt"))
+    report = stats.report()
+    assert (report['seed'], report['algo']) == (42422, 2)
+    assert {"init", "algorithm", "unperfect", "bfs",
+            "save"} <= set(report['phases'])
+    counters = report['counters']
+    assert counters['walls_removed'] == maze.grid.open_walls()
+    assert counters['bytes_written'] == (tmp_path / "out.txt").stat().st_size
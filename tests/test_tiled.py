@@ -0,0 +1,49 @@
+from mazegen.grid import NORTH, EAST, SOUTH, WEST
+from mazegen.tiled import TiledMaze
+import pytest
+
+
+@pytest.mark.parametrize("doors", [1, 3])
+@pytest.mark.parametrize("perfect", [True, False])
+def test_borders_match(doors: int, perfect: bool) -> None:
+    world = TiledMaze(12, 9, seed=42420, perfect=perfect, doors=doors)
+    for tx in range(-2, 2):
+        for ty in range(-2, 2):
+            x, y = tx * 12, ty * 9
+            east = [row for row in range(9)
+                    if not world.walls(x + 11, y + row) & EAST]
+            assert east == [row for row in range(9)
+                            if not world.walls(x + 12, y + row) & WEST]
+            assert len(east) == doors
+            south = [col for col in range(12)
+                     if not world.walls(x + col, y + 8) & SOUTH]
+            assert south == [col for col in range(12)
+                             if not world.walls(x + col, y + 9) & NORTH]
+            assert len(south) == doors
+
+
+def test_tiles_regenerated_identical() -> None:
+    world = TiledMaze(12, 9, seed=42421, max_tiles=2)
+    first = [world.tile(tx, 0) for tx in range(5)]
+    assert len(world.tiles) == 2
+    # Evicted tiles come back the same, visited in another order
+    assert [world.tile(tx, 0) for tx in reversed(range(5))] == first[::-1]
+    assert world.misses == 8 and world.hits == 2
+    assert TiledMaze(12, 9, seed=42421).tile(3, 0) == first[3]
+
+
+def test_region_connected() -> None:
+    world = TiledMaze(12, 9, seed=42422)
+    grid = world.region(-12, -9, 24, 18)
+    assert grid.walls[0] == world.walls(-12, -9)
+    assert grid.walls[grid.index(23, 17)] == world.walls(11, 8)
+    free = [i for i in range(grid.size) if not grid.reserved[i]]
+    seen = {free[0]}
+    todo = [free[0]]
+    while todo:
+        for neighbour in grid.open_neighbours(todo.pop()):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                todo.append(neighbour)
+    # The 4 tiles are joined by their doors
+    assert seen == set(free)
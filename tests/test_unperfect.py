@@ -0,0 +1,39 @@
+from mazegen.generate import MazeGenerator
+from mazegen.grid import ALL_WALLS
+import pytest
+
+
+def generate(perfect: bool, loop_ratio: float = 0.2,
+             loops: int | None = None) -> MazeGenerator:
+    maze = MazeGenerator(40, 30, (0, 0), (39, 29), 42420,
+                         loop_ratio=loop_ratio, loops=loops)
+    maze.apply_algo(perfect)
+    return maze
+
+
+@pytest.mark.parametrize("loops", [0, 1, 25])
+def test_exact_number_of_loops(loops: int) -> None:
+    perfect = generate(True)
+    maze = generate(False, loops=loops)
+    assert maze.grid.open_walls() == perfect.grid.open_walls() + loops
+    # Only walls are destroyed, none is added
+    assert all(a & b == a for a, b in zip(maze.grid.walls,
+                                          perfect.grid.walls))
+
+
+def test_loop_ratio() -> None:
+    perfect = generate(True).grid.open_walls()
+    opened = [generate(False, loop_ratio=ratio).grid.open_walls() - perfect
+              for ratio in (0.0, 0.2, 0.5, 1.0)]
+    assert opened[0] == 0
+    assert opened == sorted(opened) and opened[-1] > opened[1] > 0
+
+
+def test_border_and_pattern_kept() -> None:
+    maze = generate(False, loop_ratio=1.0)
+    grid = maze.grid
+    grid.check_border()
+    assert all(grid.walls[i] == ALL_WALLS for i in range(grid.size)
+               if grid.reserved[i])
+    # Same seed, same loops
+    assert generate(False, loop_ratio=1.0).grid.walls == grid.walls
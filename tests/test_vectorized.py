@@ -0,0 +1,27 @@
+from mazegen.generate import MazeGenerator
+from mazegen.solve import breadth_first_search
+import pytest
+
+pytest.importorskip("numpy")
+from mazegen import vectorized  # noqa: E402
+from mazegen.vectorized import distance_transform  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("algo", range(5))
+@pytest.mark.parametrize("small_frontier", [0, vectorized.SMALL_FRONTIER])
+def test_same_paths_as_bfs(seed: int, algo: int, small_frontier: int,
+                           monkeypatch: pytest.MonkeyPatch) -> None:
+    # 0: every layer is expanded by NumPy
+    monkeypatch.setattr(vectorized, "SMALL_FRONTIER", small_frontier)
+    # Many loops: many shortest paths of the same length to choose from
+    maze = MazeGenerator(120, 90, (0, 0), (119, 89),
+                         (1000 + seed) * 10 + algo, loop_ratio=1.0)
+    maze.apply_algo(False)
+    field = distance_transform(maze.grid, [maze.grid.index(0, 0)])
+    for end in [(119, 89), (60, 10), (119, 0), (0, 89), (7, 80)]:
+        if maze.grid.reserved[maze.grid.index(*end)]:
+            continue
+        maze.end = end
+        expected = [cell.index for cell in breadth_first_search(maze)]
+        assert field.path_to(maze.grid.index(*end)) == expected